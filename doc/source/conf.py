@@ -172,8 +172,6 @@ autodoc_mock_imports = [
     "flask",
     "fsspec",
     "lxml",
-    "matplotlib",
-    "matplotlib.pyplot",
     "numpy",
     "numpy.ma",
     "oyaml",
@@ -1,6 +1,6 @@
 import logging
 import os
-from typing import Union
+from typing import Optional, Union
 
 from mapchete.bounds import Bounds
 from mapchete.config import MapcheteConfig
@@ -47,6 +47,8 @@ logger.addHandler(logging.NullHandler())
 def open(
     some_input: Union[MPathLike, dict, MapcheteConfig],
     with_cache: bool = False,
+    cache_size: Optional[int] = None,
+    cache_spill_dir: Optional[MPathLike] = None,
     **kwargs,
 ) -> Mapchete:
     """
@@ -71,6 +73,10 @@ def open(
         single input file if supported by process
     with_cache : bool
         process output data cached in memory
+    cache_size : int
+        memory ceiling of process output cache in bytes
+    cache_spill_dir : str or MPath
+        directory where process output evicted from cache is spilled to
     fs : fsspec FileSystem
         Any FileSystem object for the mapchete output.
     fs_kwargs : dict
@@ -115,7 +121,12 @@ def open(
         and some_input.suffix == ".mapchete"
         or isinstance(some_input, MapcheteConfig)
     ):
-        return Mapchete(MapcheteConfig(some_input, **kwargs), with_cache=with_cache)  # type: ignore
+        return Mapchete(
+            MapcheteConfig(some_input, **kwargs),  # type: ignore
+            with_cache=with_cache,
+            cache_size=cache_size,
+            cache_spill_dir=cache_spill_dir,
+        )
     else:  # pragma: no cover
         raise TypeError(
             "can only open input in form of a mapchete file path, a TileDirectory path, "
@@ -20,6 +20,11 @@ def _cb_none_concurrency(ctx, param, value):
 @options.opt_point
 @options.opt_point_crs
 @options.opt_overwrite
+@click.option(
+    "--checksum",
+    is_flag=True,
+    help="Compare checksums of existing tiles when overwriting. WARNING: this will read all existing tiles (source and destination)!",
+)
 @options.opt_verbose
 @options.opt_no_pbar
 @options.opt_debug
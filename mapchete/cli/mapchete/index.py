@@ -25,10 +25,12 @@ logger = logging.getLogger(__name__)
 @options.opt_shp
 @options.opt_fgb
 @options.opt_vrt
+@options.opt_gti
 @options.opt_txt
 @options.opt_fieldname
 @options.opt_basepath
 @options.opt_for_gdal
+@options.opt_incremental
 @options.opt_zoom
 @options.opt_bounds
 @options.opt_bounds_crs
@@ -1,10 +1,14 @@
+from typing import Optional
+
 import click
 import tqdm
 
 from mapchete import commands
 from mapchete.cli import options
 from mapchete.cli.progress_bar import PBar
-from mapchete.commands.rm import existing_paths
+from mapchete.commands.rm import existing_tiles_count
+from mapchete.protocols import ObserverProtocol
+from mapchete.types import Progress
 
 
 @click.command(help="Remove tiles from TileDirectory.")
@@ -30,20 +34,29 @@ def rm(
     **kwargs,
 ):
     """Remove tiles from TileDirectory."""
-    tiles_to_delete = existing_paths(
-        *args,
-        **kwargs,
-    )
-    if len(tiles_to_delete):
-        if force or click.confirm(
-            f"Do you want to delete {len(tiles_to_delete)} tiles?", abort=True
-        ):
-            with PBar(
-                total=len(tiles_to_delete),
-                desc="tiles",
-                disable=debug or no_pbar,
-                print_messages=verbose,
-            ) as pbar:
-                commands.rm(paths=tiles_to_delete, observers=[pbar], **kwargs)
-    else:  # pragma: no cover
+    if not force:
+        # count tiles without keeping their paths, tiles are listed again for deletion
+        tiles_count = existing_tiles_count(*args, **kwargs)
+        if not tiles_count:
+            tqdm.tqdm.write("No tiles found to delete.")
+            return
+        click.confirm(f"Do you want to delete {tiles_count} tiles?", abort=True)
+    deleted = DeletedCounter()
+    with PBar(
+        desc="tiles",
+        disable=debug or no_pbar,
+        print_messages=verbose,
+    ) as pbar:
+        commands.rm(*args, observers=[pbar, deleted], **kwargs)
+    if not deleted.tiles:  # pragma: no cover
         tqdm.tqdm.write("No tiles found to delete.")
+
+
+class DeletedCounter(ObserverProtocol):
+    """Count deleted tiles from progress updates."""
+
+    tiles = 0
+
+    def update(self, *args, progress: Optional[Progress] = None, **kwargs):
+        if progress:
+            self.tiles = progress.current
@@ -5,22 +5,32 @@ import logging
 import logging.config
 import os
 import pkgutil
+from contextlib import ExitStack
+from typing import Iterator, Optional
 
 import click
 from rasterio.io import MemoryFile
 
 import mapchete
 from mapchete.cli import options
+from mapchete.enums import Concurrency, ProcessingMode
+from mapchete.executor import Executor
+from mapchete.formats.base import TileDirectoryOutputReader
 from mapchete.io import MPath
-from mapchete.tile import BufferedTilePyramid
+from mapchete.tile import BufferedTile, BufferedTilePyramid
 
 logger = logging.getLogger(__name__)
 
+# output files which can be sent to the client without re-encoding
+WEB_MIME_TYPES = {".png": "image/png", ".tif": "image/tiff"}
+
 
 @click.command(help="Serve a process on localhost.")
 @options.arg_mapchete_files
 @options.opt_port
 @options.opt_internal_cache
+@options.opt_cache_spill_dir
+@options.opt_serve_workers
 @options.opt_zoom
 @options.opt_bounds
 @options.opt_overwrite
@@ -33,6 +43,8 @@ def serve(
     mapchete_files,
     port=None,
     internal_cache=None,
+    cache_spill_dir=None,
+    workers=None,
     zoom=None,
     bounds=None,
     overwrite=False,
@@ -48,24 +60,36 @@ def serve(
     Creates the Mapchete host and serves both web page with OpenLayers and the
     WMTS simple REST endpoint.
     """
-    app = create_app(
-        mapchete_files=mapchete_files,
-        zoom=zoom,
-        bounds=bounds,
-        single_input_file=input_file,
-        mode=_get_mode(memory, readonly, overwrite),
-        debug=debug,
-    )
-    if os.environ.get("MAPCHETE_TEST") == "TRUE":
-        logger.debug("don't run flask app, MAPCHETE_TEST environment detected")
-    else:  # pragma: no cover
-        app.run(
-            threaded=True,
+    with ExitStack() as exit_stack:
+        # request threads only coordinate while tiles are processed in worker processes
+        executor = (
+            exit_stack.enter_context(
+                Executor(concurrency=Concurrency.processes, max_workers=workers)
+            )
+            if workers
+            else None
+        )
+        app = create_app(
+            mapchete_files=mapchete_files,
+            zoom=zoom,
+            bounds=bounds,
+            single_input_file=input_file,
+            mode=_get_mode(memory, readonly, overwrite),
             debug=debug,
-            port=port,
-            host="0.0.0.0",
-            extra_files=mapchete_files,
+            cache_size=internal_cache * 1024 * 1024 if internal_cache else None,
+            cache_spill_dir=cache_spill_dir,
+            executor=executor,
         )
+        if os.environ.get("MAPCHETE_TEST") == "TRUE":
+            logger.debug("don't run flask app, MAPCHETE_TEST environment detected")
+        else:  # pragma: no cover
+            app.run(
+                threaded=True,
+                debug=debug,
+                port=port,
+                host="0.0.0.0",
+                extra_files=mapchete_files,
+            )
 
 
 def create_app(
@@ -75,8 +99,16 @@ def create_app(
     single_input_file=None,
     mode="continue",
     debug=None,
+    cache_size=None,
+    cache_spill_dir=None,
+    executor=None,
 ):
-    """Configure and create Flask app."""
+    """
+    Configure and create Flask app.
+
+    If an executor is given, tiles are processed there. Concurrent requests for the
+    same process tile share one computation.
+    """
     from flask import Flask, render_template_string
 
     app = Flask(__name__)
@@ -90,6 +122,8 @@ def create_app(
             single_input_file=single_input_file,
             mode=mode,
             with_cache=True,
+            cache_size=cache_size,
+            cache_spill_dir=cache_spill_dir,
             debug=debug,
         )
         for mapchete_file in mapchete_files
@@ -136,7 +170,10 @@ def create_app(
         )
         # convert zoom, row, col into tile object using web pyramid
         return _tile_response(
-            mapchete_processes[mp_name], web_pyramid.tile(zoom, row, col), debug
+            mapchete_processes[mp_name],
+            web_pyramid.tile(zoom, row, col),
+            debug,
+            executor=executor,
         )
 
     return app
@@ -153,10 +190,15 @@ def _get_mode(memory, readonly, overwrite):
         return "continue"
 
 
-def _tile_response(mp, web_tile, debug):
+def _tile_response(mp, web_tile, debug, executor=None):
     try:
         logger.debug("getting web tile %s", str(web_tile.id))
-        return _valid_tile_response(mp, mp.get_raw_output(web_tile))
+        existing_path = _existing_output_path(mp, web_tile)
+        if existing_path:
+            return _existing_tile_response(
+                existing_path, WEB_MIME_TYPES[existing_path.suffix]
+            )
+        return _valid_tile_response(mp, mp.get_raw_output(web_tile, executor=executor))
     except Exception:  # pragma: no cover
         logger.exception("getting web tile %s failed", str(web_tile.id))
         if debug:
@@ -182,3 +224,43 @@ def _valid_tile_response(mp, data):
     response.headers["Content-Type"] = mime_type
     response.cache_control.no_write = True
     return response
+
+
+def _existing_output_path(mp, web_tile: BufferedTile) -> Optional[MPath]:
+    """Return path of an already written output tile matching the web tile."""
+    output_pyramid = mp.config.output_pyramid
+    web_pyramid = web_tile.tile_pyramid
+    if (
+        mp.config.mode not in [ProcessingMode.READONLY, ProcessingMode.CONTINUE]
+        or not isinstance(mp.config.output_reader, TileDirectoryOutputReader)
+        or mp.config.output_reader.file_extension not in WEB_MIME_TYPES
+        or output_pyramid.metatiling != 1
+        or output_pyramid.pixelbuffer
+        # output tiles only cover the web tile if both use the same tile matrix
+        or output_pyramid.tile_size != web_pyramid.tile_size
+        or output_pyramid.grid != web_pyramid.grid
+        or web_tile.zoom not in mp.config.zoom_levels
+    ):
+        return None
+    path = mp.config.output_reader.get_path(output_pyramid.tile(*web_tile.id))
+    return path if path.exists() else None
+
+
+def _existing_tile_response(path: MPath, mime_type: str):
+    """Stream file from storage and enable conditional requests."""
+    from flask import Response, request
+
+    logger.debug("stream existing tile %s", path)
+    last_modified = path.last_modified()
+    etag = path.info().get("ETag") or f"{path.size()}-{last_modified.timestamp()}"
+    response = Response(_read_chunks(path), mimetype=mime_type)
+    response.set_etag(etag.strip('"'))
+    response.last_modified = last_modified
+    # let clients revalidate using ETag and Last-Modified
+    response.cache_control.no_cache = True
+    return response.make_conditional(request)
+
+
+def _read_chunks(path: MPath, chunk_size: int = 64 * 1024) -> Iterator[bytes]:
+    with path.open("rb") as src:
+        yield from iter(lambda: src.read(chunk_size), b"")
@@ -271,6 +271,9 @@ opt_gpkg = click.option("--gpkg", is_flag=True, help="Write GeoPackage index.")
 opt_shp = click.option("--shp", is_flag=True, help="Write Shapefile index.")
 opt_fgb = click.option("--fgb", is_flag=True, help="Write FlatGeobuf index.")
 opt_vrt = click.option("--vrt", is_flag=True, help="Write VRT file.")
+opt_gti = click.option(
+    "--gti", is_flag=True, help="Write GDAL raster tile index (GTI) file."
+)
 opt_txt = click.option(
     "--txt", is_flag=True, help="Write output tile paths to text file."
 )
@@ -291,6 +294,11 @@ opt_for_gdal = click.option(
     is_flag=True,
     help="Make remote paths readable by GDAL (not applied for txt output).",
 )
+opt_incremental = click.option(
+    "--incremental",
+    is_flag=True,
+    help="Only add tiles written since the last incremental run to existing indexes.",
+)
 opt_output_format = click.option(
     "--output-format",
     "-of",
@@ -329,7 +337,18 @@ opt_internal_cache = click.option(
     type=click.INT,
     default=1024,
     show_default=True,
-    help="Number of web tiles to be cached in RAM.",
+    help="Memory ceiling of process tile cache in MB.",
+)
+opt_serve_workers = click.option(
+    "--workers",
+    "-w",
+    type=click.IntRange(min=1),
+    help="Process tiles in a pool of worker processes instead of the request threads.",
+)
+opt_cache_spill_dir = click.option(
+    "--cache-spill-dir",
+    type=click.Path(),
+    help="Spill process tiles evicted from cache to this directory instead of discarding them.",
 )
 opt_readonly = click.option(
     "--readonly", "-ro", is_flag=True, help="Just read process output without writing."
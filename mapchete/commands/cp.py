@@ -2,7 +2,7 @@
 
 import logging
 from multiprocessing import cpu_count
-from typing import List, Optional, Tuple, Type, Union
+from typing import Dict, List, Optional, Tuple, Type, Union
 
 from distributed import Client
 from shapely.geometry import Point
@@ -14,6 +14,9 @@ from mapchete.enums import Concurrency
 from mapchete.executor import Executor
 from mapchete.io import MPath, copy, tiles_exist
 from mapchete.geometry import reproject_geometry
+from mapchete.processing.base import Mapchete
+from mapchete.tile import BufferedTile
+from mapchete.timer import Timer
 from mapchete.types import BoundsLike, CRSLike, Progress, ZoomLevelsLike
 
 logger = logging.getLogger(__name__)
@@ -30,6 +33,8 @@ def cp(
     point: Optional[Tuple[float, float]] = None,
     point_crs: Optional[CRSLike] = None,
     overwrite: bool = False,
+    checksum: bool = False,
+    batch_size: int = 1000,
     workers: Optional[int] = None,
     concurrency: Concurrency = Concurrency.threads,
     dask_scheduler: Optional[str] = None,
@@ -41,6 +46,13 @@ def cp(
 ):
     """
     Copy TileDirectory from source to destination.
+
+    Existing source and destination tiles are determined by listing each zoom level
+    once. With overwrite, only destination tiles which differ from the source tiles
+    by size and ETag or modification time (or by checksum if activated) are replaced.
+    Tiles are copied in batches and copies within the same filesystem are done using
+    the filesystem's copy function, which avoids streaming data through the client on
+    object storages.
     """
 
     workers = workers or cpu_count()
@@ -102,75 +114,156 @@ def cp(
                         )
                         tiles = [tp.tile_from_xy(point_geom.x, point_geom.y, zoom)]
                     else:
-                        aoi_geom = src_mp.config.area_at_zoom(zoom)
-                        tiles = [
-                            t
-                            for t in tp.tiles_from_geom(aoi_geom, zoom)
-                            # this is required to omit tiles touching the config area
-                            if aoi_geom.intersection(t.bbox).area
-                        ]
+                        area_mask = src_mp.config.area_mask_at_zoom(zoom, pyramid=tp)
+                        if area_mask is not None:
+                            tiles = list(area_mask.tiles())
+                        else:
+                            aoi_geom = src_mp.config.area_at_zoom(zoom)
+                            tiles = [
+                                t
+                                for t in tp.tiles_from_geom(aoi_geom, zoom)
+                                # this is required to omit tiles touching the config area
+                                if aoi_geom.intersection(t.bbox).area
+                            ]
 
                     all_observers.notify(progress=Progress(current=0, total=len(tiles)))
 
-                    # check which source tiles exist
+                    # determine existing tiles, by default using one listing per zoom
                     logger.debug("looking for existing source tiles...")
-                    src_tiles_exist = dict(
-                        tiles_exist(
-                            config=src_mp.config, output_tiles=tiles, workers=workers
-                        )
+                    src_tiles = _existing_tiles(
+                        src_mp, tiles, zoom, workers, use_listing=not point
                     )
-
-                    # check which destination tiles exist
                     logger.debug("looking for existing destination tiles...")
-                    dst_tiles_exist = dict(
-                        tiles_exist(
-                            config=dst_mp.config, output_tiles=tiles, workers=workers
-                        )
+                    dst_tiles = _existing_tiles(
+                        dst_mp, tiles, zoom, workers, use_listing=not point
                     )
 
-                    # copy
+                    # collect tiles which have to be compared or copied
+                    candidates = []
+                    for tile in tiles:
+                        src_path = src_tiles.get(tile)
+                        if src_path is None:
+                            logger.debug("%s: source tile does not exist", tile)
+                        elif tile in dst_tiles:
+                            # skip if destination tile exists and overwrite is deactivated
+                            if overwrite:
+                                candidates.append((src_path, dst_tiles[tile], True))
+                            else:
+                                logger.debug("%s: destination tile exists", tile)
+                        else:
+                            candidates.append(
+                                (
+                                    src_path,
+                                    dst_mp.config.output_reader.get_path(tile),
+                                    False,
+                                )
+                            )
+                    current = len(tiles) - len(candidates)
+                    all_observers.notify(
+                        progress=Progress(current=current, total=len(tiles))
+                    )
+
+                    # copy in batches
                     total_copied = 0
-                    for ii, future in enumerate(
-                        executor.as_completed(
-                            _copy_tile,
-                            tiles,
-                            fargs=(
-                                src_mp,
-                                dst_mp,
-                                src_tiles_exist,
-                                dst_tiles_exist,
-                                overwrite,
-                            ),
+                    for future in executor.as_completed(
+                        _copy_tiles_batch,
+                        (
+                            candidates[i : i + batch_size]
+                            for i in range(0, len(candidates), batch_size)
                         ),
-                        1,
+                        fargs=(checksum,),
                     ):
-                        copied, message = future.result()
+                        processed, copied = future.result()
+                        current += processed
                         total_copied += copied
                         all_observers.notify(
-                            progress=Progress(current=ii, total=len(tiles)),
-                            message=message,
+                            progress=Progress(current=current, total=len(tiles)),
+                            message=f"{copied} of {processed} tiles copied",
                         )
 
                     all_observers.notify(message=f"{total_copied} tiles copied")
 
 
-def _copy_tile(tile, src_mp, dst_mp, src_tiles_exist, dst_tiles_exist, overwrite):
-    src_path = src_mp.config.output_reader.get_path(tile)
-    # only copy if source tile exists
-    if src_tiles_exist[tile]:
-        # skip if destination tile exists and overwrite is deactivated
-        if dst_tiles_exist[tile] and not overwrite:
-            msg = f"{tile}: destination tile exists"
-            logger.debug(msg)
-            return 0, msg
-
-        # copy from source to target
-        dst_path = dst_mp.config.output_reader.get_path(tile)
-        copy(src_path, dst_path, overwrite=overwrite)
-        msg = f"{tile}: copy {src_path} to {dst_path}"
-        logger.debug(msg)
-        return 1, msg
-
-    msg = f"{tile}: source tile ({src_path}) does not exist"
-    logger.debug(msg)
-    return 0, msg
+def _existing_tiles(
+    mp: Mapchete,
+    tiles: List[BufferedTile],
+    zoom: int,
+    workers: int,
+    use_listing: bool = True,
+) -> Dict[BufferedTile, MPath]:
+    """Return paths of existing tiles."""
+    output_reader = mp.config.output_reader
+    tiledir = output_reader.path
+    if (
+        not use_listing
+        or not tiles
+        or tiledir.protocols.intersection({"http", "https"})
+    ):
+        # request tile by tile, because listing is not required or not possible
+        return {
+            tile: output_reader.get_path(tile)
+            for tile, exists in tiles_exist(
+                config=mp.config, output_tiles=tiles, workers=workers
+            )
+            if exists
+        }
+
+    # list all files of zoom level once and keep their file information
+    elements = output_reader.tile_path_schema.split("/")
+    directory = tiledir / str(zoom) if elements[0] == "{zoom}" else tiledir
+    with Timer() as duration:
+        listing = {
+            "/".join(path.elements[-len(elements) :]): path
+            for page in directory.paginate()
+            for path in page
+        }
+    logger.debug("listed %s files in %s in %s", len(listing), directory, duration)
+    existing = {}
+    for tile in tiles:
+        path = output_reader.get_path(tile)
+        listed = listing.get("/".join(path.elements[-len(elements) :]))
+        if listed is not None:
+            existing[tile] = path.new(path, info_dict=listed.info())
+    return existing
+
+
+def _copy_tiles_batch(
+    paths: List[Tuple[MPath, MPath, bool]], checksum: bool = False
+) -> Tuple[int, int]:
+    """Copy batch of tiles if destination does not exist or differs."""
+    to_copy = [
+        (src_path, dst_path)
+        for src_path, dst_path, dst_exists in paths
+        if not dst_exists or _differs(src_path, dst_path, checksum=checksum)
+    ]
+    if to_copy:
+        src_fs = to_copy[0][0].fs
+        dst_fs = to_copy[0][1].fs
+        if src_fs == dst_fs:
+            # copy within filesystem, which is a server-side copy on object storages
+            for parent in set(dst_path.parent for _, dst_path in to_copy):
+                parent.makedirs()
+            to_copy = sorted(to_copy, key=lambda x: str(x[0]))
+            src_fs.copy(
+                [str(src_path) for src_path, _ in to_copy],
+                [str(dst_path) for _, dst_path in to_copy],
+            )
+        else:
+            for src_path, dst_path in to_copy:
+                copy(src_path, dst_path, overwrite=True)
+        logger.debug("copied %s tiles", len(to_copy))
+    return len(paths), len(to_copy)
+
+
+def _differs(src_path: MPath, dst_path: MPath, checksum: bool = False) -> bool:
+    """Compare two existing files by size and content or metadata."""
+    if src_path.size() != dst_path.size():
+        return True
+    elif checksum:
+        return src_path.checksum() != dst_path.checksum()
+    src_etag = src_path.info().get("ETag")
+    dst_etag = dst_path.info().get("ETag")
+    if src_etag and dst_etag:
+        return src_etag != dst_etag
+    # source was modified after destination was written
+    return src_path.last_modified().timestamp() > dst_path.last_modified().timestamp()
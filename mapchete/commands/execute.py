@@ -89,6 +89,9 @@ def execute(
         Concurrency to be used. Could either be "processes", "threads" or "dask".
     dask_client : dask.distributed.Client
         Reusable Client instance if required. Otherwise a new client will be created.
+    executor_getter : callable
+        Returns executor for every attempt. Pass a mapchete.executor.WorkerPool to reuse
+        the same warm workers across retries and successive commands.
     """
     mode = ProcessingMode.OVERWRITE if overwrite else mode
     all_observers = Observers(observers)
@@ -191,6 +194,7 @@ def execute(
                             all_observers.notify(
                                 progress=Progress(total=len(tasks), current=count),
                                 task_info=task_info,
+                                submission_stats=executor.submission_stats,
                             )
                         all_observers.notify(status=Status.done)
                         return
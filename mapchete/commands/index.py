@@ -26,10 +26,12 @@ def index(
     shp: bool = False,
     fgb: bool = False,
     vrt: bool = False,
+    gti: bool = False,
     txt: bool = False,
     fieldname: Optional[str] = "location",
     basepath: Optional[MPathLike] = None,
     for_gdal: bool = False,
+    incremental: bool = False,
     zoom: Optional[Union[int, List[int]]] = None,
     area: Optional[Union[BaseGeometry, str, dict]] = None,
     area_crs: Optional[Union[CRS, str]] = None,
@@ -44,10 +46,13 @@ def index(
 ):
     """
     Create one or more indexes from a TileDirectory.
+
+    With incremental, only tiles written since the last incremental run are appended to
+    existing indexes.
     """
-    if not any([geojson, gpkg, shp, fgb, txt, vrt]):
+    if not any([geojson, gpkg, shp, fgb, txt, vrt, gti]):
         raise ValueError(
-            """At least one of '--geojson', '--gpkg', '--shp', '--fgb', '--vrt' or '--txt'"""
+            """At least one of '--geojson', '--gpkg', '--shp', '--fgb', '--vrt', '--gti' or '--txt'"""
             """must be provided."""
         )
 
@@ -86,7 +91,13 @@ def index(
         area=area,
         area_crs=area_crs,
     ) as mp:
-        total = 1 if tile else mp.count_tiles()
+        if tile:
+            total = 1
+        elif incremental:
+            # number of tiles written since last run is not known in advance
+            total = None
+        else:
+            total = mp.count_tiles()
         all_observers.notify(progress=Progress(total=total))
         for ii, tile in enumerate(
             zoom_index_gen(
@@ -99,10 +110,12 @@ def index(
                 shapefile=shp,
                 flatgeobuf=fgb,
                 vrt=vrt,
+                gti=gti,
                 txt=txt,
                 fieldname=fieldname,
                 basepath=basepath,
                 for_gdal=for_gdal,
+                incremental=incremental,
             ),
             1,
         ):
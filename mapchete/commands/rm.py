@@ -1,20 +1,47 @@
 """Remove tiles from Tile Directory."""
 
 import logging
-from typing import List, Optional, Tuple, Union
+from itertools import groupby
+from multiprocessing import cpu_count
+from operator import itemgetter
+from typing import Callable, Generator, List, NamedTuple, Optional, Tuple, Type, Union
 
+import numpy as np
 from rasterio.crs import CRS
+from shapely import box, clip_by_rect, covers
 from shapely.geometry.base import BaseGeometry
 
 import mapchete
 from mapchete.commands.observer import ObserverProtocol, Observers
-from mapchete.io import tiles_exist
+from mapchete.enums import Concurrency
+from mapchete.executor import Executor
+from mapchete.formats.base import DEFAULT_TILE_PATH_SCHEMA
+from mapchete.formats.existence_index import invalidate_existence_index, list_tiles
 from mapchete.path import MPath
+from mapchete.processing.base import Mapchete
+from mapchete.timer import Timer
 from mapchete.types import MPathLike, Progress
 
 logger = logging.getLogger(__name__)
 
 
+class DeleteBatch(NamedTuple):
+    """
+    Tiles to be deleted within one call.
+
+    If prefix is set, tiles_count tiles are located below the prefix and get deleted by
+    recursively removing the prefix. Otherwise all paths are deleted.
+    """
+
+    paths: List[MPath]
+    prefix: Optional[MPath] = None
+    tiles_count: Optional[int] = None
+
+    @property
+    def tiles(self) -> int:
+        return len(self.paths) if self.tiles_count is None else self.tiles_count
+
+
 def rm(
     tiledir: Optional[MPathLike] = None,
     paths: List[MPath] = None,
@@ -24,16 +51,25 @@ def rm(
     bounds: Tuple[float] = None,
     bounds_crs: Union[CRS, str] = None,
     workers: Optional[int] = None,
+    concurrency: Concurrency = Concurrency.threads,
+    batch_size: int = 1000,
     fs_opts: dict = None,
+    executor_getter: Type[Executor] = Executor,
     observers: Optional[List[ObserverProtocol]] = None,
 ):
     """
     Remove tiles from TileDirectory.
 
+    Existing tiles are determined by listing each zoom level once and are deleted
+    concurrently in batches of at most batch_size paths. Rows or zoom levels which are
+    entirely covered by the area are removed using one recursive call.
+
     Parameters
     ----------
     tiledir : str
         TileDirectory or mapchete file.
+    paths : list
+        Paths to be deleted if no tiledir is given.
     zoom : integer or list of integers
         Single zoom, minimum and maximum zoom or a list of zoom levels.
     area : str, dict, BaseGeometry
@@ -45,57 +81,61 @@ def rm(
         Override bounds or area provided in process configuration.
     bounds_crs : CRS or str
         CRS of area (default: process CRS).
+    workers : int
+        Number of concurrent delete calls.
+    concurrency : Concurrency
+        Executor used to run delete calls.
+    batch_size : int
+        Maximum number of paths deleted within one call. (default: 1000, which is the
+        maximum number of keys for a single S3 request)
     fs_opts : dict
         Configuration options for fsspec filesystem.
     """
     all_observers = Observers(observers)
+    workers = workers or cpu_count()
 
-    if tiledir:
-        if zoom is None:  # pragma: no cover
-            raise ValueError("zoom level(s) required")
-        tiledir = MPath.from_inp(tiledir, storage_options=fs_opts)
-        paths = existing_paths(
-            tiledir=tiledir,
-            zoom=zoom,
-            area=area,
-            area_crs=area_crs,
-            bounds=bounds,
-            bounds_crs=bounds_crs,
-            workers=workers,
-        )
-        fs = tiledir.fs
-    elif isinstance(paths, list):
-        fs = MPath.from_inp(paths[0]).fs
-    else:  # pragma: no cover
-        raise ValueError(
-            "either a tile directory or a list of paths has to be provided"
-        )
+    with executor_getter(concurrency=concurrency, max_workers=workers) as executor:
+        if tiledir:
+            if zoom is None:  # pragma: no cover
+                raise ValueError("zoom level(s) required")
+            tiledir = MPath.from_inp(tiledir, storage_options=fs_opts)
+            total_deleted = 0
+            with mapchete.open(
+                tiledir,
+                zoom=zoom,
+                area=area,
+                area_crs=area_crs,
+                bounds=bounds,
+                bounds_crs=bounds_crs,
+                mode="readonly",
+            ) as mp:
+                for z in mp.config.init_zoom_levels:
+                    all_observers.notify(message=f"remove tiles from zoom {z}...")
+                    total_deleted += _rm_batches(
+                        executor,
+                        _delete_batches(mp, z, batch_size=batch_size),
+                        all_observers,
+                    )
+                    # existence index of zoom level is not valid anymore
+                    invalidate_existence_index(mp.config.output_reader.path, z)
 
-    total = len(paths)
-    all_observers.notify(progress=Progress(total=total))
-    logger.debug("got %s path(s) on %s", len(paths), fs)
-
-    # s3fs enables multiple paths as input, so let's use this:
-    if "s3" in fs.protocol:
-        fs.rm(paths)
-        for ii, path in enumerate(paths, 1):
-            msg = f"deleted {path}"
-            logger.debug(msg)
-            all_observers.notify(
-                progress=Progress(current=ii, total=total), message=msg
+        elif isinstance(paths, list):
+            total_deleted = _rm_batches(
+                executor,
+                (
+                    DeleteBatch(paths[i : i + batch_size])
+                    for i in range(0, len(paths), batch_size)
+                ),
+                all_observers,
+                total=len(paths),
             )
 
-    # otherwise, just iterate through the paths
-    else:
-        for ii, path in enumerate(paths, 1):
-            fs.rm(path)
-            msg = f"deleted {path}"
-            logger.debug(msg)
-            all_observers.notify(
-                progress=Progress(current=ii, total=total), message=msg
+        else:  # pragma: no cover
+            raise ValueError(
+                "either a tile directory or a list of paths has to be provided"
             )
 
-    all_observers.notify(message=f"{len(paths)} tiles deleted")
+    all_observers.notify(message=f"{total_deleted} tiles deleted")
 
 
 def existing_paths(
@@ -106,37 +146,194 @@ def existing_paths(
     bounds: Tuple[float] = None,
     bounds_crs: Union[CRS, str] = None,
     workers: Optional[int] = None,
-) -> dict:
-    with mapchete.open(
-        tiledir,
-        zoom=zoom,
-        area=area,
-        area_crs=area_crs,
-        bounds=bounds,
-        bounds_crs=bounds_crs,
-        mode="readonly",
-    ) as mp:
-        tp = mp.config.output_pyramid
-        tiles = {}
+) -> List[MPath]:
+    """Return paths of all existing tiles within area."""
+    return [
+        path
+        for batch in _existing_batches(
+            tiledir,
+            zoom=zoom,
+            area=area,
+            area_crs=area_crs,
+            bounds=bounds,
+            bounds_crs=bounds_crs,
+        )
+        for path in batch.paths
+    ]
+
+
+def existing_tiles_count(
+    tiledir: Optional[MPathLike] = None,
+    zoom: Union[int, List[int]] = None,
+    area: Union[BaseGeometry, str, dict] = None,
+    area_crs: Union[CRS, str] = None,
+    bounds: Tuple[float] = None,
+    bounds_crs: Union[CRS, str] = None,
+    workers: Optional[int] = None,
+) -> int:
+    """Return number of existing tiles within area without keeping all of their paths."""
+    return sum(
+        batch.tiles
+        for batch in _existing_batches(
+            tiledir,
+            zoom=zoom,
+            area=area,
+            area_crs=area_crs,
+            bounds=bounds,
+            bounds_crs=bounds_crs,
+        )
+    )
+
+
+def _existing_batches(
+    tiledir: MPathLike, **kwargs
+) -> Generator[DeleteBatch, None, None]:
+    with mapchete.open(tiledir, mode="readonly", **kwargs) as mp:
         for zoom in mp.config.init_zoom_levels:
-            tiles[zoom] = []
-            # check which source tiles exist
-            logger.debug("looking for existing source tiles in zoom %s...", zoom)
-            for tile, exists in tiles_exist(
-                config=mp.config,
-                output_tiles=[
-                    t
-                    for t in tp.tiles_from_geom(mp.config.area_at_zoom(zoom), zoom)
-                    # this is required to omit tiles touching the config area
-                    if mp.config.area_at_zoom(zoom).intersection(t.bbox).area
+            yield from _delete_batches(mp, zoom, use_prefixes=False)
+
+
+def _rm_batches(
+    executor: Executor,
+    batches: Generator[DeleteBatch, None, None],
+    observers: Observers,
+    total: Optional[int] = None,
+) -> int:
+    """Delete batches concurrently and report progress after each batch."""
+    if total is not None:
+        observers.notify(progress=Progress(current=0, total=total))
+    deleted = 0
+    for future in executor.as_completed(_rm_batch, batches):
+        batch_deleted = future.result()
+        deleted += batch_deleted
+        observers.notify(
+            progress=Progress(current=deleted, total=total),
+            message=f"deleted {batch_deleted} tiles",
+        )
+    return deleted
+
+
+def _rm_batch(batch: DeleteBatch) -> int:
+    """Delete all tiles of batch within one call."""
+    if batch.prefix:
+        logger.debug("delete %s tiles below %s", batch.tiles, batch.prefix)
+        batch.prefix.rm(recursive=True)
+    elif batch.paths:
+        logger.debug("delete %s paths", len(batch.paths))
+        batch.paths[0].fs.rm([str(path) for path in batch.paths])
+    return batch.tiles
+
+
+def _delete_batches(
+    mp: Mapchete, zoom: int, batch_size: int = 1000, use_prefixes: bool = True
+) -> Generator[DeleteBatch, None, None]:
+    """
+    Yield batches of existing tiles within process area while listing the zoom level.
+
+    Only the listed tiles of one row are kept in memory at a time. Tiles only touching
+    the process area are omitted.
+    """
+    output_reader = mp.config.output_reader
+    tp = mp.config.output_pyramid
+    aoi = mp.config.area_at_zoom(zoom)
+    listed_rows = _list_rows(output_reader, zoom)
+
+    # rows and zoom levels can only be deleted as a whole if their directory does not
+    # contain any other tiles
+    prefixes = (
+        use_prefixes and output_reader.tile_path_schema == DEFAULT_TILE_PATH_SCHEMA
+    )
+    zoom_dir = output_reader.path / str(zoom)
+    if prefixes and covers(aoi, box(*tp.bounds)):
+        tiles = sum(len(row_tiles) for _, row_tiles in listed_rows)
+        if tiles:
+            yield DeleteBatch([], prefix=zoom_dir, tiles_count=tiles)
+        return
+
+    area_cols = _area_cols(mp, zoom)
+    deleted_rows = set()
+    paths = []
+    for row, row_tiles in listed_rows:
+        cols = area_cols(row)
+        if not len(cols) or row in deleted_rows:
+            continue
+        if prefixes and len(cols) == tp.matrix_width(zoom):
+            deleted_rows.add(row)
+            yield DeleteBatch(
+                [], prefix=zoom_dir / str(row), tiles_count=len(row_tiles)
+            )
+            continue
+        within = np.isin([col for col, _ in row_tiles], cols)
+        for (_, path), delete in zip(row_tiles, within):
+            if delete:
+                paths.append(path)
+                if len(paths) == batch_size:
+                    yield DeleteBatch(paths)
+                    paths = []
+    if paths:
+        yield DeleteBatch(paths)
+
+
+def _list_rows(
+    output_reader, zoom: int
+) -> Generator[Tuple[int, List[Tuple[int, MPath]]], None, None]:
+    """
+    List all existing tiles of zoom level once and yield them grouped by row.
+
+    Tiles of one row are listed consecutively, so only one row is held in memory.
+    """
+    rows = 0
+    with Timer() as duration:
+        for row, row_tiles in groupby(
+            list_tiles(
+                output_reader.path,
+                zoom,
+                output_reader.tile_path_schema,
+                output_reader.file_extension,
+            ),
+            key=itemgetter(0),
+        ):
+            rows += 1
+            yield row, [(col, path) for _, col, path in row_tiles]
+    logger.debug(
+        "listed %s rows of zoom %s in %s in %s",
+        rows,
+        zoom,
+        output_reader.path,
+        duration,
+    )
+
+
+def _area_cols(mp: Mapchete, zoom: int) -> Callable[[int], np.ndarray]:
+    """Return function which determines the output tile columns within area per row."""
+    tp = mp.config.output_pyramid
+    area_mask = mp.config.area_mask_at_zoom(zoom, pyramid=tp)
+
+    if area_mask is not None:
+
+        def _cols(row: int) -> np.ndarray:
+            index = row - area_mask.row_offset
+            if not 0 <= index < area_mask.mask.shape[0]:
+                return np.array([], dtype=np.int64)
+            return np.flatnonzero(area_mask.mask[index]) + area_mask.col_offset
+
+    else:
+        aoi = mp.config.area_at_zoom(zoom)
+
+        def _cols(row: int) -> np.ndarray:
+            # only intersect with the part of the area within the row
+            _, bottom, _, top = tp.tiles_bounds(zoom, [row], [0], pixelbuffer=0)[0]
+            return np.array(
+                [
+                    tile.col
+                    for tile in tp.tiles_from_geom(
+                        clip_by_rect(aoi, tp.left, bottom, tp.right, top),
+                        zoom,
+                        exact=True,
+                    )
+                    if tile.row == row
                 ],
-                workers=workers,
-            ):
-                if exists:
-                    tiles[zoom].append(tile)
-
-        return [
-            mp.config.output_reader.get_path(tile)
-            for zoom_tiles in tiles.values()
-            for tile in zoom_tiles
-        ]
+                dtype=np.int64,
+            )
+
+    return _cols
@@ -33,7 +33,13 @@ from mapchete.formats import (
 )
 from mapchete.io import MPath, absolute_path
 from mapchete.geometry import reproject_geometry
-from mapchete.tile import BufferedTile, BufferedTilePyramid, snap_geometry_to_tiles
+from mapchete.settings import mapchete_options
+from mapchete.tile import (
+    BufferedTile,
+    BufferedTilePyramid,
+    TileMask,
+    snap_geometry_to_tiles,
+)
 from mapchete.timer import Timer
 from mapchete.types import BoundsLike, MPathLike
 from mapchete.validate import (
@@ -135,6 +141,7 @@ class MapcheteConfig(object):
         self._init_area = area
         self._init_area_crs = area_crs
         self._cache_area_at_zoom = {}
+        self._cache_area_mask_at_zoom = {}
         self._cache_full_process_area = None
 
         try:
@@ -657,6 +664,46 @@ class MapcheteConfig(object):
             self._cache_area_at_zoom[zoom] = inputs_and_init.intersection(self.area)
         return self._cache_area_at_zoom[zoom]
 
+    def area_mask_at_zoom(
+        self, zoom: int, pyramid: Optional[BufferedTilePyramid] = None
+    ) -> Optional[TileMask]:
+        """
+        Return mask of tiles intersecting with process area of zoom level.
+
+        Tiles only touching the process area are not part of the mask. The mask is
+        computed once per zoom level and metatiling. If the tile matrix window covering
+        the process area is larger than the MAPCHETE_AREA_MASK_MAX_CELLS setting, None
+        is returned.
+
+        Parameters
+        ----------
+        zoom : int
+        pyramid : BufferedTilePyramid
+            pyramid of tiles, by default the process pyramid
+
+        Returns
+        -------
+        process area mask : TileMask or None
+        """
+        pyramid = pyramid or self.process_pyramid
+        key = (zoom, pyramid.metatiling)
+        if key not in self._cache_area_mask_at_zoom:
+            area = self.area_at_zoom(zoom)
+            try:
+                with Timer() as duration:
+                    self._cache_area_mask_at_zoom[key] = pyramid.tiles_mask(
+                        area,
+                        zoom,
+                        max_cells=mapchete_options.area_mask_max_cells,
+                    )
+                logger.debug(
+                    "process area mask for zoom %s created in %s", zoom, duration
+                )
+            except ValueError as exc:
+                logger.debug("cannot create process area mask: %s", exc)
+                self._cache_area_mask_at_zoom[key] = None
+        return self._cache_area_mask_at_zoom[key]
+
     def bounds_at_zoom(self, zoom=None):
         """
         Return process bounds for zoom level.
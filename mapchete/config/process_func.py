@@ -2,12 +2,13 @@ from importlib import import_module
 from importlib.util import spec_from_file_location, module_from_spec
 import inspect
 import logging
+import os
 import py_compile
 import sys
 from types import ModuleType
 import warnings
 from tempfile import NamedTemporaryFile
-from typing import Any, Dict, Optional, Union
+from typing import Any, Dict, Optional, Tuple, Union
 
 from mapchete.config.models import ZoomParameters
 from mapchete.errors import (
@@ -20,6 +21,9 @@ from mapchete.path import MPath, absolute_path
 
 logger = logging.getLogger(__name__)
 
+# process modules already loaded by this process and the modification time of their file
+_loaded_modules: Dict[str, Tuple[float, ModuleType]] = {}
+
 
 class ProcessFunc:
     """Abstraction class for a user process function.
@@ -132,6 +136,14 @@ class ProcessFunc:
             module_path = absolute_path(path=path, base_dir=self._root_dir)
             if not module_path.exists():
                 raise MapcheteConfigError(f"{module_path} is not available")
+            # reuse module unless the file was modified since it was loaded; process
+            # code from the configuration is written to a new temporary file each time
+            mtime = os.path.getmtime(str(module_path))
+            loaded = _loaded_modules.get(str(module_path)) if self.path else None
+            if loaded and loaded[0] == mtime:
+                module = loaded[1]
+                sys.modules[module_path.stem] = module
+                return module
             try:
                 if self._run_compile:
                     try:
@@ -151,6 +163,9 @@ class ProcessFunc:
                 sys.modules[module_name] = module
                 # configure process file logger
                 add_module_logger(module.__name__)
+                if self.path:
+                    # replaces a module loaded from a previous version of the file
+                    _loaded_modules[str(module_path)] = (mtime, module)
             except py_compile.PyCompileError as e:
                 raise MapcheteProcessSyntaxError(e)
             except ImportError as e:
@@ -15,6 +15,16 @@ class Concurrency(str, Enum):
     dask = "dask"
 
 
+class MergeMethod(str, Enum):
+    """How overlapping pixels of multiple sources are combined."""
+
+    first = "first"
+    last = "last"
+    mean = "mean"
+    min = "min"
+    max = "max"
+
+
 class DataType(str, Enum):
     raster = "raster"
     vector = "vector"
@@ -6,9 +6,10 @@ from mapchete.executor.concurrent_futures import (
 )
 from mapchete.executor.dask import DaskExecutor
 from mapchete.executor.future import MFuture
+from mapchete.executor.pool import WorkerPool
 from mapchete.executor.sequential import SequentialExecutor
 
-__all__ = ["MULTIPROCESSING_DEFAULT_START_METHOD", "MFuture"]
+__all__ = ["MULTIPROCESSING_DEFAULT_START_METHOD", "MFuture", "WorkerPool"]
 
 
 def get_executor(
@@ -24,6 +24,7 @@ from typing import (
 from distributed import Client
 
 from mapchete.executor.future import FutureProtocol, MFuture
+from mapchete.executor.submission import SubmissionStats
 from mapchete.executor.types import Profiler, Result
 
 logger = logging.getLogger(__name__)
@@ -37,6 +38,8 @@ class ExecutorBase(ABC):
     profilers: List[Profiler]
     _cached_executor = None
     _executor_cls = None
+    _owns_executor: bool = True
+    submission_stats: Optional[SubmissionStats] = None
     _executor_args: Tuple
     _executor_kwargs: Dict[str, Any]
 
@@ -157,6 +160,13 @@ class ExecutorBase(ABC):
 
     def __exit__(self, *args):
         """Exit context manager."""
+        if not self._owns_executor:
+            # only release own futures, the shared executor keeps running
+            for future in self.futures:
+                future.cancel()  # type: ignore
+            self.futures = set()
+            logger.debug("released shared executor %s", self._executor)
+            return
         logger.debug("closing executor %s...", self._executor)
         try:
             if self._cached_executor:
@@ -19,15 +19,24 @@ from typing import (
     List,
     Literal,
     Optional,
+    Set,
     Tuple,
+    Union,
     cast,
 )
 
 from mapchete.errors import JobCancelledError
 from mapchete.executor.base import ExecutorBase
 from mapchete.executor.future import FutureProtocol, MFuture
+from mapchete.executor.shared_memory import register_shared_memory_reducers
+from mapchete.executor.submission import (
+    SubmissionController,
+    result_nbytes,
+    run_chunk,
+)
 from mapchete.executor.types import Profiler
 from mapchete.log import set_log_level
+from mapchete.settings import mapchete_options
 from mapchete.timer import Timer
 
 logger = logging.getLogger(__name__)
@@ -46,6 +55,7 @@ class ConcurrentFuturesExecutor(ExecutorBase):
         concurrency="processes",
         multiprocessing_start_method=None,
         profilers: Optional[List[Profiler]] = None,
+        pool: Optional[Union[ProcessPoolExecutor, ThreadPoolExecutor]] = None,
         **kwargs,
     ):
         """Set attributes."""
@@ -53,6 +63,14 @@ class ConcurrentFuturesExecutor(ExecutorBase):
         self.profilers = profilers or []
         self._executor_args = ()
         self._executor_kwargs = dict()
+        if pool is not None:
+            # use running pool without shutting it down on exit
+            self._cached_executor = pool
+            self._executor_cls = type(pool)
+            self._owns_executor = False
+            self.max_workers = pool._max_workers
+            logger.debug("init ConcurrentFuturesExecutor using existing %s", pool)
+            return
         start_method = (
             multiprocessing_start_method or MULTIPROCESSING_DEFAULT_START_METHOD
         )
@@ -71,7 +89,13 @@ class ConcurrentFuturesExecutor(ExecutorBase):
             self._executor_cls = ProcessPoolExecutor
             if sys.version_info >= (3, 7):
                 self._executor_kwargs.update(
-                    mp_context=multiprocessing.get_context(method=start_method)
+                    mp_context=multiprocessing.get_context(method=start_method),
+                    # large task outputs are sent back via shared memory
+                    initializer=initialize_process_worker,
+                    initargs=(
+                        logger.getEffectiveLevel(),
+                        mapchete_options.shared_memory_min_bytes,
+                    ),
                 )
                 if start_method != "spawn":  # pragma: no cover
                     warnings.warn(
@@ -106,9 +130,24 @@ class ConcurrentFuturesExecutor(ExecutorBase):
         fkwargs: Optional[Dict[str, Any]] = None,
         item_skip_bool: bool = False,
         max_submitted_tasks: int = 100,
+        chunksize: Optional[int] = None,
         **__,
     ) -> Generator[MFuture, None, None]:
-        """Submit tasks to executor and start yielding finished futures."""
+        """
+        Submit tasks to executor and start yielding finished futures.
+
+        The number of tasks in flight and the number of tasks sent to a worker in one
+        submission are adapted to the observed task durations and result sizes (see
+        SubmissionController). The current state is available as submission_stats.
+
+        Parameters
+        ----------
+        max_submitted_tasks : int
+            Maximum number of submissions in flight.
+        chunksize : int
+            Fixed number of tasks per submission. By default, cheap tasks are chunked
+            adaptively.
+        """
         fargs = fargs or ()
         fkwargs = fkwargs or {}
 
@@ -121,29 +160,53 @@ class ConcurrentFuturesExecutor(ExecutorBase):
             if item_skip_bool
             else ((item, False, None) for item in iterable)
         )
-        futures = set()
+        futures: Set[Future] = set()
+        controller = SubmissionController(
+            workers=self.max_workers,
+            max_submitted_tasks=max_submitted_tasks,
+            chunksize=chunksize,
+            chunk_duration=mapchete_options.executor_chunk_duration,
+            max_in_flight_bytes=mapchete_options.executor_max_in_flight_bytes,
+        )
+        self.submission_stats = controller.stats
+        func = self.func_partial(func, fargs=fargs, fkwargs=fkwargs)
 
-        logger.debug("submitting tasks to executor")
+        def _submit_next() -> Generator[MFuture, None, None]:
+            # fill submission window with chunks of tasks
+            chunk: List[Any] = []
+            # don't submit any more until there are finished futures
+            while controller.free_slots(pending=len(chunk)) > 0:
+                if self.cancel_signal:  # pragma: no cover
+                    raise JobCancelledError("cancel signal caught")
+                try:
+                    item, skip_item, skip_info = next(item_skip_tuples)
+                except StopIteration:
+                    # nothing left to submit
+                    break
 
-        try:
-            with Timer() as duration:
-                for item, skip_item, skip_info in item_skip_tuples:
-                    if self.cancel_signal:  # pragma: no cover
-                        raise JobCancelledError("cancel signal caught")
+                # skip task submission if option is activated
+                if skip_item:
+                    yield MFuture.skip(skip_info=skip_info, result=item)
+                    continue
 
-                    # skip task submission if option is activated
-                    if skip_item:
-                        yield MFuture.skip(skip_info=skip_info, result=item)
+                chunk.append(item)
+                if len(chunk) == controller.chunksize:
+                    futures.add(self._submit_chunk(func, chunk))
+                    controller.submitted(len(chunk))
+                    chunk = []
+            if chunk:
+                futures.add(self._submit_chunk(func, chunk))
+                controller.submitted(len(chunk))
 
-                    # submit to executor
-                    else:
-                        futures.add(self._submit(func, item, fargs, fkwargs))
+        logger.debug("submitting tasks to executor")
 
-                        # don't submit any more until there are finished futures
-                        if len(futures) == max_submitted_tasks:
-                            break
+        try:
+            with Timer() as duration:
+                yield from _submit_next()
 
-            logger.debug("first %s tasks submitted in %s", len(futures), duration)
+            logger.debug(
+                "first %s tasks submitted in %s", controller.stats.in_flight, duration
+            )
 
             while futures:
                 if self.cancel_signal:  # pragma: no cover
@@ -157,26 +220,22 @@ class ConcurrentFuturesExecutor(ExecutorBase):
                     if self.cancel_signal:  # pragma: no cover
                         raise JobCancelledError("cancel signal caught")
 
-                    yield self.to_mfuture(cast(FutureProtocol, future))
-
                     # we don't need this future anymore
                     futures.remove(future)
 
-                    # immediately submit next task from iterator
-                    try:
-                        item, skip_item, skip_info = next(item_skip_tuples)
-
-                        # skip task submission if option is activated
-                        if skip_item:  # pragma: no cover
-                            yield MFuture.skip(skip_info=skip_info, result=item)
+                    if future.exception() is not None:
+                        # raises task exception
+                        yield self.to_mfuture(cast(FutureProtocol, future))
 
-                        # submit to executor
-                        else:
-                            futures.add(self._submit(func, item, fargs, fkwargs))
+                    self.futures.discard(future)  # type: ignore
+                    for result, task_duration in future.result():
+                        controller.finished(task_duration, result_nbytes(result))
+                        mfuture = MFuture(result=result, profiling=result.profiling)
+                        mfuture.raise_if_failed()
+                        yield mfuture
 
-                    except StopIteration:
-                        # nothing left to submit
-                        pass
+                # immediately submit next tasks from iterator
+                yield from _submit_next()
 
             if self.cancel_signal:  # pragma: no cover
                 raise JobCancelledError("cancel signal caught")
@@ -192,10 +251,8 @@ class ConcurrentFuturesExecutor(ExecutorBase):
             )
         ]
 
-    def _submit(self, func: Callable, item: Any, fargs: tuple, fkwargs: dict) -> Future:
-        future = self._executor.submit(
-            self.func_partial(func, fargs=fargs, fkwargs=fkwargs), item
-        )
+    def _submit_chunk(self, func: Callable, items: List[Any]) -> Future:
+        future = self._executor.submit(run_chunk, func, items)
         self.futures.add(future)  # type: ignore
         return future  # type: ignore
 
@@ -209,3 +266,9 @@ class ConcurrentFuturesExecutor(ExecutorBase):
             timeout=timeout,
             return_when=return_when,
         )
+
+
+def initialize_process_worker(loglevel: int, shared_memory_min_bytes: int = 0) -> None:
+    """Set log level of process worker and register shared memory reducers."""
+    set_log_level(loglevel)
+    register_shared_memory_reducers(shared_memory_min_bytes)
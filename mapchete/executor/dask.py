@@ -5,12 +5,14 @@ from sys import getsizeof
 from typing import (
     Any,
     Callable,
+    Dict,
     Generator,
     Iterable,
     List,
     Literal,
     Optional,
     Set,
+    Tuple,
     Union,
     cast,
 )
@@ -223,6 +225,24 @@ class DaskExecutor(ExecutorBase):
             for future in task_manager.finished_futures():
                 yield future
 
+    def compute_task_graph_chunks(
+        self,
+        graph_chunks: Iterable[Tuple[str, Dict[str, tuple]]],
+        with_results: bool = False,
+        raise_errors: bool = False,
+    ) -> Generator[MFuture, None, None]:
+        """
+        Submit task graph chunk by chunk and yield finished futures meanwhile.
+
+        See Tasks.to_dask_graph_chunks() for the chunk format.
+        """
+        with TaskManager(
+            self, with_results=with_results, raise_errors=raise_errors
+        ) as task_manager:
+            yield from task_manager.submit_graph_chunks(graph_chunks)
+            for future in task_manager.finished_futures():
+                yield future
+
     def raise_if_cancelled(self):
         if self.cancel_signal:  # pragma: no cover
             raise JobCancelledError("cancel signal caught")
@@ -356,21 +376,85 @@ class TaskManager:
             self.remote_futures_count += len(futures)
             self.total_futures_count += len(futures)
 
+    def submit_graph_chunks(
+        self, graph_chunks: Iterable[Tuple[str, Dict[str, tuple]]]
+    ) -> Generator[MFuture, None, None]:
+        """
+        Submit graph chunks and yield futures which finish during submission.
+
+        Only futures of the current and the previous batch are referenced, so results
+        can be released on the cluster once their dependent tasks are submitted.
+        """
+        previous_futures: Dict[str, Future] = {}
+        current_futures: Dict[str, Future] = {}
+        current_batch = None
+        with Timer() as duration:
+            for batch_id, chunk in graph_chunks:
+                self.executor.raise_if_cancelled()
+                if batch_id != current_batch:
+                    previous_futures, current_futures = current_futures, {}
+                    current_batch = batch_id
+                # dask only resolves futures if they are not nested too deep
+                graph = {
+                    key: (
+                        _run_with_dependencies,
+                        func,
+                        task,
+                        fkwargs,
+                        list(dependencies.keys()),
+                        [
+                            previous_futures[dependency_key]
+                            for dependency_key in dependencies.values()
+                        ],
+                    )
+                    for key, (func, task, fkwargs, dependencies) in chunk.items()
+                }
+                logger.debug("submit %s tasks of batch %s", len(graph), batch_id)
+                futures = self.executor._executor.get(
+                    graph, list(graph.keys()), sync=False
+                )
+                current_futures.update(zip(graph.keys(), futures))
+                self.as_completed_iterator.update(futures)
+                self.remote_futures_count += len(futures)
+                self.total_futures_count += len(futures)
+
+                # don't wait until everything is submitted to report progress
+                if self.as_completed_iterator.has_ready():
+                    yield from self._to_mfutures(
+                        self.as_completed_iterator.next_batch(block=False)
+                    )
+        logger.debug(
+            "%s tasks submitted in chunks in %s", self.total_futures_count, duration
+        )
+
     def finished_futures(self) -> Generator[MFuture, None, None]:
         self.executor.raise_if_cancelled()
 
         for batch in self.as_completed_iterator.batches():
-            logger.debug("%s future(s) done", len(batch))
+            yield from self._to_mfutures(batch)
 
-            for future in batch:
-                self.executor.raise_if_cancelled()
+    def _to_mfutures(self, batch: list) -> Generator[MFuture, None, None]:
+        logger.debug("%s future(s) done", len(batch))
 
-                if self.with_results:
-                    future, result = future
-                else:
-                    result = None
-                self.remote_futures_count -= 1
+        for future in batch:
+            self.executor.raise_if_cancelled()
 
-                yield self.executor.to_mfuture(
-                    cast(FutureProtocol, future), result=result
-                )
+            if self.with_results:
+                future, result = future
+            else:
+                result = None
+            self.remote_futures_count -= 1
+
+            yield self.executor.to_mfuture(cast(FutureProtocol, future), result=result)
+
+
+def _run_with_dependencies(
+    func: Callable,
+    task: Any,
+    fkwargs: dict,
+    dependency_ids: List[Any],
+    dependency_results: List[Any],
+) -> Any:
+    return func(
+        task, dependencies=dict(zip(dependency_ids, dependency_results)), **fkwargs
+    )
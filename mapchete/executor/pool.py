@@ -0,0 +1,175 @@
+"""Long-lived worker pools which can be shared by multiple executors."""
+
+from __future__ import annotations
+
+import logging
+import multiprocessing
+import os
+import threading
+import warnings
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, wait
+from importlib import import_module
+from typing import Iterable, Optional, Tuple, Union
+
+from mapchete.enums import Concurrency
+from mapchete.executor.concurrent_futures import (
+    MULTIPROCESSING_DEFAULT_START_METHOD,
+    ConcurrentFuturesExecutor,
+    initialize_process_worker,
+)
+from mapchete.settings import mapchete_options
+from mapchete.timer import Timer
+
+logger = logging.getLogger(__name__)
+
+# modules every worker needs to execute tile tasks
+WORKER_PRELOAD_MODULES = (
+    "rasterio",
+    "fiona",
+    "mapchete.processing.execute",
+    "mapchete.processing.tasks",
+    "mapchete.formats.default.gtiff",
+)
+
+
+class WorkerPool:
+    """
+    Pool of pre-initialized workers which is reused by successive executors.
+
+    Creating a ProcessPoolExecutor using the "spawn" start method means every worker has
+    to import mapchete, rasterio, GDAL and the user process module again. A WorkerPool
+    starts its workers once and can then be passed as executor_getter to execute(),
+    cp(), rm() and convert(). Every call gets a ConcurrentFuturesExecutor bound to the
+    same workers, which does not shut them down when closed. This way the pool is reused
+    across retries, zoom levels and commands.
+
+    Additional modules, e.g. user process modules or process file paths, can be
+    imported in every worker when it starts by passing them as preload.
+
+    If the underlying pool breaks, e.g. because a worker was killed, it is replaced
+    when the next executor is requested.
+
+    Example
+    -------
+    >>> with WorkerPool(max_workers=8, preload=["my_package.process"]) as pool:
+    ...     execute("first.mapchete", concurrency="processes", executor_getter=pool)
+    ...     execute("second.mapchete", concurrency="processes", executor_getter=pool)
+    """
+
+    def __init__(
+        self,
+        concurrency: Concurrency = Concurrency.processes,
+        max_workers: Optional[int] = None,
+        multiprocessing_start_method: str = MULTIPROCESSING_DEFAULT_START_METHOD,
+        preload: Iterable[str] = (),
+    ):
+        if concurrency not in [Concurrency.processes, Concurrency.threads]:
+            raise ValueError("concurrency must either be 'processes' or 'threads'")
+        self.concurrency = Concurrency[concurrency]
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.multiprocessing_start_method = multiprocessing_start_method
+        self.preload = tuple(preload)
+        self._pool: Optional[Union[ProcessPoolExecutor, ThreadPoolExecutor]] = None
+        self._lock = threading.Lock()
+
+    @property
+    def pool(self) -> Union[ProcessPoolExecutor, ThreadPoolExecutor]:
+        """Underlying pool, (re)started if not running."""
+        with self._lock:
+            if self._pool is None or getattr(self._pool, "_broken", False):
+                if self._pool is not None:
+                    logger.warning("worker pool is broken, starting a new one")
+                    self._pool.shutdown(wait=False, cancel_futures=True)
+                self._pool = self._start()
+            return self._pool
+
+    def __call__(
+        self,
+        *_,
+        concurrency: Optional[Union[Concurrency, str]] = None,
+        max_workers: Optional[int] = None,
+        **kwargs,
+    ) -> ConcurrentFuturesExecutor:
+        """
+        Return executor using the workers of this pool.
+
+        This can be used as a drop-in executor_getter. Besides profilers, all arguments
+        are ignored and a warning is issued if the requested concurrency or number of
+        workers differ from the pool settings.
+        """
+        if concurrency is not None and Concurrency[concurrency] != self.concurrency:
+            warnings.warn(
+                UserWarning(
+                    f"{concurrency} concurrency requested but using workers of "
+                    f"{self.concurrency.value} pool"
+                )
+            )
+        if max_workers is not None and max_workers != self.max_workers:
+            warnings.warn(
+                UserWarning(
+                    f"{max_workers} workers requested but using pool of "
+                    f"{self.max_workers} workers"
+                )
+            )
+        return ConcurrentFuturesExecutor(
+            concurrency=self.concurrency.value,
+            pool=self.pool,
+            profilers=kwargs.get("profilers"),
+        )
+
+    def close(self) -> None:
+        """Shut down all workers."""
+        with self._lock:
+            if self._pool is not None:
+                logger.debug("shutting down %s", self)
+                self._pool.shutdown(wait=True)
+                self._pool = None
+
+    def __enter__(self) -> WorkerPool:
+        self.pool
+        return self
+
+    def __exit__(self, *_) -> None:
+        self.close()
+
+    def _start(self) -> Union[ProcessPoolExecutor, ThreadPoolExecutor]:
+        initargs = (logger.getEffectiveLevel(), self.preload)
+        with Timer() as duration:
+            if self.concurrency == Concurrency.processes:
+                initargs += (mapchete_options.shared_memory_min_bytes,)
+                pool = ProcessPoolExecutor(
+                    max_workers=self.max_workers,
+                    mp_context=multiprocessing.get_context(
+                        method=self.multiprocessing_start_method
+                    ),
+                    initializer=initialize_worker,
+                    initargs=initargs,
+                )
+                # workers are only spawned on the first submission, so start them now
+                wait([pool.submit(os.getpid) for _ in range(self.max_workers)])
+            else:
+                initialize_worker(*initargs)
+                pool = ThreadPoolExecutor(max_workers=self.max_workers)
+        logger.debug("started %s workers in %s", self.max_workers, duration)
+        return pool
+
+    def __repr__(self):  # pragma: no cover
+        return (
+            f"<WorkerPool concurrency={self.concurrency.value}, "
+            f"max_workers={self.max_workers}, running={self._pool is not None}>"
+        )
+
+
+def initialize_worker(
+    loglevel: int, preload: Tuple[str, ...] = (), shared_memory_min_bytes: int = 0
+) -> None:
+    """Set log level and import modules required to execute tasks."""
+    initialize_process_worker(loglevel, shared_memory_min_bytes)
+    for module in WORKER_PRELOAD_MODULES:
+        import_module(module)
+    if preload:
+        from mapchete.config.process_func import ProcessFunc
+
+        for process in preload:
+            # loading the process function caches its module in this worker
+            ProcessFunc(process)
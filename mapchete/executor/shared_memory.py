@@ -0,0 +1,159 @@
+"""
+Transfer large arrays from process pool workers to the parent via shared memory.
+
+Results of tasks executed in a ProcessPoolExecutor are pickled by the worker and
+unpickled by the parent process. For process tiles whose output is needed in the parent
+(e.g. to build overviews from or to write in the parent process), this means the whole
+array is serialized into the result pipe and copied again when reading it.
+
+Once registered in a worker, arrays above a size threshold are instead copied once into a
+shared memory segment and only a small SharedArray handle is pickled. The parent maps the
+segment and reconstructs the (masked) array without copying.
+
+Lifecycle of a segment:
+
+1. The worker creates the segment, copies the array data and mask into it and closes its
+   own mapping. The segment stays registered with the resource tracker shared with the
+   parent, so it is removed at exit even if the result never arrives.
+2. The parent maps the segment when unpickling the result and immediately unlinks it.
+3. The mapping is closed once the reconstructed array and all views on it are garbage
+   collected. Arrays kept by the parent (e.g. cached for overviews) therefore occupy
+   shared memory as long as they are referenced.
+
+Writing into a segment beyond the size of the shared memory filesystem kills the worker
+(SIGBUS) instead of raising an error, so segments are only created if the filesystem has
+enough free space and arrays are pickled as usual otherwise.
+"""
+
+from __future__ import annotations
+
+import errno
+import logging
+import os
+import pickle
+import weakref
+from dataclasses import dataclass
+from multiprocessing.reduction import ForkingPickler
+from multiprocessing.shared_memory import SharedMemory
+from typing import Any, Optional, Tuple, Union
+
+import numpy as np
+import numpy.ma as ma
+
+logger = logging.getLogger(__name__)
+
+# align mask behind array data
+_ALIGNMENT = 64
+# mount point of POSIX shared memory on Linux
+_SHM_PATH = "/dev/shm"
+
+
+def _shared_memory_free_bytes() -> Optional[int]:
+    """Return free space of the shared memory filesystem if it can be determined."""
+    try:
+        stats = os.statvfs(_SHM_PATH)
+    except (AttributeError, OSError):
+        return None
+    return stats.f_bavail * stats.f_frsize
+
+
+@dataclass(frozen=True)
+class SharedArray:
+    """Handle of an array stored in a shared memory segment."""
+
+    name: str
+    shape: Tuple[int, ...]
+    dtype: str
+    mask_offset: Optional[int] = None
+    fill_value: Any = None
+
+    @property
+    def masked(self) -> bool:
+        return self.mask_offset is not None
+
+    @staticmethod
+    def from_array(array: Union[np.ndarray, ma.MaskedArray]) -> SharedArray:
+        """Copy array into a new shared memory segment."""
+        data = ma.getdata(array)
+        mask = ma.getmask(array) if isinstance(array, ma.MaskedArray) else None
+        mask_offset = (
+            None
+            if mask is None
+            else -(-data.nbytes // _ALIGNMENT) * _ALIGNMENT  # round up
+        )
+        size = data.nbytes if mask_offset is None else mask_offset + data.size
+        free_bytes = _shared_memory_free_bytes()
+        if free_bytes is not None and size > free_bytes:
+            raise OSError(
+                errno.ENOSPC,
+                f"{size} bytes requested but only {free_bytes} bytes free in shared memory",
+            )
+        shm = SharedMemory(create=True, size=max(size, 1))
+        try:
+            buffer = np.ndarray((max(size, 1),), dtype=np.uint8, buffer=shm.buf)
+            np.ndarray(data.shape, dtype=data.dtype, buffer=buffer)[...] = data
+            if mask_offset is not None:
+                np.ndarray(data.shape, dtype=bool, buffer=buffer, offset=mask_offset)[
+                    ...
+                ] = mask
+            del buffer
+            return SharedArray(
+                name=shm.name,
+                shape=data.shape,
+                dtype=data.dtype.str,
+                mask_offset=mask_offset,
+                fill_value=array.fill_value if mask_offset is not None else None,
+            )
+        finally:
+            # only close the mapping of this process, the segment is unlinked after
+            # it was attached by the receiving process
+            shm.close()
+
+    def to_array(self) -> Union[np.ndarray, ma.MaskedArray]:
+        """
+        Map segment and return array without copying.
+
+        The segment is unlinked, so this can only be called once.
+        """
+        shm = SharedMemory(name=self.name)
+        shm.unlink()
+        buffer = np.ndarray((shm.size,), dtype=np.uint8, buffer=shm.buf)
+        # close mapping once all arrays referencing it are gone
+        weakref.finalize(buffer, shm.close)
+        data = np.ndarray(self.shape, dtype=np.dtype(self.dtype), buffer=buffer)
+        if not self.masked:
+            return data
+        mask = np.ndarray(
+            self.shape, dtype=bool, buffer=buffer, offset=self.mask_offset
+        )
+        return ma.MaskedArray(
+            data, mask=mask, fill_value=self.fill_value, copy=False, keep_mask=True
+        )
+
+
+def register_shared_memory_reducers(min_bytes: int = 0) -> None:
+    """
+    Send arrays of at least min_bytes through shared memory when pickling them for
+    another process.
+
+    This affects everything the current process sends using multiprocessing and is
+    therefore only meant to be called in process pool workers.
+    """
+    if not min_bytes:
+        return
+
+    def _reduce(array: Union[np.ndarray, ma.MaskedArray]):
+        if array.nbytes >= min_bytes and not array.dtype.hasobject:
+            try:
+                return _rebuild_array, (SharedArray.from_array(array),)
+            except OSError as exc:
+                logger.debug("cannot use shared memory, pickle array: %s", exc)
+        return array.__reduce_ex__(pickle.DEFAULT_PROTOCOL)
+
+    logger.debug("send arrays above %s bytes via shared memory", min_bytes)
+    ForkingPickler.register(np.ndarray, _reduce)
+    ForkingPickler.register(ma.MaskedArray, _reduce)
+
+
+def _rebuild_array(shared_array: SharedArray) -> Union[np.ndarray, ma.MaskedArray]:
+    return shared_array.to_array()
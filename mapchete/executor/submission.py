@@ -0,0 +1,171 @@
+"""Adaptive sizing of task submissions to a concurrent.futures executor."""
+
+from __future__ import annotations
+
+import logging
+import math
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, List, Optional, Tuple
+
+from mapchete.executor.types import Result
+
+logger = logging.getLogger(__name__)
+
+# tasks kept queued per worker, so workers do not idle while results are handled
+QUEUED_PER_WORKER = 2
+
+# weight of new observations in the moving averages of task duration and result size
+SMOOTHING = 0.2
+
+
+@dataclass
+class SubmissionStats:
+    """Current state of the submission controller."""
+
+    window: int
+    chunksize: int = 1
+    # tasks submitted but not yet handed back, i.e. the current queue depth
+    in_flight: int = 0
+    submitted: int = 0
+    finished: int = 0
+    throughput: float = 0.0
+    mean_duration: Optional[float] = None
+    mean_result_nbytes: Optional[float] = None
+
+
+class SubmissionController:
+    """
+    Size the window of tasks in flight and the number of tasks per submission.
+
+    Until the first results arrive, up to max_submitted_tasks tasks are submitted. Then
+    the window is sized from the observed task durations and result sizes:
+
+    - tasks which are cheaper than chunk_duration are submitted in chunks, so each
+      submission keeps a worker busy for about chunk_duration and the parent process
+      spends less time pickling and handling futures
+    - only as many chunks are kept in flight as are needed to keep all workers busy
+    - the estimated memory of results in flight is kept below max_in_flight_bytes,
+      but at least one task per worker is submitted
+
+    If chunksize is given, it is used instead of the adaptive chunk size.
+    """
+
+    def __init__(
+        self,
+        workers: int,
+        max_submitted_tasks: int = 100,
+        chunksize: Optional[int] = None,
+        chunk_duration: float = 0.1,
+        max_chunksize: int = 256,
+        max_in_flight_bytes: Optional[int] = None,
+    ):
+        self.workers = max(workers, 1)
+        self.max_submitted_tasks = max(max_submitted_tasks, 1)
+        self.chunk_duration = chunk_duration
+        self.max_chunksize = max_chunksize
+        self.max_in_flight_bytes = max_in_flight_bytes
+        self._fixed_chunksize = chunksize
+        self.stats = SubmissionStats(
+            window=self.max_submitted_tasks * (chunksize or 1),
+            chunksize=chunksize or 1,
+        )
+        self._start = time.perf_counter()
+
+    @property
+    def window(self) -> int:
+        """Maximum number of tasks in flight."""
+        return self.stats.window
+
+    @property
+    def chunksize(self) -> int:
+        """Number of tasks per submission."""
+        return self.stats.chunksize
+
+    def free_slots(self, pending: int = 0) -> int:
+        """Number of tasks which can be submitted now."""
+        return self.window - self.stats.in_flight - pending
+
+    def submitted(self, tasks: int) -> None:
+        self.stats.in_flight += tasks
+        self.stats.submitted += tasks
+
+    def finished(self, duration: Optional[float], result_nbytes: int) -> None:
+        """Register a finished task and adapt window."""
+        self.stats.in_flight -= 1
+        self.stats.finished += 1
+        self.stats.throughput = self.stats.finished / max(
+            time.perf_counter() - self._start, 1e-9
+        )
+        if duration is not None:
+            self.stats.mean_duration = _moving_average(
+                self.stats.mean_duration, duration
+            )
+        self.stats.mean_result_nbytes = _moving_average(
+            self.stats.mean_result_nbytes, result_nbytes
+        )
+        self._adapt()
+
+    def _adapt(self) -> None:
+        chunksize = self._fixed_chunksize or self._adaptive_chunksize()
+        window = (
+            min(self.max_submitted_tasks, self.workers * (QUEUED_PER_WORKER + 1))
+            * chunksize
+        )
+        if self.max_in_flight_bytes and self.stats.mean_result_nbytes:
+            window = min(
+                window,
+                max(
+                    self.workers,
+                    int(self.max_in_flight_bytes // self.stats.mean_result_nbytes),
+                ),
+            )
+        chunksize = max(min(chunksize, window // self.workers), 1)
+        if (window, chunksize) != (self.stats.window, self.stats.chunksize):
+            logger.debug(
+                "adapt submission window from %s to %s tasks in chunks of %s",
+                self.stats.window,
+                window,
+                chunksize,
+            )
+            self.stats.window = window
+            self.stats.chunksize = chunksize
+
+    def _adaptive_chunksize(self) -> int:
+        if not self.chunk_duration or not self.stats.mean_duration:
+            return 1
+        return max(
+            min(
+                math.ceil(self.chunk_duration / self.stats.mean_duration),
+                self.max_chunksize,
+            ),
+            1,
+        )
+
+    def __repr__(self):  # pragma: no cover
+        return f"<SubmissionController workers={self.workers}, stats={self.stats}>"
+
+
+def run_chunk(func: Callable, items: List[Any]) -> List[Tuple[Result, float]]:
+    """Run function on each item and return results together with their durations."""
+    results = []
+    for item in items:
+        start = time.perf_counter()
+        result = func(item)
+        results.append((result, time.perf_counter() - start))
+    return results
+
+
+def result_nbytes(result: Any) -> int:
+    """Estimate memory footprint of a task result in bytes."""
+    from mapchete.processing.cache import data_nbytes
+
+    output = result.output if isinstance(result, Result) else result
+    # tile tasks return their output wrapped in a TaskInfo
+    return data_nbytes(getattr(output, "output", output))
+
+
+def _moving_average(average: Optional[float], value: float) -> float:
+    if average is None:
+        return float(value)
+    return (1 - SMOOTHING) * average + SMOOTHING * value
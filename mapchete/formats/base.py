@@ -8,6 +8,7 @@ respective interfaces.
 import logging
 import types
 import warnings
+from functools import cached_property
 from itertools import chain
 from typing import Any, List, Optional, Tuple
 
@@ -19,6 +20,7 @@ from shapely.geometry import shape
 from mapchete.config import get_hash
 from mapchete.errors import MapcheteNodataTile, MapcheteProcessOutputError
 from mapchete.formats import write_output_metadata
+from mapchete.formats.existence_index import TileExistenceIndex
 
 # from mapchete.formats.models import BaseInputParams
 from mapchete.formats.protocols import InputDataProtocol, InputTileProtocol
@@ -61,6 +63,11 @@ class InputTile(InputTileProtocol):
         self.input_key = input_key
         self.preprocessing_tasks_results = {}
 
+    @property
+    def prefetchable(self) -> bool:
+        """Whether reads of this input tile can be issued ahead of processing."""
+        return False
+
     def set_preprocessing_task_result(self, task_key: str, result: Any = None) -> None:
         """
         Adds a preprocessing task result.
@@ -503,6 +510,16 @@ class TileDirectoryOutputReader(OutputDataReader, OutputSTACMixin):
         if output_tile:
             return self.get_path(output_tile).exists()
 
+    @cached_property
+    def existence_index(self) -> TileExistenceIndex:
+        """Persistent index of existing output tiles."""
+        return TileExistenceIndex(
+            path=self.path,
+            pyramid=self.pyramid,
+            tile_path_schema=self.tile_path_schema,
+            file_extension=self.file_extension,
+        )
+
     def _read_as_tiledir(
         self,
         out_tile=None,
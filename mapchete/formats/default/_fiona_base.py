@@ -140,15 +140,21 @@ class OutputDataWriter(base.TileDirectoryOutputWriter, OutputDataReader):
         ----------
         process_tile : ``BufferedTile``
             must be member of process ``TilePyramid``
+
+        Returns
+        -------
+        written_tiles : list
+            output tiles which were written
         """
         if data is None or len(data) == 0:
-            return
+            return []
         if not isinstance(data, (list, types.GeneratorType)):  # pragma: no cover
             raise TypeError(
                 "vector driver data has to be a list or generator of GeoJSON objects"
             )
 
         data = list(data)
+        written_tiles = []
         if not len(data):  # pragma: no cover
             logger.debug("no features to write")
         else:
@@ -157,7 +163,7 @@ class OutputDataWriter(base.TileDirectoryOutputWriter, OutputDataReader):
                 out_path = self.get_path(tile)
                 self.prepare_path(tile)
                 out_tile = BufferedTile(tile, self.pixelbuffer)
-                write_vector_window(
+                if write_vector_window(
                     in_data=data,
                     out_driver=self.METADATA["driver_name"],
                     out_schema=self.output_params["schema"],
@@ -166,7 +172,9 @@ class OutputDataWriter(base.TileDirectoryOutputWriter, OutputDataReader):
                     allow_multipart_geometries=(
                         self.output_params["schema"]["geometry"].startswith("Multi")
                     ),
-                )
+                ):
+                    written_tiles.append(tile)
+        return written_tiles
 
 
 class InputTile(base.InputTile, VectorInput):
@@ -28,6 +28,12 @@ nodata: integer or float
 compress: string
     compression method (default: lzw): lzw, jpeg, packbits, deflate, CCITTRLE,
     CCITTFAX3, CCITTFAX4, lzma
+streaming: bool
+    single file only: write tiles into temporary files on disk, update overviews while
+    writing and assemble the output file on close (default: False)
+tempdir: string
+    single file only: directory for temporary files in streaming mode (default: system
+    temporary directory)
 """
 
 from __future__ import annotations
@@ -41,6 +47,7 @@ from contextlib import ExitStack
 import numpy as np
 from affine import Affine
 from numpy import ma
+from rasterio.enums import Resampling
 from rasterio.rio.overview import get_maximum_overview_level
 from rasterio.windows import from_bounds
 from shapely.geometry import box
@@ -53,6 +60,7 @@ from mapchete.formats.protocols import RasterInput
 from mapchete.io import MPath, path_exists, path_is_remote
 from mapchete.io.profiles import DEFAULT_PROFILES
 from mapchete.io.raster import (
+    RasterioStreamingWriter,
     extract_from_array,
     memory_file,
     prepare_array,
@@ -69,6 +77,16 @@ logger = logging.getLogger(__name__)
 
 METADATA = {"driver_name": "GTiff", "data_type": "raster", "mode": "rw"}
 IN_MEMORY_THRESHOLD = int(os.environ.get("MP_IN_MEMORY_THRESHOLD", 20000 * 20000))
+# single file output parameters which are not GDAL creation options
+_SINGLE_FILE_PARAMETERS = [
+    "cog",
+    "in_memory",
+    "overviews",
+    "overviews_levels",
+    "overviews_resampling",
+    "streaming",
+    "tempdir",
+]
 
 
 class OutputDataReader:
@@ -352,6 +370,11 @@ class GTiffTileDirectoryOutputWriter(
         process_tile : ``BufferedTile``
             must be member of process ``TilePyramid``
         data : ``np.ndarray``
+
+        Returns
+        -------
+        written_tiles : list
+            output tiles which were written
         """
         if isinstance(data, tuple) and len(data) == 2 and isinstance(data[1], dict):
             data, tags = data
@@ -364,6 +387,7 @@ class GTiffTileDirectoryOutputWriter(
             dtype=self.profile(process_tile)["dtype"],
         )
 
+        written_tiles = []
         if data.mask.all():
             logger.debug("data empty, nothing to write")
         else:
@@ -372,14 +396,16 @@ class GTiffTileDirectoryOutputWriter(
                 out_path = self.get_path(tile)
                 self.prepare_path(tile)
                 out_tile = BufferedTile(tile, self.pixelbuffer)
-                write_raster_window(
+                if write_raster_window(
                     in_grid=process_tile,
                     in_data=data,
                     out_profile=self.profile(out_tile),
                     out_grid=out_tile,
                     out_path=out_path,
                     tags=tags,
-                )
+                ):
+                    written_tiles.append(tile)
+        return written_tiles
 
     @property
     def stac_asset_type(self):
@@ -403,6 +429,7 @@ class GTiffSingleFileOutputWriter(
         self.zoom = output_params["delimiters"]["zoom"][0]
         self.cog = output_params.get("cog", False)
         self.in_memory = output_params.get("in_memory", True)
+        self.streaming = output_params.get("streaming", False)
 
     @property
     def stac_asset_type(self):  # pragma: no cover
@@ -432,7 +459,9 @@ class GTiffSingleFileOutputWriter(
         logger.debug("output raster bounds: %s", bounds)
         logger.debug("output raster shape: %s, %s", height, width)
         creation_options = {
-            k: v for k, v in self.output_params.items() if k not in _OUTPUT_PARAMETERS
+            k: v
+            for k, v in self.output_params.items()
+            if k not in _OUTPUT_PARAMETERS + _SINGLE_FILE_PARAMETERS
         }
         self._profile = DEFAULT_PROFILES["COG" if self.cog else "GTiff"](
             transform=Affine(
@@ -506,9 +535,27 @@ class GTiffSingleFileOutputWriter(
         # create output directory if necessary
         logger.debug("open output file: %s", self.path)
         self._ctx = ExitStack()
-        self.dst = self._ctx.enter_context(
-            rasterio_write(self.path, "w+", **self._profile)
-        )
+        if self.streaming:
+            logger.debug("stream output into temporary files")
+            self.dst = self._ctx.enter_context(
+                RasterioStreamingWriter(
+                    self.path,
+                    overviews_levels=self.overviews_levels if self.overviews else None,
+                    overviews_resampling=(
+                        self.overviews_resampling
+                        if self.overviews
+                        else Resampling.nearest
+                    ),
+                    tempdir=self.output_params.get("tempdir"),
+                    **self._profile,
+                )
+            )
+        else:
+            self.dst = self._ctx.enter_context(
+                rasterio_write(
+                    self.path, "w+", in_memory=self.in_memory, **self._profile
+                )
+            )
 
     def read(self, output_tile, **kwargs):
         """
@@ -626,16 +673,17 @@ class GTiffSingleFileOutputWriter(
         try:
             # only in case no Exception was raised
             if exc_type is None:
-                # build overviews
                 if self.overviews and self.dst is not None:
-                    logger.debug(
-                        "build overviews using %s resampling and levels %s",
-                        self.overviews_resampling,
-                        self.overviews_levels,
-                    )
-                    self.dst.build_overviews(
-                        self.overviews_levels, self.overviews_resampling
-                    )
+                    # in streaming mode overviews are already written
+                    if not self.streaming:
+                        logger.debug(
+                            "build overviews using %s resampling and levels %s",
+                            self.overviews_resampling,
+                            self.overviews_levels,
+                        )
+                        self.dst.build_overviews(
+                            self.overviews_levels, self.overviews_resampling
+                        )
                     self.dst.update_tags(
                         OVR_RESAMPLING_ALG=self.overviews_resampling.name.upper()
                     )
@@ -226,10 +226,16 @@ class OutputDataWriter(base.OutputDataWriter, OutputDataReader):
         ----------
         process_tile : ``BufferedTile``
             must be member of process ``TilePyramid``
+
+        Returns
+        -------
+        written_tiles : list
+            output tiles which were written
         """
         rgba = self._prepare_array_for_png(data)
         data = ma.masked_where(rgba == self.output_params["nodata"], rgba)
 
+        written_tiles = []
         if data.mask.all():
             logger.debug("data empty, nothing to write")
         else:
@@ -238,10 +244,12 @@ class OutputDataWriter(base.OutputDataWriter, OutputDataReader):
                 out_path = self.get_path(tile)
                 self.prepare_path(tile)
                 out_tile = BufferedTile(tile, self.pixelbuffer)
-                write_raster_window(
+                if write_raster_window(
                     in_grid=process_tile,
                     in_data=data,
                     out_profile=self.profile(out_tile),
                     out_grid=out_tile,
                     out_path=out_path,
-                )
+                ):
+                    written_tiles.append(tile)
+        return written_tiles
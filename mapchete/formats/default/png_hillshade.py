@@ -208,9 +208,15 @@ class OutputDataWriter(base.OutputDataWriter, OutputDataReader):
         ----------
         process_tile : ``BufferedTile``
             must be member of process ``TilePyramid``
+
+        Returns
+        -------
+        written_tiles : list
+            output tiles which were written
         """
         data = self._prepare_array(data)
 
+        written_tiles = []
         if data.mask.all():  # pragma: no cover
             logger.debug("data empty, nothing to write")
         else:
@@ -219,10 +225,12 @@ class OutputDataWriter(base.OutputDataWriter, OutputDataReader):
                 out_path = self.get_path(tile)
                 self.prepare_path(tile)
                 out_tile = BufferedTile(tile, self.pixelbuffer)
-                write_raster_window(
+                if write_raster_window(
                     in_grid=process_tile,
                     in_data=data,
                     out_profile=self.profile(out_tile),
                     out_grid=out_tile,
                     out_path=out_path,
-                )
+                ):
+                    written_tiles.append(tile)
+        return written_tiles
@@ -26,6 +26,7 @@ from mapchete.io.raster import (
 )
 from mapchete.geometry import reproject_geometry, segmentize_geometry
 from mapchete.path import MPath
+from mapchete.processing.prefetch import read_prefetched
 
 logger = logging.getLogger(__name__)
 
@@ -260,6 +261,10 @@ class InputTile(base.InputTile, RasterInput):
         )
         return f"raster_file.InputTile(tile={self.tile.id}, source={source})"
 
+    @property
+    def prefetchable(self) -> bool:
+        return not self._memory_cache_active
+
     def read(self, indexes=None, resampling="nearest", **kwargs):
         """
         Read reprojected & resampled input data.
@@ -304,14 +309,22 @@ class InputTile(base.InputTile, RasterInput):
                 resampling=resampling,
             )
         else:
-            return read_raster_window(
-                self.path,
-                self.tile,
+            return read_prefetched(
+                self,
+                self._read_window,
                 indexes=self._get_band_indexes(indexes),
                 resampling=resampling,
-                gdal_opts=self.gdal_opts,
             )
 
+    def _read_window(self, indexes=None, resampling="nearest"):
+        return read_raster_window(
+            self.path,
+            self.tile,
+            indexes=indexes,
+            resampling=resampling,
+            gdal_opts=self.gdal_opts,
+        )
+
     def is_empty(self, indexes=None):
         """
         Check if there is data within this tile.
@@ -6,7 +6,7 @@ Currently limited by extensions .shp and .geojson but could be extended easily.
 
 import logging
 from functools import cached_property
-from typing import Optional, List, Tuple, Union
+from typing import Hashable, Optional, List, Tuple, Union
 
 from affine import Affine
 import numpy as np
@@ -24,12 +24,15 @@ from mapchete.geometry import to_shape, reproject_geometry
 from mapchete.io import fiona_open
 from mapchete.io.vector import (
     IndexedFeatures,
+    STRtreeFeatures,
     convert_vector,
     read_vector,
     read_vector_window,
 )
+from mapchete.io.vector.cache import path_version, row_window, vector_window_cache
 from mapchete.io.vector.indexed_features import object_geometry
 from mapchete.path import MPath
+from mapchete.processing.prefetch import read_prefetched
 from mapchete.tile import BufferedTile
 from mapchete.types import CRSLike, ShapeLike
 
@@ -121,7 +124,7 @@ class InputData(base.InputData):
                 self.add_preprocessing_task(
                     read_vector,
                     key=f"cache_{self.path}",
-                    fkwargs=dict(path=self.path, index=None),
+                    fkwargs=dict(path=self.path, index="strtree"),
                     geometry=self.bbox(),
                 )
             else:  # pragma: no cover
@@ -130,9 +133,22 @@ class InputData(base.InputData):
                 )
 
     @cached_property
-    def in_memory_features(self) -> IndexedFeatures:
+    def in_memory_features(self) -> STRtreeFeatures:
         """This property can be accessed once the preprocessing task is finished."""
-        return IndexedFeatures(self.get_preprocessing_task_result(f"cache_{self.path}"))
+        features = self.get_preprocessing_task_result(f"cache_{self.path}")
+        if isinstance(features, STRtreeFeatures):
+            return features
+        return STRtreeFeatures(features)  # pragma: no cover
+
+    @cached_property
+    def file_version(self) -> Optional[Hashable]:
+        """
+        Version of the file read by input tiles.
+
+        It is determined once the first tile is opened, i.e. after the file was cached
+        by a preprocessing task, and handed to all tiles of this process run.
+        """
+        return path_version(MPath.from_inp(self._cached_path or self.path))
 
     def open(self, tile: BufferedTile, **kwargs):
         """
@@ -150,14 +166,10 @@ class InputData(base.InputData):
         if self._memory_cache_active and self.preprocessing_task_finished(
             self._cache_task
         ):
-            tile_features = IndexedFeatures(
-                self.in_memory_features.filter(
-                    reproject_geometry(
-                        tile.bbox, src_crs=tile.crs, dst_crs=self.in_memory_features.crs
-                    ).bounds
-                ),
-                crs=self.in_memory_features.crs,
-                index=None,
+            tile_features = self.in_memory_features.subset(
+                reproject_geometry(
+                    tile.bbox, src_crs=tile.crs, dst_crs=self.in_memory_features.crs
+                ).bounds
             )
 
         else:
@@ -168,6 +180,12 @@ class InputData(base.InputData):
             self,
             in_memory_features=tile_features,
             cache_task_key=self._cache_task,
+            # only needed for the vector window cache, which is keyed by file version
+            file_version=(
+                self.file_version
+                if vector_window_cache() is not None and not self._memory_cache_active
+                else None
+            ),
             **kwargs,
         )
 
@@ -240,11 +258,13 @@ class InputTile(base.InputTile, VectorInput):
         input_data: InputData,
         cache_task_key: str,
         in_memory_features: Optional[IndexedFeatures] = None,
+        file_version: Optional[Hashable] = None,
         **kwargs,
     ):
         """Initialize."""
         super().__init__(tile, input_key=input_data.input_key, **kwargs)
         self._cache = {}
+        self.file_version = file_version
         self.bbox = input_data.bbox(out_crs=self.tile.crs)
         self.cache_task_key = cache_task_key
         if input_data._memory_cache_active:
@@ -265,6 +285,10 @@ class InputTile(base.InputTile, VectorInput):
         )
         return f"vector_file.InputTile(tile={self.tile.id}, source={source})"
 
+    @property
+    def prefetchable(self) -> bool:
+        return not self._memory_cache_active
+
     def read(
         self,
         validity_check: bool = True,
@@ -399,16 +423,16 @@ class InputTile(base.InputTile, VectorInput):
     ):
         checked = "checked" if validity_check else "not_checked"
         if checked not in self._cache:
-            self._cache[checked] = list(
-                self._in_memory_features.read(self.tile)
-                if self._memory_cache_active and self._in_memory_features is not None
-                else read_vector_window(
-                    self.path,
-                    self.tile,
+            if self._memory_cache_active and self._in_memory_features is not None:
+                features = self._in_memory_features.read(self.tile)
+            else:
+                features = read_prefetched(
+                    self,
+                    self._read_features,
                     validity_check=validity_check,
                     clip_to_crs_bounds=clip_to_crs_bounds,
                 )
-            )
+            self._cache[checked] = list(features)
         if target_geometry_type:  # pragma: no cover
             return [
                 feature
@@ -416,3 +440,41 @@ class InputTile(base.InputTile, VectorInput):
                 if is_type(object_geometry(feature), target_geometry_type)
             ]
         return self._cache[checked]
+
+    def _read_features(
+        self, validity_check=True, clip_to_crs_bounds=False
+    ) -> List[dict]:
+        window_cache = vector_window_cache()
+        if window_cache is not None and not (
+            self.tile.pixelbuffer and self.tile.is_on_edge()
+        ):
+            return window_cache.read(
+                self.path,
+                self.tile,
+                window=self._prefetch_window(),
+                validity_check=validity_check,
+                clip_to_crs_bounds=clip_to_crs_bounds,
+                file_version=self.file_version,
+            )
+        return list(
+            read_vector_window(
+                self.path,
+                self.tile,
+                validity_check=validity_check,
+                clip_to_crs_bounds=clip_to_crs_bounds,
+            )
+        )
+
+    def _prefetch_window(self) -> Bounds:
+        # tile row across the input data, shared by all tiles of a row batch
+        tp_bounds = self.tile.tile_pyramid.bounds
+        left, bottom, right, top = self.bbox.bounds
+        return row_window(
+            self.tile.bounds,
+            (
+                max(left, tp_bounds.left),
+                max(bottom, tp_bounds.bottom),
+                min(right, tp_bounds.right),
+                min(top, tp_bounds.top),
+            ),
+        )
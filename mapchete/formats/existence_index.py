@@ -0,0 +1,278 @@
+"""
+Persistent index of existing tiles in a TileDirectory output.
+
+Determining which tiles of a TileDirectory already exist requires listing every row
+directory of the output. On object storages holding millions of tiles this dominates the
+startup of a process in "continue" mode. This index stores the IDs of all tiles which
+were written per zoom level as a sorted array next to metadata.json, so existence checks
+become a single small read per zoom level.
+
+Tile IDs are encoded as ``row * matrix_width + col`` of the output pyramid.
+"""
+
+from __future__ import annotations
+
+import logging
+import re
+from array import array
+from collections import defaultdict
+from functools import partial
+from io import BytesIO
+from typing import Dict, Generator, Iterable, Iterator, List, Tuple
+
+import numpy as np
+
+from mapchete.path import MPath
+from mapchete.tile import BufferedTile, BufferedTilePyramid
+from mapchete.timer import Timer
+from mapchete.types import MPathLike
+
+logger = logging.getLogger(__name__)
+
+EXISTENCE_INDEX_DIR = "existence_index"
+
+
+class TileExistenceIndex:
+    """
+    Tile IDs of existing output tiles, stored per zoom level.
+
+    Written tiles are registered in memory using ``add()`` and merged into the stored
+    index files when calling ``write()``. If an index file is missing or stale, it can
+    be rebuilt from a single paginated listing of the zoom level directory.
+    """
+
+    path: MPath
+    pyramid: BufferedTilePyramid
+
+    def __init__(
+        self,
+        path: MPath,
+        pyramid: BufferedTilePyramid,
+        tile_path_schema: str = "{zoom}/{row}/{col}.{extension}",
+        file_extension: str = ".tif",
+    ):
+        self.path = path / EXISTENCE_INDEX_DIR
+        self.tiledir = path
+        self.pyramid = pyramid
+        self.tile_path_schema = tile_path_schema
+        self.file_extension = file_extension
+        self._tile_ids: Dict[int, np.ndarray] = {}
+        self._added: Dict[int, array] = defaultdict(partial(array, "Q"))
+
+    def zoom_path(self, zoom: int) -> MPath:
+        """Path of index file for zoom level."""
+        return existence_index_path(self.tiledir, zoom)
+
+    def tile_id(self, tile: BufferedTile) -> int:
+        """Encode tile as integer."""
+        return tile.row * self.pyramid.matrix_width(tile.zoom) + tile.col
+
+    def add(self, tiles: Iterable[BufferedTile]) -> None:
+        """Register written output tiles."""
+        for tile in tiles:
+            self._added[tile.zoom].append(self.tile_id(tile))
+
+    def add_process_tile(self, process_tile: BufferedTile) -> None:
+        """
+        Register all output tiles of a written process tile.
+
+        Only use this if the writer does not report which output tiles it wrote, as
+        empty output tiles are usually not written.
+        """
+        self.add(self.pyramid.intersecting(process_tile))
+
+    def read(self, zoom: int) -> np.ndarray:
+        """
+        Return sorted array of existing tile IDs for zoom level.
+
+        Raises FileNotFoundError if index does not exist or is stale.
+        """
+        if zoom not in self._tile_ids:
+            with self.zoom_path(zoom).open("rb") as src:
+                stored = np.load(BytesIO(src.read()))
+                if int(stored["matrix_width"]) != self.pyramid.matrix_width(zoom):
+                    raise FileNotFoundError(
+                        f"existence index {self.zoom_path(zoom)} does not match output pyramid"
+                    )
+                self._tile_ids[zoom] = stored["tile_ids"]
+        return self._tile_ids[zoom]
+
+    def exists(self, zoom: int) -> bool:
+        """Whether a valid index exists for zoom level."""
+        try:
+            self.read(zoom)
+            return True
+        except FileNotFoundError:
+            return False
+
+    def rebuild(self, zoom: int) -> np.ndarray:
+        """Rebuild index for zoom level by listing the zoom level directory."""
+        with Timer() as duration:
+            tile_ids = array("Q")
+            matrix_width = self.pyramid.matrix_width(zoom)
+            for row, col, _ in list_tiles(
+                self.tiledir, zoom, self.tile_path_schema, self.file_extension
+            ):
+                tile_ids.append(row * matrix_width + col)
+            self._tile_ids[zoom] = np.unique(np.frombuffer(tile_ids, dtype=np.uint64))
+            self._write_zoom(zoom, self._tile_ids[zoom])
+        logger.debug(
+            "rebuilt existence index with %s tiles for zoom %s in %s",
+            len(self._tile_ids[zoom]),
+            zoom,
+            duration,
+        )
+        return self._tile_ids[zoom]
+
+    def invalidate(self, zoom: int) -> None:
+        """Remove index for zoom level."""
+        self._tile_ids.pop(zoom, None)
+        invalidate_existence_index(self.tiledir, zoom)
+
+    def write(self, create: bool = False) -> None:
+        """
+        Merge registered tiles into stored index files.
+
+        Index files are only updated if they already exist, unless create is True.
+        """
+        for zoom, added in list(self._added.items()):
+            if not added:  # pragma: no cover
+                continue
+            # drop cached state in case other processes updated the index meanwhile
+            self._tile_ids.pop(zoom, None)
+            try:
+                existing = self.read(zoom)
+            except FileNotFoundError:
+                if not create:
+                    continue
+                existing = self.rebuild(zoom)
+            tile_ids = np.union1d(existing, np.frombuffer(added, dtype=np.uint64))
+            self._write_zoom(zoom, tile_ids)
+            self._tile_ids[zoom] = tile_ids
+            self._added[zoom] = array("Q")
+
+    def process_tiles_exist(
+        self, tiles: Iterable[BufferedTile], rebuild_missing: bool = True
+    ) -> Iterator[Tuple[BufferedTile, bool]]:
+        """
+        Yield process tiles and whether they exist.
+
+        A process tile only exists if all of its output tiles exist.
+        """
+        for zoom, zoom_tiles in _group_by_zoom(tiles):
+            tile_ids = self._read_or_rebuild(zoom, rebuild_missing)
+            output_ids = [
+                [
+                    self.tile_id(output_tile)
+                    for output_tile in self.pyramid.intersecting(tile)
+                ]
+                for tile in zoom_tiles
+            ]
+            found = _isin_sorted(
+                np.array([i for ids in output_ids for i in ids], dtype=np.uint64),
+                tile_ids,
+            )
+            position = 0
+            for tile, ids in zip(zoom_tiles, output_ids):
+                yield tile, bool(found[position : position + len(ids)].all())
+                position += len(ids)
+
+    def _read_or_rebuild(self, zoom: int, rebuild_missing: bool) -> np.ndarray:
+        try:
+            return self.read(zoom)
+        except FileNotFoundError:
+            if rebuild_missing:
+                logger.debug("existence index for zoom %s missing or stale", zoom)
+                return self.rebuild(zoom)
+            raise
+
+    def _write_zoom(self, zoom: int, tile_ids: np.ndarray) -> None:
+        logger.debug("write existence index %s", self.zoom_path(zoom))
+        buffer = BytesIO()
+        np.savez_compressed(
+            buffer,
+            tile_ids=tile_ids.astype(np.uint64, copy=False),
+            matrix_width=self.pyramid.matrix_width(zoom),
+        )
+        self.path.makedirs()
+        with self.zoom_path(zoom).open("wb") as dst:
+            dst.write(buffer.getvalue())
+
+    def __repr__(self):  # pragma: no cover
+        return f"<TileExistenceIndex path={self.path}>"
+
+
+def existence_index_path(tiledir: MPathLike, zoom: int) -> MPath:
+    """Path of existence index file of a TileDirectory zoom level."""
+    return MPath.from_inp(tiledir) / EXISTENCE_INDEX_DIR / f"{zoom}.npz"
+
+
+def invalidate_existence_index(tiledir: MPathLike, zoom: int) -> None:
+    """
+    Remove existence index of a TileDirectory zoom level.
+
+    This has to be called whenever tiles are deleted. The index will be rebuilt on its
+    next usage.
+    """
+    path = existence_index_path(tiledir, zoom)
+    logger.debug("invalidate existence index %s", path)
+    path.rm(ignore_errors=True)
+
+
+def list_tiles(
+    tiledir: MPathLike,
+    zoom: int,
+    tile_path_schema: str = "{zoom}/{row}/{col}.{extension}",
+    file_extension: str = ".tif",
+) -> Generator[Tuple[int, int, MPath], None, None]:
+    """
+    Yield row, column and path of all existing tiles of a TileDirectory zoom level.
+
+    All tiles are determined using one paginated listing. The yielded paths contain
+    the file information from the listing.
+    """
+    tiledir = MPath.from_inp(tiledir)
+    pattern = _tile_path_regex(tile_path_schema, file_extension)
+    elements = len(tile_path_schema.split("/"))
+    directory = (
+        tiledir / str(zoom) if tile_path_schema.startswith("{zoom}/") else tiledir
+    )
+    try:
+        for page in directory.paginate():
+            for path in page:
+                match = pattern.match("/".join(path.elements[-elements:]))
+                if match and int(match.group("zoom")) == zoom:
+                    yield int(match.group("row")), int(match.group("col")), path
+    except FileNotFoundError:
+        pass
+
+
+def _tile_path_regex(tile_path_schema: str, file_extension: str) -> re.Pattern:
+    pattern = re.escape(
+        tile_path_schema.format(
+            zoom="__zoom__",
+            row="__row__",
+            col="__col__",
+            extension=file_extension.lstrip("."),
+        )
+    )
+    for element in ["zoom", "row", "col"]:
+        pattern = pattern.replace(f"__{element}__", f"(?P<{element}>[0-9]+)")
+    return re.compile(f"^{pattern}$")
+
+
+def _group_by_zoom(
+    tiles: Iterable[BufferedTile],
+) -> Iterator[Tuple[int, List[BufferedTile]]]:
+    grouped = defaultdict(list)
+    for tile in tiles:
+        grouped[tile.zoom].append(tile)
+    yield from grouped.items()
+
+
+def _isin_sorted(values: np.ndarray, sorted_array: np.ndarray) -> np.ndarray:
+    if not len(sorted_array):
+        return np.zeros(values.shape, dtype=bool)
+    positions = np.searchsorted(sorted_array, values)
+    positions[positions == len(sorted_array)] = 0
+    return sorted_array[positions] == values
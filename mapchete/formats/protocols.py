@@ -175,7 +175,9 @@ class FileSystemOutputDataReaderProtocol:  # pragma: no cover
 
 
 class OutputDataWriterProtocol(OutputDataReaderProtocol):  # pragma: no cover
-    def write(self, process_tile: BufferedTile, data: Any) -> None: ...
+    def write(
+        self, process_tile: BufferedTile, data: Any
+    ) -> Optional[List[BufferedTile]]: ...
 
     def output_is_valid(self, process_data: Any) -> bool: ...
 
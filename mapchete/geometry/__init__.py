@@ -13,7 +13,7 @@ from mapchete.geometry.latlon import (
     transform_to_latlon,
 )
 from mapchete.geometry.repair import repair
-from mapchete.geometry.reproject import reproject_geometry
+from mapchete.geometry.reproject import reproject_geometries, reproject_geometry
 from mapchete.geometry.segmentize import segmentize_geometry
 from mapchete.geometry.shape import to_shape
 from mapchete.geometry.transform import custom_transform
@@ -30,6 +30,7 @@ __all__ = [
     "transform_to_latlon",
     "repair",
     "reproject_geometry",
+    "reproject_geometries",
     "segmentize_geometry",
     "to_shape",
     "custom_transform",
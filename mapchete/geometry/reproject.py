@@ -1,12 +1,16 @@
 import logging
-from typing import Literal, Optional
+from functools import lru_cache
+from typing import Iterable, List, Literal, Optional, Tuple, Union
 
 import fiona
+import numpy as np
 import pyproj
+import shapely
 from pyproj import Transformer
 from pyproj.exceptions import CRSError
 from fiona.transform import transform_geom
 from rasterio.crs import CRS
+from shapely.errors import TopologicalError
 from shapely.geometry import mapping, shape
 
 from mapchete.bounds import Bounds
@@ -15,11 +19,9 @@ from mapchete.geometry.latlon import LATLON_CRS
 from mapchete.geometry.repair import repair
 from mapchete.geometry.segmentize import get_segmentize_value, segmentize_geometry
 from mapchete.geometry.shape import to_shape
-from mapchete.geometry.transform import custom_transform
 from mapchete.settings import mapchete_options
 from mapchete.timer import Timer
 from mapchete.types import (
-    CoordArrays,
     Geometry,
     GeometryLike,
     Polygon,
@@ -263,25 +265,135 @@ def _reproject_geom(
             out_geom = to_shape(transformed)
         case "pyproj":
             logger.debug("using pyproj transformer")
-
-            def _transformer_wrapper(coords: CoordArrays) -> CoordArrays:
-                return get_transformer(src_crs, dst_crs).transform(*coords)
-
             with Timer() as duration:
-                out_geom = custom_transform(geometry, _transformer_wrapper)
+                out_geom = repair(_transform(geometry, src_crs, dst_crs))
             logger.debug("geometry transformed in %s", duration)
     return repair(out_geom) if validity_check else out_geom
 
 
-TRANSFORMERS = dict()
+def reproject_geometries(
+    geometries: Iterable[GeometryLike],
+    src_crs: CRSLike,
+    dst_crs: CRSLike,
+    clip_to_crs_bounds: bool = True,
+    validity_check: bool = True,
+    skip_invalid: bool = False,
+    engine: Literal["fiona", "pyproj"] = mapchete_options.reproject_geometry_engine,
+) -> np.ndarray:
+    """
+    Reproject multiple geometries to target CRS.
+
+    Returns the same geometries as calling reproject_geometry() on each geometry, but
+    with the "pyproj" engine the coordinates of all geometries are transformed at once.
+    Geometries which cannot be handled that way (e.g. because they transform into
+    non-finite coordinates) are reprojected one by one using reproject_geometry().
+
+    Parameters
+    ----------
+    geometries : iterable of ``shapely.geometry``
+    src_crs : ``rasterio.crs.CRS`` or EPSG code
+        CRS of source data
+    dst_crs : ``rasterio.crs.CRS`` or EPSG code
+        target CRS
+    clip_to_crs_bounds : bool
+        Always clip geometries to CRS bounds. (default: True)
+    validity_check : bool
+        checks if reprojected geometry is valid and throws ``TopologicalError``
+        if invalid (default: True)
+    skip_invalid : bool
+        Return None instead of raising ``TopologicalError`` for geometries which
+        cannot be repaired. (default: False)
+
+    Returns
+    -------
+    geometries : ``numpy.ndarray`` of ``shapely.geometry``
+    """
+    src_crs = validate_crs(src_crs)
+    dst_crs = validate_crs(dst_crs)
+    geometries = _geometry_array([to_shape(geometry) for geometry in geometries])
+
+    def _reproject_single(geometry: Geometry) -> Optional[Geometry]:
+        try:
+            return reproject_geometry(
+                geometry,
+                src_crs=src_crs,
+                dst_crs=dst_crs,
+                clip_to_crs_bounds=clip_to_crs_bounds,
+                validity_check=validity_check,
+                engine=engine,
+            )
+        except TopologicalError:
+            if skip_invalid:
+                return None
+            raise
+
+    if engine != "pyproj" or src_crs == dst_crs or not len(geometries):
+        return _geometry_array([_reproject_single(geometry) for geometry in geometries])
 
+    crs_bounds = None
+    # geometry needs to be clipped to its CRS bounds except when projecting to EPSG:4326
+    if clip_to_crs_bounds and not crs_is_epsg_4326(dst_crs):
+        try:
+            crs_bounds = get_crs_bounds(dst_crs)
+        except ValueError:
+            pass
 
+    with Timer() as duration:
+        if crs_bounds:
+            out_geoms, failed = _repair_many(
+                _transform(geometries, src_crs, LATLON_CRS)
+            )
+            out_geoms = shapely.intersection(shape(crs_bounds), out_geoms)
+            out_geoms, failed_dst = _repair_many(
+                _transform(out_geoms, LATLON_CRS, dst_crs)
+            )
+            failed |= failed_dst
+        else:
+            out_geoms, failed = _repair_many(_transform(geometries, src_crs, dst_crs))
+    logger.debug("%s geometries transformed in %s", len(geometries), duration)
+
+    # let reproject_geometry() handle everything which did not work out
+    for index in np.flatnonzero(failed):
+        out_geoms[index] = _reproject_single(geometries[index])
+    return out_geoms
+
+
+@lru_cache(maxsize=128)
 def get_transformer(src_crs: CRS, dst_crs: CRS) -> Transformer:
-    try:
-        return TRANSFORMERS[(src_crs, dst_crs)]
-    except KeyError:
-        with Timer() as duration:
-            transformer = Transformer.from_crs(src_crs, dst_crs, always_xy=True)
-        logger.debug("tansformer created in %s", duration)
-        TRANSFORMERS[(src_crs, dst_crs)] = transformer
-        return transformer
+    with Timer() as duration:
+        transformer = Transformer.from_crs(src_crs, dst_crs, always_xy=True)
+    logger.debug("tansformer created in %s", duration)
+    return transformer
+
+
+def _transform(
+    geometries: Union[Geometry, np.ndarray], src_crs: CRS, dst_crs: CRS
+) -> Union[Geometry, np.ndarray]:
+    # shapely passes the coordinates of all geometries at once to the transformer
+    return shapely.transform(
+        geometries, get_transformer(src_crs, dst_crs).transform, interleaved=False
+    )
+
+
+def _repair_many(geometries: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Vectorized version of repair().
+
+    Returns repaired geometries and a mask of geometries which could not be repaired.
+    """
+    polygons = np.isin(
+        shapely.get_type_id(geometries),
+        [shapely.GeometryType.POLYGON, shapely.GeometryType.MULTIPOLYGON],
+    )
+    out_geoms = geometries.copy()
+    out_geoms[polygons] = shapely.buffer(geometries[polygons], 0)
+    out_geoms = shapely.normalize(out_geoms)
+    non_finite = ~np.isfinite(shapely.bounds(out_geoms)).all(axis=1)
+    failed = ~shapely.is_valid(out_geoms) | (non_finite & ~shapely.is_empty(out_geoms))
+    return out_geoms, failed
+
+
+def _geometry_array(geometries: List[Optional[Geometry]]) -> np.ndarray:
+    out = np.empty(len(geometries), dtype=object)
+    out[:] = geometries
+    return out
@@ -13,38 +13,59 @@ Available index types:
   Virtual raster dataset format by GDAL. This enables GIS tools to read multiple
   files at once, e.g. QGIS can open a zoom VRT so the user doesn't have to open
   all GeoTIFF files from a certain zoom level.
+- GTI
+  GDAL raster tile index (GDAL >= 3.9). Tiles are stored in a GeoPackage file
+  (e.g. 5.gti.gpkg) and raster properties in a GTI XML file (e.g. 5.gti) which can be
+  opened by GDAL as one dataset. Unlike VRT files, the index does not have to be
+  loaded as a whole.
 
 All index types are generated once per zoom level. For example GeoPackage will
 generate GPKG files 3.gpkg, 4.gpkg and 5.gpkg for zoom levels 3, 4 and 5.
 
+In incremental mode, the start time of each run is stored per zoom level next to the
+index files (e.g. 5.watermark.json). The next incremental run only lists the zoom level
+once and appends tiles which were written after this watermark instead of checking all
+tiles within the area. As tile modification times are set by the storage, the
+watermark is shifted by the difference between the local and the storage clock observed
+when writing it and reduced by WATERMARK_MARGIN seconds.
+
 """
 
 import logging
-import operator
+import os
+import time
 import xml.etree.ElementTree as ET
 from contextlib import ExitStack
 from copy import deepcopy
-from xml.dom import minidom
+from typing import Generator, Optional
+from xml.sax.saxutils import escape, quoteattr
 
 import fiona
+import numpy as np
 from rasterio.dtypes import _gdal_typename
+from shapely import area, box, intersection
 from shapely.geometry import mapping
+from shapely.geometry.base import BaseGeometry
 
 from mapchete.config.parse import get_zoom_levels
+from mapchete.formats.existence_index import list_tiles
 from mapchete.io import (
     MPath,
     fiona_open,
     fs_from_path,
     path_exists,
     raster,
-    relative_path,
     tiles_exist,
     vector,
 )
 from mapchete.path import batch_sort_property
+from mapchete.tile import BufferedTile, BufferedTileBatch
 
 logger = logging.getLogger(__name__)
 
+# seconds subtracted from the watermark to cover clock resolution and concurrent writes
+WATERMARK_MARGIN = 60
+
 spatial_schema = {
     "geometry": "Polygon",
     "properties": {"tile_id": "str:254", "zoom": "int", "row": "int", "col": "int"},
@@ -62,18 +83,38 @@ def zoom_index_gen(
     flatgeobuf=False,
     txt=False,
     vrt=False,
+    gti=False,
     fieldname="location",
     basepath=None,
     for_gdal=True,
+    incremental=False,
 ):
     """
     Generate indexes for given zoom level.
+
+    If incremental is active and all index files as well as a watermark from a previous
+    incremental run exist, only tiles written since this run are added.
     """
     if tile and zoom:  # pragma: no cover
         raise ValueError("tile and zoom cannot be used at the same time")
 
     zoom = tile.zoom if tile else zoom
     for zoom in get_zoom_levels(process_zoom_levels=zoom):
+        started = time.time()
+        index_paths = [
+            _index_file_path(out_dir, zoom, ext)
+            for enabled, ext in [
+                (geojson, "geojson"),
+                (gpkg, "gpkg"),
+                (shapefile, "shp"),
+                (flatgeobuf, "fgb"),
+                (txt, "txt"),
+                (vrt, "vrt"),
+                (gti, "gti"),
+            ]
+            if enabled
+        ]
+        watermark = _read_watermark(out_dir, zoom, index_paths) if incremental else None
         with ExitStack() as es:
             # get index writers for all enabled formats
             index_writers = []
@@ -138,51 +179,135 @@ def zoom_index_gen(
                     )
                 )
 
+            if gti:
+                index_writers.append(
+                    es.enter_context(
+                        GTIFileWriter(
+                            out_path=_index_file_path(out_dir, zoom, "gti"),
+                            output=mp.config.output,
+                            out_pyramid=mp.config.output_pyramid,
+                            zoom=zoom,
+                            fieldname=fieldname,
+                        )
+                    )
+                )
+
             logger.debug("use the following index writers: %s", index_writers)
 
             if tile:
-                output_tiles_batches = (
-                    mp.config.output_pyramid.tiles_from_bounds_batches(
-                        mp.config.process_pyramid.tile(*tile).bounds,
-                        zoom,
-                        batch_by=batch_sort_property(
-                            mp.config.output_reader.tile_path_schema
-                        ),
-                    )
+                aoi = mp.config.process_pyramid.tile(*tile).bbox
+            else:
+                aoi = mp.config.area_at_zoom(zoom)
+
+            if watermark is not None:
+                logger.debug("add tiles written since %s", watermark)
+                output_tiles_exist = (
+                    (output_tile, True)
+                    for output_tile in _tiles_written_since(mp, zoom, watermark, aoi)
                 )
             else:
-                output_tiles_batches = mp.config.output_pyramid.tiles_from_geom_batches(
-                    mp.config.area_at_zoom(zoom),
-                    zoom,
-                    batch_by=batch_sort_property(
-                        mp.config.output_reader.tile_path_schema
-                    ),
-                    exact=True,
+                if tile:
+                    output_tiles_batches = (
+                        mp.config.output_pyramid.tiles_from_bounds_batches(
+                            aoi.bounds,
+                            zoom,
+                            batch_by=batch_sort_property(
+                                mp.config.output_reader.tile_path_schema
+                            ),
+                        )
+                    )
+                else:
+                    output_tiles_batches = (
+                        mp.config.output_pyramid.tiles_from_geom_batches(
+                            aoi,
+                            zoom,
+                            batch_by=batch_sort_property(
+                                mp.config.output_reader.tile_path_schema
+                            ),
+                            exact=True,
+                        )
+                    )
+                # existence is determined once per tile for all index writers
+                output_tiles_exist = tiles_exist(
+                    mp.config, output_tiles_batches=output_tiles_batches
                 )
 
-            for output_tile, exists in tiles_exist(
-                mp.config, output_tiles_batches=output_tiles_batches
-            ):
-                tile_path = _tile_path(
-                    orig_path=mp.config.output.get_path(output_tile),
-                    basepath=basepath,
-                    for_gdal=for_gdal,
-                )
-                # get indexes where tile entry does not exist
-                indexes = [
-                    index_writer
-                    for index_writer in index_writers
-                    if not index_writer.entry_exists(tile=output_tile, path=tile_path)
-                ]
-
-                if indexes and exists:
+            for output_tile, exists in output_tiles_exist:
+                added = False
+                if exists:
+                    tile_path = _tile_path(
+                        orig_path=mp.config.output.get_path(output_tile),
+                        basepath=basepath,
+                        for_gdal=for_gdal,
+                    )
                     logger.debug("%s exists", tile_path)
-                    logger.debug("write to %s indexes", len(indexes))
-                    for index in indexes:
-                        index.write(output_tile, tile_path)
+                    for index_writer in index_writers:
+                        if not index_writer.entry_exists(
+                            tile=output_tile, path=tile_path
+                        ):
+                            index_writer.write(output_tile, tile_path)
+                            added = True
+
+                # yield tile for progress information; tiles which are only checked
+                # again because of the watermark margin are skipped
+                if watermark is None or added:
+                    yield output_tile
+
+        if incremental:
+            _watermark_path(out_dir, zoom).write_json(
+                {"timestamp": started, "written": time.time()}
+            )
 
-                # yield tile for progress information
-                yield output_tile
+
+def _watermark_path(out_dir, zoom):
+    return MPath.from_inp(out_dir) / f"{str(zoom)}.watermark.json"
+
+
+def _read_watermark(out_dir, zoom, index_paths) -> Optional[float]:
+    """
+    Return timestamp of last incremental run if all index files exist.
+
+    The timestamp is converted to the storage clock using the modification time of the
+    watermark file itself, so it can be compared with tile modification times.
+    """
+    path = _watermark_path(out_dir, zoom)
+    try:
+        watermark = path.read_json()
+    except FileNotFoundError:
+        return None
+    if all(index_path.exists() for index_path in index_paths):
+        timestamp = watermark["timestamp"]
+        if "written" in watermark:
+            timestamp -= watermark["written"] - path.last_modified().timestamp()
+        return timestamp - WATERMARK_MARGIN
+    logger.debug("not all index files exist, ignoring watermark")
+    return None
+
+
+def _tiles_written_since(
+    mp, zoom: int, timestamp: float, aoi: BaseGeometry
+) -> Generator[BufferedTile, None, None]:
+    """Yield output tiles within area which were written since timestamp."""
+    output_reader = mp.config.output_reader
+    tp = mp.config.output_pyramid
+    rows, cols = [], []
+    for row, col, path in list_tiles(
+        output_reader.path,
+        zoom,
+        output_reader.tile_path_schema,
+        output_reader.file_extension,
+    ):
+        if path.last_modified().timestamp() >= timestamp:
+            rows.append(row)
+            cols.append(col)
+    if not rows:
+        return
+    order = np.lexsort((cols, rows))
+    rows, cols = np.array(rows)[order], np.array(cols)[order]
+    # like in tiles_from_geom(), omit tiles only touching the area
+    boxes = box(*tp.tiles_bounds(zoom, rows, cols, pixelbuffer=0).T)
+    within = area(intersection(aoi, boxes)) > 0
+    yield from BufferedTileBatch(tp, zoom, rows[within], cols[within])
 
 
 def _index_file_path(out_dir, zoom, ext):
@@ -304,7 +429,7 @@ class TextFileWriter:
             with self.fs.open(self.path, "r") as src:
                 self._existing = {line for line in src.readlines()}
         else:
-            self._existing = {}
+            self._existing = set()
         self.new_entries = 0
         self.sink = self.fs.open(self.path, "w")
         for line in self._existing:
@@ -326,6 +451,7 @@ class TextFileWriter:
         if not self.entry_exists(path=path):
             logger.debug("write %s to %s", path, self)
             self._write_line(path + "\n")
+            self._existing.add(path + "\n")
             self.new_entries += 1
 
     def entry_exists(self, tile=None, path=None):
@@ -339,11 +465,14 @@ class TextFileWriter:
 
 
 class VRTFileWriter:
-    """Generates GDAL-style VRT file."""
+    """
+    Generates GDAL-style VRT file.
 
-    def __init__(self, out_path=None, output=None, out_pyramid=None):
-        # see if lxml is installed before checking all output tiles
+    All VRT entries are derived from the tile indexes, the output pyramid and the output
+    profile, so no tile has to be opened. The XML is streamed into the output file.
+    """
 
+    def __init__(self, out_path=None, output=None, out_pyramid=None):
         self.path = out_path
         self._tp = out_pyramid
         self._output = output
@@ -351,9 +480,7 @@ class VRTFileWriter:
         logger.debug("initialize VRT writer for %s", self.path)
         if path_exists(self.path):
             with self.fs.open(self.path) as src:
-                self._existing = {
-                    k: MPath.from_inp(v) for k, v in self._xml_to_entries(src.read())
-                }
+                self._existing = dict(self._xml_to_entries(src))
         else:
             self._existing = {}
         logger.debug("%s existing entries", len(self._existing))
@@ -377,12 +504,16 @@ class VRTFileWriter:
     def _add_entry(self, tile=None, path=None):
         self._new[tile] = MPath.from_inp(path)
 
-    def _xml_to_entries(self, xml_string):
-        for entry in next(
-            ET.ElementTree(ET.fromstring(xml_string)).getroot().iter("VRTRasterBand")
-        ).iter("ComplexSource"):
-            path = next(entry.iter("SourceFilename")).text
-            yield (self._path_to_tile(path), path)
+    def _xml_to_entries(self, src):
+        # sources are the same for all bands, so only the first band is parsed
+        for _, element in ET.iterparse(src):
+            if element.tag == "SourceFilename":
+                path = MPath.from_inp(element.text)
+                if element.get("relativeToVRT") == "1":
+                    path = MPath.from_inp(self.path).parent / element.text
+                yield (self._path_to_tile(element.text), path)
+            elif element.tag == "VRTRasterBand":
+                return
 
     def write(self, tile, path):
         if not self.entry_exists(tile=tile, path=path):
@@ -391,107 +522,123 @@ class VRTFileWriter:
             self.new_entries += 1
 
     def entry_exists(self, tile=None, path=None):
-        path = relative_path(path=path, base_dir=self.path.dirname)
-        exists = path in self._existing
+        exists = tile in self._existing or tile in self._new
         logger.debug("tile %s with path %s exists: %s", tile, path, exists)
         return exists
 
     def close(self):
-        from lxml.builder import ElementMaker
-
         logger.debug("%s new entries in %s", self.new_entries, self)
         if not self._new:
             logger.debug("no entries to write")
             return
 
         # combine existing and new entries
-        all_entries = {**self._existing, **self._new}
+        all_entries = sorted(
+            {**self._existing, **self._new}.items(), key=lambda x: str(x[1])
+        )
         logger.debug("writing a total of %s entries", len(all_entries))
 
         # get VRT attributes
-        vrt_affine, vrt_shape = raster.tiles_to_affine_shape(list(all_entries.keys()))
-        vrt_dtype = _gdal_typename(self._output.profile()["dtype"])
+        vrt_affine, vrt_shape = raster.tiles_to_affine_shape(
+            [tile for tile, _ in all_entries]
+        )
+        profile = self._output.profile()
+        vrt_dtype = _gdal_typename(profile["dtype"])
         vrt_nodata = self._output.output_params["nodata"]
+        block_x_size = profile.get("blockxsize", self._tp.tile_size)
+        block_y_size = profile.get("blockysize", self._tp.tile_size)
 
-        # build XML
-        E = ElementMaker()
-        vrt = E.VRTDataset(
-            E.SRS(self._tp.crs.wkt),
-            E.GeoTransform(", ".join(map(str, vrt_affine.to_gdal()))),
-            *[
-                E.VRTRasterBand(
-                    E.NoDataValue(str(vrt_nodata)),
-                    E.ColorInterp("Gray"),
-                    *[
-                        E.ComplexSource(
-                            E.SourceFilename(
-                                (
-                                    _tile_path(orig_path=path, for_gdal=True)
-                                    if path.is_remote()
-                                    else str(
-                                        path.relative_path(start=self.path.dirname)
-                                    )
-                                ),
-                                relativeToVRT="0" if path.is_remote() else "1",
-                            ),
-                            E.SourceBand(str(b_idx)),
-                            E.SourceProperties(
-                                RasterXSize=str(tile.shape.width),
-                                RasterYSize=str(tile.shape.height),
-                                DataType=vrt_dtype,
-                                BlockXSize=str(
-                                    self._output.profile().get(
-                                        "blockxsize", self._tp.tile_size
-                                    )
-                                ),
-                                BlockYSize=str(
-                                    self._output.profile().get(
-                                        "blockysize", self._tp.tile_size
-                                    )
-                                ),
-                            ),
-                            E.SrcRect(
-                                xOff="0",
-                                yOff="0",
-                                xSize=str(tile.shape.width),
-                                ySize=str(tile.shape.height),
-                            ),
-                            E.DstRect(
-                                xOff=str(
-                                    list(
-                                        raster.bounds_to_ranges(
-                                            bounds=tile.bounds,
-                                            transform=vrt_affine,
-                                        )
-                                    )[2]
-                                ),
-                                yOff=str(
-                                    list(
-                                        raster.bounds_to_ranges(
-                                            bounds=tile.bounds,
-                                            transform=vrt_affine,
-                                        )
-                                    )[0]
-                                ),
-                                xSize=str(tile.shape.width),
-                                ySize=str(tile.shape.height),
-                            ),
-                            E.NODATA(str(vrt_nodata)),
-                        )
-                        for tile, path in sorted(
-                            all_entries.items(), key=operator.itemgetter(1)
-                        )
-                    ],
-                    dataType=vrt_dtype,
-                    band=str(b_idx),
+        def _sources(band):
+            for tile, path in all_entries:
+                minrow, _, mincol, _ = raster.bounds_to_ranges(
+                    bounds=tile.bounds, transform=vrt_affine
                 )
-                for b_idx in range(1, self._output.profile()["count"] + 1)
-            ],
-            rasterXSize=str(vrt_shape.width),
-            rasterYSize=str(vrt_shape.height),
-        )
-        # generate pretty XML and write
-        xmlstr = minidom.parseString(ET.tostring(vrt)).toprettyxml(indent="  ")
+                if path.is_remote():
+                    filename = _tile_path(orig_path=path, for_gdal=True)
+                    relative = "0"
+                else:
+                    filename = str(path.relative_path(start=self.path.dirname))
+                    relative = "0" if os.path.isabs(filename) else "1"
+                yield (
+                    "    <ComplexSource>\n"
+                    f"      <SourceFilename relativeToVRT={quoteattr(relative)}>"
+                    f"{escape(filename)}</SourceFilename>\n"
+                    f"      <SourceBand>{band}</SourceBand>\n"
+                    f'      <SourceProperties RasterXSize="{tile.shape.width}" '
+                    f'RasterYSize="{tile.shape.height}" DataType="{vrt_dtype}" '
+                    f'BlockXSize="{block_x_size}" BlockYSize="{block_y_size}"/>\n'
+                    f'      <SrcRect xOff="0" yOff="0" xSize="{tile.shape.width}" '
+                    f'ySize="{tile.shape.height}"/>\n'
+                    f'      <DstRect xOff="{mincol}" yOff="{minrow}" '
+                    f'xSize="{tile.shape.width}" ySize="{tile.shape.height}"/>\n'
+                    f"      <NODATA>{vrt_nodata}</NODATA>\n"
+                    "    </ComplexSource>\n"
+                )
+
         logger.debug("write to %s", self.path)
         with self.fs.open(self.path, "w") as dst:
-            dst.write(xmlstr)
+            dst.write(
+                f'<VRTDataset rasterXSize="{vrt_shape.width}" '
+                f'rasterYSize="{vrt_shape.height}">\n'
+                f"  <SRS>{escape(self._tp.crs.wkt)}</SRS>\n"
+                "  <GeoTransform>"
+                f"{', '.join(map(str, vrt_affine.to_gdal()))}</GeoTransform>\n"
+            )
+            for band in range(1, profile["count"] + 1):
+                dst.write(f'  <VRTRasterBand dataType="{vrt_dtype}" band="{band}">\n')
+                dst.write(f"    <NoDataValue>{vrt_nodata}</NoDataValue>\n")
+                dst.write("    <ColorInterp>Gray</ColorInterp>\n")
+                dst.writelines(_sources(band))
+                dst.write("  </VRTRasterBand>\n")
+            dst.write("</VRTDataset>\n")
+
+
+class GTIFileWriter(VectorFileWriter):
+    """
+    Generates a GDAL raster tile index (GTI).
+
+    Tiles are stored as features in a GeoPackage file and all raster properties are
+    derived from the output pyramid and profile and written into a GTI XML file next to
+    it. GDAL can therefore read the XML file as one dataset without opening any tile.
+    """
+
+    def __init__(
+        self, out_path=None, output=None, out_pyramid=None, zoom=None, fieldname=None
+    ):
+        self.xml_path = MPath.from_inp(out_path)
+        super().__init__(
+            out_path=self.xml_path.parent / f"{self.xml_path.name}.gpkg",
+            crs=out_pyramid.crs,
+            fieldname=fieldname,
+            driver="GPKG",
+        )
+        self._tp = out_pyramid
+        self._output = output
+        self._zoom = zoom
+
+    def __repr__(self):
+        return "GTIFileWriter(%s)" % self.xml_path
+
+    def write(self, tile, path):
+        super().write(tile, MPath.from_inp(path).as_gdal_str())
+
+    def close(self):
+        super().close()
+        if self.xml_path.exists() and not self.new_entries:
+            logger.debug("no entries to write")
+            return
+        profile = self._output.profile()
+        logger.debug("write to %s", self.xml_path)
+        with self.xml_path.open("w") as dst:
+            dst.write(
+                "<GDALTileIndexDataset>\n"
+                f"  <IndexDataset>{escape(self.path.as_gdal_str())}</IndexDataset>\n"
+                f"  <LocationField>{escape(self.fieldname)}</LocationField>\n"
+                f"  <SRS>{escape(self._tp.crs.wkt)}</SRS>\n"
+                f"  <ResX>{self._tp.pixel_x_size(self._zoom)}</ResX>\n"
+                f"  <ResY>{self._tp.pixel_y_size(self._zoom)}</ResY>\n"
+                f"  <BandCount>{profile['count']}</BandCount>\n"
+                f"  <DataType>{_gdal_typename(profile['dtype'])}</DataType>\n"
+                f"  <NoData>{self._output.output_params['nodata']}</NoData>\n"
+                "</GDALTileIndexDataset>\n"
+            )
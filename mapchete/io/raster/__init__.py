@@ -18,7 +18,11 @@ from mapchete.io.raster.read import (
     tiles_to_affine_shape,
 )
 from mapchete.io.raster.referenced_raster import ReferencedRaster, read_raster
-from mapchete.io.raster.write import rasterio_write, write_raster_window
+from mapchete.io.raster.write import (
+    RasterioStreamingWriter,
+    rasterio_write,
+    write_raster_window,
+)
 
 __all__ = [
     "extract_from_array",
@@ -39,5 +43,6 @@ __all__ = [
     "ReferencedRaster",
     "read_raster",
     "rasterio_write",
+    "RasterioStreamingWriter",
     "write_raster_window",
 ]
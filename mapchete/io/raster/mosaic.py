@@ -92,11 +92,16 @@ def create_mosaic(
         mosaic_top = max([top, mosaic_top])
     height = int(round((mosaic_top - mosaic_bottom) / resolution))
     width = int(round((mosaic_right - mosaic_left) / resolution))
-    # initialize empty mosaic
+    # initialize empty mosaic with a boolean mask, where True marks nodata pixels
     mosaic = ma.MaskedArray(
         data=np.full((num_bands, height, width), dtype=dtype, fill_value=nodata),
-        mask=np.ones((num_bands, height, width)),
+        mask=np.ones((num_bands, height, width), dtype=bool),
     )
+    mosaic_data, mosaic_mask = mosaic.data, mosaic.mask
+    # tiles from one zoom level only overlap if they have a pixelbuffer
+    overlapping = any(tile.pixelbuffer for tile, _ in tiles_arrays_list) or len(
+        set(tile.id for tile, _ in tiles_arrays_list)
+    ) < len(tiles_arrays_list)
     # create Affine
     affine = Affine(resolution, 0, mosaic_left, 0, -resolution, mosaic_top)
     # fill mosaic array with tile data
@@ -107,14 +112,22 @@ def create_mosaic(
             bounds=(t_left, t_bottom, t_right, t_top),
             transform=affine,
         )
-        existing_data = mosaic[:, minrow:maxrow, mincol:maxcol]
-        existing_mask = mosaic.mask[:, minrow:maxrow, mincol:maxcol]
-        mosaic[:, minrow:maxrow, mincol:maxcol] = np.where(
-            masked_data.mask, existing_data, masked_data
-        )
-        mosaic.mask[:, minrow:maxrow, mincol:maxcol] = np.where(
-            masked_data.mask, existing_mask, masked_data.mask
-        )
+        window_data = mosaic_data[:, minrow:maxrow, mincol:maxcol]
+        window_mask = mosaic_mask[:, minrow:maxrow, mincol:maxcol]
+        tile_mask = ma.getmask(masked_data)
+        if tile_mask is ma.nomask:
+            # all tile pixels are valid and replace existing pixels
+            np.copyto(window_data, masked_data.data)
+            window_mask[:] = False
+        elif not overlapping:
+            # window is still empty and filled with nodata, so only valid pixels are
+            # copied and the tile mask can be taken over
+            np.copyto(window_data, masked_data.data, where=~tile_mask)
+            np.copyto(window_mask, tile_mask)
+        else:
+            # only valid tile pixels replace existing pixels
+            np.copyto(window_data, masked_data.data, where=~tile_mask)
+            np.logical_and(window_mask, tile_mask, out=window_mask)
 
     if shift:
         # shift back output mosaic
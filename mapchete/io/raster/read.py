@@ -5,8 +5,22 @@ from __future__ import annotations
 import logging
 import sys
 import warnings
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from contextlib import contextmanager
-from typing import Any, Dict, Generator, Iterable, List, Optional, Tuple, Union
+from itertools import islice
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Generator,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+    Union,
+)
 
 import numpy as np
 import numpy.ma as ma
@@ -18,10 +32,11 @@ from rasterio.errors import RasterioIOError
 from rasterio.io import DatasetReader, DatasetWriter, MemoryFile
 from rasterio.profiles import Profile
 from rasterio.vrt import WarpedVRT
-from rasterio.warp import reproject
+from rasterio.warp import reproject, transform_bounds
 from retry import retry
 from tilematrix import Shape
 
+from mapchete.enums import MergeMethod
 from mapchete.errors import MapcheteIOError
 from mapchete.geometry.clip import clip_geometry_to_pyramid_bounds
 from mapchete.grid import Grid
@@ -29,7 +44,7 @@ from mapchete.io.raster.array import extract_from_array, prepare_masked_array
 from mapchete.io.raster.write import _write_tags
 from mapchete.path import MPath
 from mapchete.protocols import GridProtocol
-from mapchete.settings import IORetrySettings
+from mapchete.settings import IORetrySettings, mapchete_options
 from mapchete.tile import BufferedTile
 from mapchete.timer import Timer
 from mapchete.types import MPathLike, NodataVal
@@ -65,6 +80,8 @@ def read_raster_window(
     dst_dtype: Optional[DTypeLike] = None,
     gdal_opts: Optional[dict] = None,
     skip_missing_files: bool = False,
+    merge_method: Union[MergeMethod, str] = MergeMethod.last,
+    read_workers: Optional[int] = None,
 ) -> ma.MaskedArray:
     """
     Return NumPy arrays from an input raster.
@@ -73,6 +90,14 @@ def read_raster_window(
     raster. If tile boundaries cross the antimeridian, data on the other side
     of the antimeridian will be read and concatenated to the numpy array
     accordingly.
+
+    If multiple input files are given, they are merged into one array using
+    merge_method: "first" or "last" keep the first or last valid pixel in the order
+    of the input files, "mean", "min" and "max" combine all valid pixels.
+
+    Multiple input files are read using up to read_workers threads (default:
+    MAPCHETE_RASTER_READ_WORKERS or 1), which mainly helps on remote storages where
+    latency dominates. The merge order is not affected by this.
     """
     resampling = (
         resampling if isinstance(resampling, Resampling) else Resampling[resampling]
@@ -99,6 +124,8 @@ def read_raster_window(
             dst_nodata=dst_nodata,
             dst_dtype=dst_dtype,
             skip_missing_files=skip_missing_files,
+            merge_method=MergeMethod(merge_method),
+            read_workers=read_workers or mapchete_options.raster_read_workers,
         )
 
 
@@ -111,7 +138,11 @@ def _read_raster_window(
     dst_nodata: NodataVal = None,
     dst_dtype: Optional[DTypeLike] = None,
     skip_missing_files: bool = False,
-) -> ma.MaskedArray:
+    merge_method: MergeMethod = MergeMethod.last,
+    read_workers: int = 1,
+    out: Optional[np.ndarray] = None,
+    skip_disjoint: bool = False,
+) -> Optional[ma.MaskedArray]:
     def _empty_array() -> ma.MaskedArray:
         if indexes is None:  # pragma: no cover
             raise ValueError(
@@ -136,29 +167,24 @@ def _read_raster_window(
         # in case multiple input files are given, merge output into one array
         # using the default rasterio behavior, create a 2D array if only one band
         # is read and a 3D array if multiple bands are read
-        dst_array = None
-        # read files and add one by one to the output array
-        for ff in input_files:
-            try:
-                f_array = _read_raster_window(
-                    [ff],
-                    grid=grid,
-                    indexes=indexes,
-                    resampling=resampling,
-                    src_nodata=src_nodata,
-                    dst_nodata=dst_nodata,
-                )
-                if dst_array is None:
-                    dst_array = f_array
-                else:
-                    dst_array[~f_array.mask] = f_array.data[~f_array.mask]
-                    dst_array.mask[~f_array.mask] = False
-                    logger.debug("added to output array")
-            except FileNotFoundError:
-                if skip_missing_files:
-                    logger.debug("skip missing file %s", ff)
-                else:  # pragma: no cover
-                    raise
+        with Timer() as duration:
+            dst_array = _read_mosaic_window(
+                input_files,
+                grid=grid,
+                indexes=indexes,
+                resampling=resampling,
+                src_nodata=src_nodata,
+                dst_nodata=dst_nodata,
+                skip_missing_files=skip_missing_files,
+                merge_method=merge_method,
+                read_workers=read_workers,
+            )
+        logger.debug(
+            "merged %s files using %s method in %s",
+            len(input_files),
+            merge_method.value,
+            duration,
+        )
         if dst_array is None:
             dst_array = _empty_array()
         return dst_array
@@ -192,11 +218,13 @@ def _read_raster_window(
                     resampling=resampling,
                     src_nodata=src_nodata,
                     dst_nodata=dst_nodata,
+                    out=out,
+                    skip_disjoint=skip_disjoint,
                 )
         except FileNotFoundError:  # pragma: no cover
             if skip_missing_files:
                 logger.debug("skip missing file %s", input_file)
-                return _empty_array()
+                return None if skip_disjoint else _empty_array()
             else:
                 raise
         except Exception as exception:  # pragma: no cover
@@ -206,6 +234,147 @@ def _read_raster_window(
             ).with_traceback(exc_traceback) from exception
 
 
+def _read_mosaic_window(
+    input_files: List[MPath],
+    grid: GridProtocol,
+    indexes: Optional[Union[int, List[int]]] = None,
+    resampling: Resampling = Resampling.nearest,
+    src_nodata: NodataVal = None,
+    dst_nodata: NodataVal = None,
+    skip_missing_files: bool = False,
+    merge_method: MergeMethod = MergeMethod.last,
+    read_workers: int = 1,
+) -> Optional[ma.MaskedArray]:
+    """
+    Read multiple files into one preallocated output array.
+
+    Sources not intersecting with the grid are skipped. For "first" and "last",
+    reading stops as soon as every output pixel is covered.
+    """
+    # "last" is "first" in reversed order, which allows stopping early as well
+    ordered_files = (
+        list(reversed(input_files)) if merge_method == MergeMethod.last else input_files
+    )
+    dst_data, dst_mask, read_buffer = None, None, None
+    # sum and count of valid pixels, only used for "mean"
+    dst_sum, dst_count = None, None
+
+    def _read(
+        input_file: MPath, out: Optional[np.ndarray] = None
+    ) -> Optional[ma.MaskedArray]:
+        return _read_raster_window(
+            [input_file],
+            grid=grid,
+            indexes=indexes,
+            resampling=resampling,
+            src_nodata=src_nodata,
+            dst_nodata=dst_nodata,
+            skip_missing_files=skip_missing_files,
+            out=out,
+            skip_disjoint=True,
+        )
+
+    def _read_sequentially() -> Iterator[Tuple[MPath, Optional[ma.MaskedArray]]]:
+        for input_file in ordered_files:
+            # read_buffer is available once the first source was merged
+            yield input_file, _read(input_file, out=read_buffer)
+
+    for input_file, src_array in (
+        _read_concurrently(_read, ordered_files, workers=read_workers)
+        if read_workers > 1
+        else _read_sequentially()
+    ):
+        if src_array is None:
+            logger.debug("%s does not intersect with grid, skip", input_file)
+            continue
+        src_valid = ~ma.getmaskarray(src_array)
+
+        # first source with data initializes the output buffers, its array was freshly
+        # allocated and can be reused as output
+        if dst_data is None:
+            dst_data = src_array.data
+            dst_mask = ~src_valid
+            read_buffer = np.empty_like(dst_data)
+            if merge_method == MergeMethod.mean:
+                dst_sum = np.where(src_valid, src_array.data, 0).astype(np.float64)
+                dst_count = src_valid.astype(np.uint32)
+
+        elif merge_method in [MergeMethod.first, MergeMethod.last]:
+            # only fill pixels which are not yet covered
+            np.logical_and(src_valid, dst_mask, out=src_valid)
+            np.copyto(dst_data, src_array.data, where=src_valid)
+            dst_mask[src_valid] = False
+
+        elif merge_method == MergeMethod.mean:
+            np.add(dst_sum, src_array.data, out=dst_sum, where=src_valid)
+            dst_count += src_valid
+            dst_mask &= ~src_valid
+
+        else:
+            ufunc = np.minimum if merge_method == MergeMethod.min else np.maximum
+            both_valid = src_valid & ~dst_mask
+            ufunc(dst_data, src_array.data, out=dst_data, where=both_valid)
+            np.logical_and(src_valid, dst_mask, out=src_valid)
+            np.copyto(dst_data, src_array.data, where=src_valid)
+            dst_mask[src_valid] = False
+
+        logger.debug("added %s to output array", input_file)
+        if merge_method in [MergeMethod.first, MergeMethod.last] and not dst_mask.any():
+            logger.debug("output array fully covered, stop reading")
+            break
+
+    if dst_data is None:
+        return None
+
+    if merge_method == MergeMethod.mean:
+        mean = np.divide(
+            dst_sum, dst_count, out=np.zeros_like(dst_sum), where=dst_count > 0
+        )
+        if np.issubdtype(dst_data.dtype, np.integer):
+            np.round(mean, out=mean)
+        np.copyto(dst_data, mean, where=dst_count > 0, casting="unsafe")
+
+    return ma.masked_array(data=dst_data, mask=dst_mask)
+
+
+def _read_concurrently(
+    read_func: Callable[[MPath], Optional[ma.MaskedArray]],
+    input_files: List[MPath],
+    workers: int,
+) -> Iterator[Tuple[MPath, Optional[ma.MaskedArray]]]:
+    """
+    Read files using a thread pool but yield results in order of input files.
+
+    At most workers files are read or held in memory at the same time. When the
+    consumer stops iterating, files not yet being read are cancelled.
+    """
+    # GDAL configuration is thread local, so pass on the one of the calling thread
+    env_options = rasterio.env.getenv() if rasterio.env.hasenv() else {}
+
+    def _read_with_env(input_file: MPath) -> Optional[ma.MaskedArray]:
+        with rasterio.Env(**env_options):
+            return read_func(input_file)
+
+    files = iter(input_files)
+    pending = deque()
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        try:
+            for input_file in islice(files, workers):
+                pending.append(
+                    (input_file, executor.submit(_read_with_env, input_file))
+                )
+            while pending:
+                input_file, future = pending.popleft()
+                for next_file in islice(files, 1):
+                    pending.append(
+                        (next_file, executor.submit(_read_with_env, next_file))
+                    )
+                yield input_file, future.result()
+        finally:
+            for _, future in pending:
+                future.cancel()
+
+
 def _get_warped_edge_array(
     tile: BufferedTile,
     input_file: MPathLike,
@@ -265,7 +434,9 @@ def _get_warped_array(
     resampling: Resampling = Resampling.nearest,
     src_nodata: NodataVal = None,
     dst_nodata: NodataVal = None,
-) -> ma.MaskedArray:
+    out: Optional[np.ndarray] = None,
+    skip_disjoint: bool = False,
+) -> Optional[ma.MaskedArray]:
     """Extract a numpy array from a raster file."""
     return _rasterio_read(
         input_file=input_file,
@@ -274,6 +445,8 @@ def _get_warped_array(
         resampling=resampling,
         src_nodata=src_nodata,
         dst_nodata=dst_nodata,
+        out=out,
+        skip_disjoint=skip_disjoint,
     )
 
 
@@ -285,7 +458,9 @@ def _rasterio_read(
     resampling: Resampling = Resampling.nearest,
     src_nodata: NodataVal = None,
     dst_nodata: NodataVal = None,
-) -> ma.MaskedArray:
+    out: Optional[np.ndarray] = None,
+    skip_disjoint: bool = False,
+) -> Optional[ma.MaskedArray]:
     def _read(
         src,
         dst_grid: GridProtocol,
@@ -293,7 +468,9 @@ def _rasterio_read(
         resampling: Resampling = Resampling.nearest,
         src_nodata: NodataVal = None,
         dst_nodata: NodataVal = None,
-    ) -> ma.MaskedArray:
+    ) -> Optional[ma.MaskedArray]:
+        if skip_disjoint and _is_disjoint(src, dst_grid):
+            return None
         indexes = indexes or list(src.indexes)
         count = len(indexes) if isinstance(indexes, list) else 1
         dst_array_shape = (count, dst_grid.height, dst_grid.width)
@@ -333,6 +510,14 @@ def _rasterio_read(
             ) as vrt:
                 with warnings.catch_warnings():
                     warnings.simplefilter("ignore")
+                    if out is not None and out.shape[-2:] == dst_array_shape[-2:]:
+                        # read into existing buffer to avoid allocating a new array
+                        return vrt.read(
+                            window=vrt.window(*dst_grid.bounds),
+                            out=out,
+                            indexes=indexes,
+                            masked=True,
+                        )
                     return vrt.read(
                         window=vrt.window(*dst_grid.bounds),
                         out_shape=dst_array_shape,
@@ -355,6 +540,21 @@ def _rasterio_read(
     return out
 
 
+def _is_disjoint(src: DatasetReader, dst_grid: GridProtocol) -> bool:
+    """Check whether source footprint does not intersect with the grid."""
+    if src.crs is None or (src.transform.is_identity and src.gcps):
+        return False
+    try:
+        left, bottom, right, top = transform_bounds(src.crs, dst_grid.crs, *src.bounds)
+    except Exception:  # pragma: no cover
+        # if bounds cannot be transformed, rather read the source
+        return False
+    dst_left, dst_bottom, dst_right, dst_top = dst_grid.bounds
+    return (
+        left >= dst_right or right <= dst_left or bottom >= dst_top or top <= dst_bottom
+    )
+
+
 @retry(logger=logger, **dict(IORetrySettings()))
 def read_raster_no_crs(
     input_file: MPathLike, indexes: Optional[Union[int, List[int]]] = None, **kwargs
@@ -2,14 +2,22 @@ from __future__ import annotations
 
 from importlib.util import find_spec
 import logging
+import math
+import xml.etree.ElementTree as ET
 from contextlib import contextmanager
-from tempfile import NamedTemporaryFile
-from typing import Generator, Optional, Union
+from tempfile import NamedTemporaryFile, TemporaryDirectory
+from typing import Generator, List, Optional, Union
 
+import numpy as np
 import numpy.ma as ma
 import rasterio
+from affine import Affine
+from rasterio.dtypes import _gdal_typename
+from rasterio.enums import Resampling
 from rasterio.io import DatasetWriter, MemoryFile, BufferedDatasetWriter
 from rasterio.profiles import Profile
+from rasterio.shutil import copy as rasterio_copy
+from rasterio.windows import Window
 
 from mapchete.io.raster.array import extract_from_array
 from mapchete.path import MPath, MPathLike
@@ -129,6 +137,226 @@ class RasterioRemoteWriter:
             return RasterioRemoteTempFileWriter(path, *args, **kwargs)
 
 
+class RasterioStreamingWriter:
+    """
+    Write a large GeoTIFF or COG without keeping the raster in memory.
+
+    Data is written into a tiled temporary GeoTIFF and every written window also
+    updates the overview levels, which are kept in temporary GeoTIFFs as well. On exit,
+    the target file is copied in one pass from a VRT referencing the temporary files,
+    so overviews don't have to be built from the full raster afterwards.
+
+    A local GTiff target without overviews is written directly.
+    """
+
+    path: MPath
+    overviews_levels: List[int]
+    overviews_resampling: Resampling
+
+    def __init__(
+        self,
+        path: MPathLike,
+        overviews_levels: Optional[List[int]] = None,
+        overviews_resampling: Resampling = Resampling.nearest,
+        tempdir: Optional[MPathLike] = None,
+        **kwargs,
+    ):
+        logger.debug("open RasterioStreamingWriter for path %s", path)
+        self.path = MPath.from_inp(path)
+        self.profile = dict(kwargs)
+        self.driver = self.profile.pop("driver", "GTiff")
+        self.overviews_levels = sorted(overviews_levels or [])
+        previous = 1
+        for level in self.overviews_levels:
+            if level <= previous or level % previous:
+                raise ValueError(
+                    "overview levels must be increasing multiples of each other: "
+                    f"{self.overviews_levels}"
+                )
+            previous = level
+        self.overviews_resampling = overviews_resampling
+        self._tempdir = tempdir
+        self._tmp = None
+        self._base = None
+        self._overviews = []
+        self._direct = (
+            self.driver == "GTiff"
+            and not self.overviews_levels
+            and not self.path.is_remote()
+        )
+
+    def __enter__(self) -> RasterioStreamingWriter:
+        self._tmp = TemporaryDirectory(
+            dir=str(self._tempdir) if self._tempdir else None
+        )
+        width, height = self.profile["width"], self.profile["height"]
+        transform = self.profile["transform"]
+        if self._direct:
+            self.path.parent.makedirs(exist_ok=True)
+            self._base = rasterio.open(
+                self.path, "w+", driver=self.driver, **self.profile
+            )
+        else:
+            self._base = rasterio.open(
+                MPath(self._tmp.name) / "base.tif",
+                "w+",
+                **self._temp_profile(width, height, transform),
+            )
+        for level in self.overviews_levels:
+            self._overviews.append(
+                rasterio.open(
+                    MPath(self._tmp.name) / f"overview_{level}.tif",
+                    "w+",
+                    **self._temp_profile(
+                        math.ceil(width / level),
+                        math.ceil(height / level),
+                        transform * Affine.scale(level),
+                    ),
+                )
+            )
+        return self
+
+    def __getattr__(self, attr):
+        # behave like the underlying dataset for everything else
+        if attr.startswith("_"):  # pragma: no cover
+            raise AttributeError(attr)
+        return getattr(self._base, attr)
+
+    def write(self, data: np.ndarray, window: Optional[Window] = None, **kwargs):
+        """Write data and update overviews for this window."""
+        self._base.write(data, window=window, **kwargs)
+        if self._overviews:
+            self._update_overviews(
+                window or Window(0, 0, self._base.width, self._base.height)
+            )
+
+    def _update_overviews(self, window: Window):
+        src = self._base
+        previous = 1
+        for level, dst in zip(self.overviews_levels, self._overviews):
+            factor = level // previous
+            # expand window to cover full overview pixels
+            col_off = math.floor(window.col_off / factor) * factor
+            row_off = math.floor(window.row_off / factor) * factor
+            col_end = min(
+                math.ceil((window.col_off + window.width) / factor) * factor,
+                src.width,
+            )
+            row_end = min(
+                math.ceil((window.row_off + window.height) / factor) * factor,
+                src.height,
+            )
+            dst_window = Window(
+                col_off // factor,
+                row_off // factor,
+                min(math.ceil((col_end - col_off) / factor), dst.width),
+                min(math.ceil((row_end - row_off) / factor), dst.height),
+            )
+            # read already written data from the previous level, so the result does
+            # not depend on the order windows are written in
+            dst.write(
+                src.read(
+                    window=Window(
+                        col_off, row_off, col_end - col_off, row_end - row_off
+                    ),
+                    out_shape=(src.count, dst_window.height, dst_window.width),
+                    resampling=self.overviews_resampling,
+                ),
+                window=dst_window,
+            )
+            src, window, previous = dst, dst_window, level
+
+    def __exit__(self, exc_type, exc_value, exc_traceback):
+        try:
+            tags = self._base.tags()
+            base_path = self._base.name
+            for dst in [self._base] + self._overviews:
+                dst.close()
+            if exc_value is None and not self._direct:
+                vrt_path = MPath(self._tmp.name) / "assemble.vrt"
+                with vrt_path.open("w") as dst:
+                    dst.write(self._vrt_xml(base_path, tags))
+                if self.path.is_remote():
+                    out_path = MPath(self._tmp.name) / f"out{self.path.suffix}"
+                else:
+                    self.path.parent.makedirs(exist_ok=True)
+                    out_path = self.path
+                logger.debug("assemble %s from streamed data", self.path)
+                rasterio_copy(
+                    str(vrt_path),
+                    str(out_path),
+                    driver=self.driver,
+                    **self._creation_options(),
+                )
+                if self.path.is_remote():
+                    logger.debug("upload %s to %s", out_path, self.path)
+                    self.path.fs.put_file(str(out_path), self.path)
+        finally:
+            logger.debug("remove temporary files")
+            self._tmp.cleanup()
+
+    def _temp_profile(self, width: int, height: int, transform: Affine) -> dict:
+        blocksize = self.profile.get("blocksize", self.profile.get("blockxsize", 512))
+        return dict(
+            driver="GTiff",
+            width=width,
+            height=height,
+            count=self.profile["count"],
+            dtype=self.profile["dtype"],
+            crs=self.profile["crs"],
+            transform=transform,
+            nodata=self.profile.get("nodata"),
+            tiled=True,
+            blockxsize=blocksize,
+            blockysize=blocksize,
+            # temporary files only need fast, lossless compression
+            compress="deflate",
+            zlevel=1,
+            bigtiff="IF_SAFER",
+        )
+
+    def _creation_options(self) -> dict:
+        options = {
+            k: v
+            for k, v in self.profile.items()
+            if k
+            not in ["width", "height", "count", "dtype", "crs", "transform", "nodata"]
+        }
+        if self.driver == "COG":
+            options.update(overviews="FORCE_USE_EXISTING")
+        elif self.overviews_levels:
+            options.update(copy_src_overviews=True)
+        return options
+
+    def _vrt_xml(self, base_path: str, tags: dict) -> str:
+        vrt = ET.Element(
+            "VRTDataset",
+            rasterXSize=str(self._base.width),
+            rasterYSize=str(self._base.height),
+        )
+        ET.SubElement(vrt, "SRS").text = self._base.crs.to_wkt()
+        ET.SubElement(vrt, "GeoTransform").text = ", ".join(
+            map(str, self._base.transform.to_gdal())
+        )
+        if tags:
+            metadata = ET.SubElement(vrt, "Metadata")
+            for key, value in tags.items():
+                ET.SubElement(metadata, "MDI", key=key).text = str(value)
+        for band, dtype in enumerate(self._base.dtypes, 1):
+            vrt_band = ET.SubElement(
+                vrt, "VRTRasterBand", dataType=_gdal_typename(dtype), band=str(band)
+            )
+            if self._base.nodata is not None:
+                ET.SubElement(vrt_band, "NoDataValue").text = str(self._base.nodata)
+            for element, path in [("SimpleSource", base_path)] + [
+                ("Overview", dst.name) for dst in self._overviews
+            ]:
+                source = ET.SubElement(vrt_band, element)
+                ET.SubElement(source, "SourceFilename", relativeToVRT="0").text = path
+                ET.SubElement(source, "SourceBand").text = str(band)
+        return ET.tostring(vrt, encoding="unicode")
+
+
 def write_raster_window(
     in_grid: GridProtocol,
     in_data: ma.MaskedArray,
@@ -138,9 +366,11 @@ def write_raster_window(
     tags: Optional[dict] = None,
     write_empty: bool = False,
     **kwargs,
-):
+) -> bool:
     """
     Write a window from a numpy array to an output file.
+
+    Returns whether the window was written or skipped because it was empty.
     """
     out_path = MPath.from_inp(out_path)
     logger.debug("write %s", out_path)
@@ -171,8 +401,10 @@ def write_raster_window(
         except Exception as e:  # pragma: no cover
             logger.exception("error while writing file %s: %s", out_path, e)
             raise
+        return True
     else:
         logger.debug("array window empty, not writing %s", out_path)
+        return False
 
 
 def _write_tags(dst, tags):
@@ -4,6 +4,7 @@ from mapchete._deprecated import deprecated
 from mapchete.io.vector.convert import convert_vector
 from mapchete.io.vector.indexed_features import (
     IndexedFeatures,
+    STRtreeFeatures,
     read_vector,
     read_union_geometry,
 )
@@ -22,6 +23,7 @@ __all__ = [
     "read_vector_window",
     "write_vector_window",
     "IndexedFeatures",
+    "STRtreeFeatures",
     "convert_vector",
     "read_vector",
     "read_union_geometry",
@@ -0,0 +1,219 @@
+"""Worker-local cache of reprojected vector file windows."""
+
+from __future__ import annotations
+
+import logging
+import threading
+from dataclasses import dataclass
+from typing import Hashable, List, Optional, Tuple, Union
+
+from cachetools import LRUCache
+
+from mapchete.bounds import Bounds
+from mapchete.geometry.types import GeometryTypeLike
+from mapchete.grid import Grid
+from mapchete.io.vector.indexed_features import STRtreeFeatures
+from mapchete.io.vector.read import (
+    _get_reprojected_features_from_file,
+    reprojected_features,
+)
+from mapchete.path import MPath
+from mapchete.protocols import GridProtocol
+from mapchete.settings import mapchete_options
+from mapchete.types import BoundsLike, CRSLike, GeoJSONLikeFeature, MPathLike
+
+logger = logging.getLogger(__name__)
+
+_cache: Optional[VectorWindowCache] = None
+_cache_lock = threading.Lock()
+
+
+@dataclass
+class VectorWindowCacheStats:
+    """Counters of cache usage."""
+
+    hits: int = 0
+    misses: int = 0
+
+
+class VectorWindowCache:
+    """
+    Thread-safe LRU cache of reprojected features of vector file windows.
+
+    All features intersecting with a window are read using one query, clipped to the
+    window and reprojected into the target CRS once. Grids within this window are then
+    served from an STRtree of these features without opening the file again.
+
+    Windows are cached per file version (ETag or modification time), so a modified
+    file is read again even if the cache outlives a process run. Callers reading many
+    windows should determine the version once using path_version() and pass it on,
+    otherwise it is looked up on every read.
+
+    The cache size is accounted in number of cached features.
+    """
+
+    def __init__(self, maxsize: int = 100_000):
+        self._windows = LRUCache(maxsize=maxsize, getsizeof=_features_count)
+        self._lock = threading.RLock()
+        self.stats = VectorWindowCacheStats()
+
+    def __len__(self):
+        return len(self._windows)
+
+    def read(
+        self,
+        path: MPathLike,
+        grid: GridProtocol,
+        window: BoundsLike,
+        validity_check: bool = True,
+        clip_to_crs_bounds: bool = False,
+        target_geometry_type: Optional[
+            Union[GeometryTypeLike, Tuple[GeometryTypeLike]]
+        ] = None,
+        file_version: Optional[Hashable] = None,
+    ) -> List[GeoJSONLikeFeature]:
+        """
+        Read features of grid from cached window.
+
+        The window has to be given in the grid CRS and has to contain the grid bounds.
+        """
+        features = self.window_features(
+            path,
+            window,
+            grid.crs,
+            validity_check=validity_check,
+            clip_to_crs_bounds=clip_to_crs_bounds,
+            file_version=file_version,
+        )
+        return list(
+            reprojected_features(
+                features,
+                grid,
+                validity_check=validity_check,
+                clip_to_crs_bounds=clip_to_crs_bounds,
+                target_geometry_type=target_geometry_type,
+            )
+        )
+
+    def window_features(
+        self,
+        path: MPathLike,
+        window: BoundsLike,
+        crs: CRSLike,
+        validity_check: bool = True,
+        clip_to_crs_bounds: bool = False,
+        file_version: Optional[Hashable] = None,
+    ) -> STRtreeFeatures:
+        """Return reprojected features of window, read them if not yet cached."""
+        path = MPath.from_inp(path)
+        window = Bounds.from_inp(window)
+        key = _window_key(
+            path,
+            path_version(path) if file_version is None else file_version,
+            window,
+            crs,
+            validity_check,
+            clip_to_crs_bounds,
+        )
+        with self._lock:
+            try:
+                features = self._windows[key]
+                self.stats.hits += 1
+                return features
+            except KeyError:
+                self.stats.misses += 1
+        logger.debug("prefetch features from %s within %s", path, window)
+        # clipped features do not carry IDs, so they are indexed by their position
+        features = STRtreeFeatures(
+            enumerate(
+                list(
+                    _get_reprojected_features_from_file(
+                        path,
+                        Grid.from_bounds(window, shape=(1, 1), crs=crs),
+                        validity_check=validity_check,
+                        clip_to_crs_bounds=clip_to_crs_bounds,
+                    )
+                )
+            ),
+            crs=crs,
+        )
+        with self._lock:
+            try:
+                self._windows[key] = features
+            except ValueError:  # pragma: no cover
+                logger.debug("window %s too large to be cached", window)
+        return features
+
+    def clear(self) -> None:
+        with self._lock:
+            self._windows.clear()
+
+    def __repr__(self):  # pragma: no cover
+        return f"<VectorWindowCache windows={len(self)}, stats={self.stats}>"
+
+
+def vector_window_cache() -> Optional[VectorWindowCache]:
+    """
+    Return cache of current worker process.
+
+    The size is configured by the MAPCHETE_VECTOR_READ_CACHE_SIZE setting. If set to 0,
+    no cache is used.
+    """
+    global _cache
+    if not mapchete_options.vector_read_cache_size:
+        return None
+    with _cache_lock:
+        if _cache is None:
+            _cache = VectorWindowCache(maxsize=mapchete_options.vector_read_cache_size)
+        return _cache
+
+
+def row_window(grid_bounds: BoundsLike, data_bounds: BoundsLike) -> Bounds:
+    """
+    Window spanning data bounds horizontally and grid bounds vertically.
+
+    All tiles of a tile row share the same window, which corresponds with how tile
+    tasks are batched by row.
+    """
+    grid_bounds = Bounds.from_inp(grid_bounds)
+    data_bounds = Bounds.from_inp(data_bounds, strict=False)
+    return Bounds(
+        min(grid_bounds.left, data_bounds.left),
+        grid_bounds.bottom,
+        max(grid_bounds.right, data_bounds.right),
+        grid_bounds.top,
+    )
+
+
+def _window_key(
+    path: MPath,
+    file_version: Optional[Hashable],
+    window: Bounds,
+    crs: CRSLike,
+    validity_check: bool,
+    clip_to_crs_bounds: bool,
+) -> Hashable:
+    return (
+        str(path),
+        file_version,
+        tuple(window),
+        str(crs),
+        validity_check,
+        clip_to_crs_bounds,
+    )
+
+
+def path_version(path: MPath) -> Optional[Hashable]:
+    """Return ETag or modification time of file."""
+    try:
+        info = path.info()
+    except (FileNotFoundError, NotImplementedError):  # pragma: no cover
+        return None
+    for key in ["ETag", "LastModified", "mtime"]:
+        if info.get(key):
+            return info[key]
+    return None  # pragma: no cover
+
+
+def _features_count(features: STRtreeFeatures) -> int:
+    return max(len(features), 1)
@@ -1,13 +1,15 @@
 from __future__ import annotations
 
-from itertools import chain
+from itertools import chain, repeat
 import logging
 from typing import Any, Dict, Iterable, List, Literal, Optional, Tuple, Union
 import warnings
 
 from fiona import Collection
+import numpy as np
 from rasterio.crs import CRS
 from retry import retry
+import shapely
 from shapely import GeometryCollection, prepare, unary_union
 from mapchete.bounds import Bounds
 from mapchete.errors import NoCRSError, NoGeoError
@@ -223,15 +225,17 @@ class IndexedFeatures(FeatureCollectionProtocol):
         else:
             self.bounds += bounds
 
-    @staticmethod
+    @classmethod
     def from_fiona(
+        cls,
         src: Collection,
         index: Optional[Literal["rtree"]] = "rtree",
     ) -> IndexedFeatures:
-        return IndexedFeatures(src, index=index, crs=src.crs)
+        return cls(src, index=index, crs=src.crs)
 
-    @staticmethod
+    @classmethod
     def from_file(
+        cls,
         path: MPathLike,
         grid: Optional[Union[Grid, GridProtocol]] = None,
         index: Optional[Literal["rtree"]] = "rtree",
@@ -239,7 +243,7 @@ class IndexedFeatures(FeatureCollectionProtocol):
     ) -> IndexedFeatures:
         logger.debug(f"reading {str(path)} into memory")
         if grid:
-            return IndexedFeatures(
+            return cls(
                 features=read_vector_window(path, grid=Grid.from_obj(grid), **kwargs),
                 index=index,
                 crs=grid.crs,
@@ -248,15 +252,309 @@ class IndexedFeatures(FeatureCollectionProtocol):
         @retry(logger=logger, **dict(IORetrySettings()))
         def _read_vector():
             with fiona_open(path, "r") as src:
-                return IndexedFeatures.from_fiona(src, index=index)
+                return cls.from_fiona(src, index=index)
 
         return _read_vector()
 
 
+class STRtreeFeatures(IndexedFeatures):
+    """
+    Columnar variant of IndexedFeatures using a shapely STRtree as spatial index.
+
+    Geometries are stored in a shapely geometry array and feature properties in one
+    array per attribute. Features are only assembled as GeoJSON-like dictionaries
+    when they are returned, which makes this class suitable for caching large vector
+    datasets in memory.
+
+    Features are returned as dictionaries with "id", "properties" and a shapely
+    "geometry". Properties missing in a feature are returned as None.
+
+    Parameters
+    ----------
+    features : iterable
+        Features to be indexed
+    index : string
+        Ignored, only available for compatibility with IndexedFeatures.
+    """
+
+    _ids: np.ndarray
+    _keys: np.ndarray
+    _geometries: np.ndarray
+    _columns: Dict[str, np.ndarray]
+
+    def __init__(
+        self,
+        features: Iterable[Any],
+        index: Optional[str] = None,
+        allow_non_geo_objects: bool = False,
+        crs: Optional[CRSLike] = None,
+    ):
+        self.crs = crs or getattr(features, "crs", None)
+        keys, ids, geometries, properties = [], [], [], []
+        for feature in features:
+            if isinstance(feature, tuple):
+                key, feature = feature
+            else:
+                key = object_id(feature)
+            keys.append(key)
+            ids.append(_object_feature_id(feature))
+            try:
+                geometries.append(object_geometry(feature))
+            except NoGeoError:
+                if allow_non_geo_objects:
+                    geometries.append(None)
+                else:
+                    raise
+            properties.append(_object_properties(feature))
+        columns = {}
+        for feature_properties in properties:
+            for column in feature_properties:
+                columns.setdefault(column, None)
+        self._set_columns(
+            keys=_object_array(keys),
+            ids=_object_array(ids),
+            geometries=_object_array(geometries),
+            columns={
+                column: _object_array(
+                    [
+                        feature_properties.get(column)
+                        for feature_properties in properties
+                    ]
+                )
+                for column in columns
+            },
+        )
+
+    def _set_columns(
+        self,
+        keys: np.ndarray,
+        ids: np.ndarray,
+        geometries: np.ndarray,
+        columns: Dict[str, np.ndarray],
+    ):
+        self._keys = keys
+        self._ids = ids
+        self._geometries = geometries
+        self._columns = columns
+        self._non_geo_positions = np.flatnonzero(shapely.is_missing(geometries))
+        self._tree = None
+        self._positions = None
+        if len(self._non_geo_positions) == len(geometries):
+            self.bounds = None
+        else:
+            self.bounds = Bounds.from_inp(shapely.total_bounds(geometries).tolist())
+
+    def __repr__(self):  # pragma: no cover
+        return f"STRtreeFeatures(features={len(self)}, bounds={self.bounds})"
+
+    def __str__(self):  # pragma: no cover
+        return "STRtreeFeatures([%s])" % (", ".join([str(f) for f in self]))
+
+    def __getstate__(self):
+        # spatial index and key lookup are rebuilt on demand after unpickling
+        state = self.__dict__.copy()
+        state.update(_tree=None, _positions=None)
+        return state
+
+    def __len__(self):
+        return len(self._keys)
+
+    def __getitem__(self, key: int):
+        if self._positions is None:
+            self._positions = {k: position for position, k in enumerate(self._keys)}
+        try:
+            position = self._positions[hash(key)]
+        except KeyError:
+            raise KeyError(f"no feature with id {key} exists")
+        return self._features(np.array([position]))[0]
+
+    def __iter__(self):
+        return iter(self._features(np.arange(len(self))))
+
+    def items(self):
+        return zip(self._keys, self)
+
+    def keys(self) -> Iterable[int]:
+        return iter(self._keys)
+
+    def values(self) -> Iterable[Any]:
+        return iter(self)
+
+    @property
+    def tree(self) -> shapely.STRtree:
+        """Spatial index, which gets built on first access."""
+        if self._tree is None:
+            self._tree = shapely.STRtree(self._geometries)
+        return self._tree
+
+    def filter(
+        self,
+        bounds: Optional[BoundsLike] = None,
+        bbox: Optional[BoundsLike] = None,
+        target_geometry_type: Optional[
+            Union[GeometryTypeLike, Tuple[GeometryTypeLike]]
+        ] = None,
+    ) -> List[Any]:
+        """
+        Return features intersecting with bounds.
+
+        Parameters
+        ----------
+        bounds : list or tuple
+            Bounding coordinates (left, bottom, right, top).
+
+        Returns
+        -------
+        features : list
+            List of features.
+        """
+        return self._features(
+            self._filter_positions(
+                bounds or bbox, target_geometry_type=target_geometry_type
+            )
+        )
+
+    def filter_many(
+        self,
+        bounds: Iterable[BoundsLike],
+        target_geometry_type: Optional[
+            Union[GeometryTypeLike, Tuple[GeometryTypeLike]]
+        ] = None,
+    ) -> List[List[Any]]:
+        """
+        Return features intersecting with each of the given bounds.
+
+        All bounds are queried against the spatial index at once.
+
+        Parameters
+        ----------
+        bounds : iterable
+            Bounding coordinates (left, bottom, right, top) to be queried.
+
+        Returns
+        -------
+        features : list
+            One list of features per bounds.
+        """
+        return [
+            self._features(self._filter_geometry_type(positions, target_geometry_type))
+            for positions in self._query_many(bounds)
+        ]
+
+    def subset(self, bounds: BoundsLike) -> STRtreeFeatures:
+        """Return new collection containing only features intersecting with bounds."""
+        positions = self._filter_positions(bounds)
+        subset = STRtreeFeatures.__new__(STRtreeFeatures)
+        subset.crs = self.crs
+        subset._set_columns(
+            keys=self._keys[positions],
+            ids=self._ids[positions],
+            geometries=self._geometries[positions],
+            columns={
+                column: values[positions] for column, values in self._columns.items()
+            },
+        )
+        return subset
+
+    def read_union_geometry(
+        self,
+        bounds: Optional[BoundsLike] = None,
+        clip: bool = False,
+        target_geometry_type: Optional[
+            Union[GeometryTypeLike, Tuple[GeometryTypeLike]]
+        ] = None,
+    ) -> Geometry:
+        geometries = self._geometries[
+            self._filter_positions(bounds, target_geometry_type=target_geometry_type)
+        ]
+        geometries = geometries[~shapely.is_missing(geometries)]
+        if bounds and clip:
+            geometries = shapely.intersection(
+                geometries, to_shape(Bounds.from_inp(bounds))
+            )
+            geometries = geometries[~shapely.is_empty(geometries)]
+        if len(geometries):
+            return unary_union(geometries)
+        return GeometryCollection()
+
+    def _features(self, positions: np.ndarray) -> List[GeoJSONLikeFeature]:
+        # slice each column once instead of indexing object arrays per feature
+        columns = list(self._columns)
+        if columns:
+            properties = zip(
+                *(self._columns[column][positions].tolist() for column in columns)
+            )
+        else:
+            properties = repeat(())
+        features = []
+        for id_, geometry, values in zip(
+            self._ids[positions].tolist(),
+            self._geometries[positions].tolist(),
+            properties,
+        ):
+            feature = {"properties": dict(zip(columns, values)), "geometry": geometry}
+            if id_ is not None:
+                feature["id"] = id_
+            features.append(feature)
+        return features
+
+    def _filter_positions(
+        self,
+        bounds: Optional[BoundsLike] = None,
+        target_geometry_type: Optional[
+            Union[GeometryTypeLike, Tuple[GeometryTypeLike]]
+        ] = None,
+    ) -> np.ndarray:
+        if bounds:
+            positions = self._query_many([bounds])[0]
+        else:
+            positions = np.arange(len(self))
+        return self._filter_geometry_type(positions, target_geometry_type)
+
+    def _filter_geometry_type(
+        self,
+        positions: np.ndarray,
+        target_geometry_type: Optional[
+            Union[GeometryTypeLike, Tuple[GeometryTypeLike]]
+        ] = None,
+    ) -> np.ndarray:
+        if target_geometry_type is None:
+            return positions
+        return positions[
+            np.fromiter(
+                (
+                    is_type(self._geometries[position], target_geometry_type)
+                    for position in positions
+                ),
+                dtype=bool,
+                count=len(positions),
+            )
+        ]
+
+    def _query_many(self, bounds: Iterable[BoundsLike]) -> List[np.ndarray]:
+        bounds = [Bounds.from_inp(b) for b in bounds]
+        if not bounds:
+            return []
+        boxes = shapely.box(*np.array([tuple(b) for b in bounds], dtype=float).T)
+        query_idx, positions = self.tree.query(boxes)
+        # query results are sorted by query index, so they can be split by it
+        order = np.lexsort((positions, query_idx))
+        query_idx, positions = query_idx[order], positions[order]
+        splits = np.searchsorted(query_idx, np.arange(1, len(bounds)))
+        if len(self._non_geo_positions):
+            return [
+                np.union1d(query_positions, self._non_geo_positions)
+                for query_positions in np.split(positions, splits)
+            ]
+        return np.split(positions, splits)
+
+
 def read_vector(
     path: MPathLike,
-    index: Optional[Literal["rtree"]] = "rtree",
+    index: Optional[Literal["rtree", "strtree"]] = "rtree",
 ) -> IndexedFeatures:
+    if index == "strtree":
+        return STRtreeFeatures.from_file(path)
     return IndexedFeatures.from_file(path, index=index)
 
 
@@ -282,6 +580,32 @@ def object_id(obj: Any) -> int:
             raise TypeError("object need to have an id or have to be hashable")
 
 
+def _object_feature_id(obj: Any) -> Any:
+    if hasattr(obj, "id"):
+        return obj.id
+    elif isinstance(obj, dict):
+        return obj.get("id")
+    return None
+
+
+def _object_properties(obj: Any) -> Dict[str, Any]:
+    if hasattr(obj, "properties"):
+        properties = obj.properties
+    elif hasattr(obj, "get"):
+        properties = obj.get("properties")
+    else:
+        properties = None
+    return dict(properties or {})
+
+
+def _object_array(values: List[Any]) -> np.ndarray:
+    # fill element-wise, otherwise numpy would try to broadcast sequence values
+    array = np.empty(len(values), dtype=object)
+    for position, value in enumerate(values):
+        array[position] = value
+    return array
+
+
 def object_geometry(obj: Any) -> Geometry:
     """
     Determine geometry from object if available.
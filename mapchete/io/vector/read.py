@@ -24,6 +24,7 @@ from mapchete.geometry import (
 )
 from mapchete.geometry.clip import clip_grid_to_pyramid_bounds
 from mapchete.geometry.filter import omit_empty_geometries
+from mapchete.geometry.reproject import reproject_geometries
 from mapchete.geometry.types import (
     GeometryTypeLike,
 )
@@ -228,6 +229,7 @@ def reprojected_features(
             validity_check=True,
         )
     prepare(dst_bbox)
+    clipped = []
     for feature in src.filter(bbox=dst_bbox.bounds):
         try:
             # check validity
@@ -239,23 +241,31 @@ def reprojected_features(
                 dst_bbox.intersection(original_geom),
                 target_geometry_type,
             ):
-                # reproject each feature to grid CRS
-                for reprojected_geom in omit_empty_geometries(
-                    reproject_geometry(
-                        checked_geom,
-                        src_crs=src.crs,
-                        dst_crs=grid.crs,
-                        validity_check=validity_check,
-                        clip_to_crs_bounds=clip_to_crs_bounds,
-                    )
-                ):
-                    for filtered_geom in filter_by_geometry_type(
-                        reprojected_geom, target_geometry_type
-                    ):
-                        yield {
-                            "properties": feature["properties"],
-                            "geometry": mapping(filtered_geom),
-                        }
+                clipped.append(
+                    (feature["properties"], checked_geom, target_geometry_type)
+                )
         # this can be handled quietly
         except TopologicalError as e:  # pragma: no cover
             logger.warning("feature omitted: %s", e)
+
+    # reproject all features to grid CRS at once
+    reprojected_geoms = reproject_geometries(
+        [checked_geom for _, checked_geom, _ in clipped],
+        src_crs=src.crs,
+        dst_crs=grid.crs,
+        validity_check=validity_check,
+        clip_to_crs_bounds=clip_to_crs_bounds,
+        skip_invalid=True,
+    )
+    for (properties, _, geometry_type), reprojected_geom in zip(
+        clipped, reprojected_geoms
+    ):
+        if reprojected_geom is None:  # pragma: no cover
+            logger.warning("feature omitted: reprojected geometry is invalid")
+            continue
+        for nonempty_geom in omit_empty_geometries(reprojected_geom):
+            for filtered_geom in filter_by_geometry_type(nonempty_geom, geometry_type):
+                yield {
+                    "properties": properties,
+                    "geometry": mapping(filtered_geom),
+                }
@@ -142,7 +142,7 @@ def write_vector_window(
     out_driver: str = "GeoJSON",
     allow_multipart_geometries: bool = True,
     **kwargs,
-):
+) -> bool:
     """
     Write features to file.
 
@@ -156,6 +156,11 @@ def write_vector_window(
         tile used for output extent
     out_path : string
         output path for file
+
+    Returns
+    -------
+    written : bool
+        False if no features were within the tile
     """
     # Delete existing file.
     out_path = MPath.from_inp(out_path)
@@ -193,6 +198,8 @@ def write_vector_window(
         except Exception as e:
             logger.error("error while writing file %s: %s", out_path, e)
             raise
+        return True
 
     else:
         logger.debug((out_tile.id, "nothing to write", out_path))
+        return False
@@ -16,6 +16,7 @@ from typing import (
     Any,
     Dict,
     Generator,
+    Iterable,
     List,
     Optional,
     Set,
@@ -38,7 +39,7 @@ from mapchete.executor import Executor
 from mapchete.pretty import pretty_bytes
 from mapchete.protocols import ObserverProtocol
 from mapchete.settings import GDALHTTPOptions, IORetrySettings, mapchete_options
-from mapchete.tile import BatchBy, BufferedTile
+from mapchete.tile import BatchBy, BufferedTile, BufferedTileBatch
 from mapchete.timer import Timer
 from mapchete.types import MPathLike, Progress
 
@@ -521,7 +522,10 @@ class MPath(os.PathLike):
             import boto3
 
             bucket = self.without_protocol().elements[0]
-            prefix = "/".join(self.without_protocol().elements[1:])
+            prefix = "/".join(self.without_protocol().elements[1:]).rstrip("/")
+            # without trailing slash, e.g. "out/1" would also list "out/10" to "out/19"
+            if prefix:
+                prefix += "/"
             s3_client = boto3.client(
                 "s3",
                 region_name=self.storage_options.get("region_name"),
@@ -1077,13 +1081,21 @@ def _output_tiles_batches_exist(
     with Executor(concurrency=mapchete_options.tiles_exist_concurrency) as executor:
         for batch in executor.as_completed(
             _output_tiles_batch_exists,
-            (list(b) for b in output_tiles_batches),
+            (_compact_batch(b) for b in output_tiles_batches),
             fargs=(config, is_https_without_ls),
         ):
             yield from batch.result()
 
 
+def _compact_batch(
+    batch: Iterable[BufferedTile],
+) -> Union[BufferedTileBatch, List[BufferedTile]]:
+    # keep compact batches as they are, tiles get materialized on the worker
+    return batch if isinstance(batch, BufferedTileBatch) else list(batch)
+
+
 def _output_tiles_batch_exists(tiles, config, is_https_without_ls):
+    tiles = list(tiles)
     if tiles:
         zoom = tiles[0].zoom
         # determine output paths
@@ -1108,7 +1120,7 @@ def _process_tiles_batches_exist(process_tiles_batches, config, is_https_without
     with Executor(concurrency=mapchete_options.tiles_exist_concurrency) as executor:
         for batch in executor.as_completed(
             _process_tiles_batch_exists,
-            (list(b) for b in process_tiles_batches),
+            (_compact_batch(b) for b in process_tiles_batches),
             fargs=(config, is_https_without_ls),
         ):
             yield from batch.result()
@@ -1123,6 +1135,7 @@ def _process_tiles_batch_exists(tiles, config, is_https_without_ls):
         else:
             return True
 
+    tiles = list(tiles)
     if tiles:
         zoom = tiles[0].zoom
         # determine output tile rows
@@ -1,10 +1,13 @@
-"""Contour line extraction using matplotlib."""
+"""Contour line extraction using marching squares."""
 
 import logging
-from typing import Generator, List, Optional
+import math
+from typing import Generator, List, Optional, Tuple
 
 import numpy as np
-from shapely.geometry import LineString, mapping, shape
+import numpy.ma as ma
+from shapely import clip_by_rect, get_parts, line_merge, linestrings, multilinestrings
+from shapely.geometry import mapping, shape
 from shapely.ops import unary_union
 
 from mapchete import Empty, RasterInput, VectorInput
@@ -27,6 +30,7 @@ def execute(
     td_matching_precision: int = 8,
     td_fallback_to_higher_zoom: bool = False,
     clip_pixelbuffer=0,
+    smoothing: float = 0,
 ) -> List[dict]:
     """
     Generate hillshade from DEM.
@@ -68,6 +72,10 @@ def execute(
         areas with no data.
     clip_pixelbuffer : int
         Use pixelbuffer when clipping output by geometry. (default: 0)
+    smoothing : float
+        Standard deviation in pixels of a gaussian filter applied to the DEM before
+        extracting contours. For seamless lines across tiles, the process pixelbuffer
+        should be larger than three times this value. (default: 0)
 
     Output
     ------
@@ -98,7 +106,7 @@ def execute(
         logger.debug("DEM data empty over tile")
         raise Empty("DEM data empty over tile")
 
-    logger.debug("calculate hillshade")
+    logger.debug("extract contours")
     contour_lines = list(
         generate_contours(
             dem_data,
@@ -106,6 +114,7 @@ def execute(
             interval=interval,
             field=field,
             base=base,
+            smoothing=smoothing,
         )
     )
 
@@ -138,28 +147,179 @@ def generate_contours(
     interval: float = 100,
     field: str = "elev",
     base: float = 0,
+    smoothing: float = 0,
 ) -> Generator[dict, None, None]:
-    import matplotlib.pyplot as plt
+    """
+    Yield contour lines of array as GeoJSON-like features.
 
-    elevations = (
-        get_contour_values(array.min(), array.max(), interval=interval, base=base) or []
+    Contours are traced through pixel centers using marching squares. Cells touching
+    masked or NaN pixels are omitted. If the tile has a pixelbuffer, lines are clipped
+    to the unbuffered tile bounds, so lines of neighboring tiles meet exactly at the
+    tile boundaries.
+    """
+    array = array[0] if array.ndim == 3 else array
+    valid = ~ma.getmaskarray(array)
+    values = np.asarray(ma.getdata(array), dtype=np.float64)
+    valid &= np.isfinite(values)
+    if valid.sum() < 4:
+        return
+    if smoothing:
+        values, valid = _gaussian_filter(values, valid, smoothing)
+    clip_bounds = (
+        tile.tile_pyramid.tile(*tile.id).bounds() if tile.pixelbuffer else None
     )
-    for elevation, contours in zip(
-        elevations, plt.contour(array, elevations).collections
-    ):
-        for path in contours.get_paths():
-            out_coords = [
-                (
-                    tile.left + (y * tile.pixel_x_size),
-                    tile.top - (x * tile.pixel_y_size),
-                )
-                for x, y in np.asarray(path.vertices)
-            ]
-            if len(out_coords) >= 2:
-                yield dict(
-                    properties={field: elevation},
-                    geometry=mapping(LineString(out_coords)),
+    elevations = get_contour_values(
+        values[valid].min(), values[valid].max(), interval=interval, base=base
+    )
+    cells = _Cells(values, valid)
+    for elevation in elevations:
+        segments = cells.segments(elevation)
+        if not len(segments):
+            continue
+        # pixel centers to map coordinates
+        coords = np.empty_like(segments)
+        coords[..., 0] = tile.affine.c + (segments[..., 1] + 0.5) * tile.affine.a
+        coords[..., 1] = tile.affine.f + (segments[..., 0] + 0.5) * tile.affine.e
+        lines = line_merge(multilinestrings(linestrings(coords)))
+        if clip_bounds is not None:
+            lines = line_merge(clip_by_rect(lines, *clip_bounds))
+        for line in get_parts(lines):
+            if line.geom_type == "LineString" and not line.is_empty:
+                yield dict(properties={field: elevation}, geometry=mapping(line))
+
+
+class _Cells:
+    """Marching squares cells between the centers of four neighboring pixels."""
+
+    # segments per cell type as pairs of (top, right, bottom, left) edges, with cell
+    # types from the corners above the contour value: top left (8), top right (4),
+    # bottom right (2) and bottom left (1)
+    SEGMENTS = {
+        1: [(3, 2)],
+        2: [(2, 1)],
+        3: [(3, 1)],
+        4: [(0, 1)],
+        6: [(0, 2)],
+        7: [(0, 3)],
+        8: [(0, 3)],
+        9: [(0, 2)],
+        11: [(0, 1)],
+        12: [(3, 1)],
+        13: [(2, 1)],
+        14: [(3, 2)],
+    }
+    # saddle cells are resolved by the cell center value
+    SADDLE_SEGMENTS = {
+        # (center above, center below)
+        5: ([(0, 3), (2, 1)], [(0, 1), (3, 2)]),
+        10: ([(0, 1), (3, 2)], [(0, 3), (2, 1)]),
+    }
+
+    def __init__(self, values: np.ndarray, valid: np.ndarray):
+        self.values = values
+        top_left, top_right = values[:-1, :-1], values[:-1, 1:]
+        bottom_left, bottom_right = values[1:, :-1], values[1:, 1:]
+        self.min = np.minimum(
+            np.minimum(top_left, top_right), np.minimum(bottom_left, bottom_right)
+        )
+        self.max = np.maximum(
+            np.maximum(top_left, top_right), np.maximum(bottom_left, bottom_right)
+        )
+        invalid = ~(valid[:-1, :-1] & valid[:-1, 1:] & valid[1:, :-1] & valid[1:, 1:])
+        self.min[invalid] = np.inf
+        self.max[invalid] = -np.inf
+
+    def segments(self, level: float) -> np.ndarray:
+        """Return line segments as array of (row, col) pixel coordinate pairs."""
+        rows, cols = np.nonzero((self.min <= level) & (self.max > level))
+        corners = [
+            self.values[rows, cols],
+            self.values[rows, cols + 1],
+            self.values[rows + 1, cols + 1],
+            self.values[rows + 1, cols],
+        ]
+        top_left, top_right, bottom_right, bottom_left = corners
+        cell_types = (
+            (top_left > level) * 8
+            + (top_right > level) * 4
+            + (bottom_right > level) * 2
+            + (bottom_left > level) * 1
+        )
+        # crossing points on cell edges; shared edges of neighboring cells are
+        # computed from the same values and therefore yield identical points
+        with np.errstate(divide="ignore", invalid="ignore"):
+            edges = np.stack(
+                [
+                    np.stack(
+                        [rows, cols + (level - top_left) / (top_right - top_left)],
+                        axis=-1,
+                    ),
+                    np.stack(
+                        [
+                            rows + (level - top_right) / (bottom_right - top_right),
+                            cols + 1,
+                        ],
+                        axis=-1,
+                    ),
+                    np.stack(
+                        [
+                            rows + 1,
+                            cols + (level - bottom_left) / (bottom_right - bottom_left),
+                        ],
+                        axis=-1,
+                    ),
+                    np.stack(
+                        [rows + (level - top_left) / (bottom_left - top_left), cols],
+                        axis=-1,
+                    ),
+                ]
+            )
+        segments = []
+        for cell_type, cell_segments in self.SEGMENTS.items():
+            selected = cell_types == cell_type
+            for start, end in cell_segments:
+                segments.append(
+                    np.stack([edges[start][selected], edges[end][selected]], axis=1)
                 )
+        center_above = (top_left + top_right + bottom_right + bottom_left) / 4 > level
+        for cell_type, (above, below) in self.SADDLE_SEGMENTS.items():
+            saddles = cell_types == cell_type
+            for selected, cell_segments in [
+                (saddles & center_above, above),
+                (saddles & ~center_above, below),
+            ]:
+                for start, end in cell_segments:
+                    segments.append(
+                        np.stack([edges[start][selected], edges[end][selected]], axis=1)
+                    )
+        return np.concatenate(segments)
+
+
+def _gaussian_filter(
+    values: np.ndarray, valid: np.ndarray, sigma: float
+) -> Tuple[np.ndarray, np.ndarray]:
+    # separable gaussian filter ignoring invalid pixels
+    radius = max(int(math.ceil(3 * sigma)), 1)
+    kernel = np.exp(-0.5 * (np.arange(-radius, radius + 1) / sigma) ** 2)
+    weights = valid.astype(np.float64)
+    data = np.where(valid, values, 0.0)
+    for axis in (0, 1):
+        data = _convolve_axis(data, kernel, axis)
+        weights = _convolve_axis(weights, kernel, axis)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(valid, data / weights, 0.0), valid
+
+
+def _convolve_axis(array: np.ndarray, kernel: np.ndarray, axis: int) -> np.ndarray:
+    radius = len(kernel) // 2
+    padding = [(0, 0), (0, 0)]
+    padding[axis] = (radius, radius)
+    padded = np.pad(array, padding)
+    out = np.zeros_like(array)
+    size = array.shape[axis]
+    for offset, weight in enumerate(kernel):
+        out += weight * np.take(padded, range(offset, offset + size), axis=axis)
+    return out
 
 
 def get_contour_values(
@@ -37,12 +37,14 @@ OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
 import logging
 import math
 import warnings
+from enum import Enum
 from itertools import product
 from typing import Optional, Tuple
 
 import numpy as np
 import numpy.ma as ma
 from affine import Affine
+from numpy.typing import DTypeLike
 
 from mapchete import Empty, RasterInput, VectorInput
 from mapchete.io import MatchingMethod
@@ -50,6 +52,15 @@ from mapchete.types import ResamplingLike
 
 logger = logging.getLogger(__name__)
 
+# light source directions of multidirectional shading, as used by gdaldem
+MULTIDIRECTIONAL_AZIMUTHS = (225.0, 270.0, 315.0, 360.0)
+
+
+class HillshadeMode(str, Enum):
+    single = "single"
+    multidirectional = "multidirectional"
+    combined = "combined"
+
 
 def execute(
     dem: RasterInput,
@@ -59,6 +70,7 @@ def execute(
     altitude: float = 45.0,
     z: float = 1.0,
     scale: float = 1.0,
+    mode: HillshadeMode = HillshadeMode.single,
     td_matching_method: MatchingMethod = MatchingMethod.gdal,
     td_matching_max_zoom: Optional[int] = None,
     td_matching_precision: int = 8,
@@ -99,6 +111,7 @@ def execute(
         altitude=altitude,
         z=z,
         scale=scale,
+        mode=mode,
     )
 
 
@@ -165,16 +178,22 @@ def hillshade(
     altitude: float = 45.0,
     z: float = 1.0,
     scale: float = 1.0,
+    mode: HillshadeMode = HillshadeMode.single,
+    dtype: DTypeLike = np.float32,
+    chunk_rows: Optional[int] = 256,
 ) -> ma.MaskedArray:
     """
     Return hillshaded numpy array.
 
+    The shading is computed in strips of rows using in-place operations, so besides
+    the output only a few temporary arrays of strip size are allocated.
+
     Parameters
     ----------
     elevation : array
         Input elevation data.
-    tile : Tile
-        Tile covering the array.
+    affine : Affine
+        Affine of the array.
     azimuth : float
         Light source direction in degrees. (default: 315, top left)
     altitude : float
@@ -184,22 +203,151 @@ def hillshade(
     scale : float
         Scale factor of pixel size units versus height units (insert 112000
         when having elevation values in meters in a geodetic projection).
+    mode : HillshadeMode
+        "single" shades from azimuth, "multidirectional" combines shading from four
+        directions weighted by aspect (azimuth is ignored) and "combined" combines
+        shading from azimuth with slope shading. (default: single)
+    dtype : dtype
+        Floating point type used for calculations. (default: float32)
+    chunk_rows : int
+        Number of rows calculated at once. If None, the whole array is calculated at
+        once. (default: 256)
     """
     elevation = elevation[0] if elevation.ndim == 3 else elevation
-    azimuth = float(azimuth)
-    altitude = float(altitude)
-    z = float(z)
-    scale = float(scale)
-    xres = affine[0]
-    yres = affine[4]
-    slope, aspect = calculate_slope_aspect(elevation, xres, yres, z=z, scale=scale)
-    deg2rad = math.pi / 180.0
-    # shaded has values between -1.0 and +1.0
-    shaded = np.sin(altitude * deg2rad) * np.sin(slope) + np.cos(
-        altitude * deg2rad
-    ) * np.cos(slope) * np.cos((azimuth - 90.0) * deg2rad - aspect)
-    # stretch to 0 - 255 and add one pixel padding using the edge values
-    return ma.masked_array(
-        data=np.pad(np.clip(shaded * 255.0, 1, 255).astype(np.uint8), 1, mode="edge"),
-        mask=elevation.mask,
+    mode = HillshadeMode(mode)
+    height, width = elevation.shape
+    mask = ma.getmaskarray(elevation)
+    shaded = np.empty((height, width), dtype=np.uint8)
+    if height < 3 or width < 3:  # pragma: no cover
+        shaded[:] = 1
+        return ma.masked_array(data=shaded, mask=mask)
+
+    data = ma.getdata(elevation)
+    # constants applied to the sums of the 3x3 neighborhood columns and rows
+    x_factor = float(z) / (8.0 * affine[0] * float(scale))
+    y_factor = float(z) / (8.0 * affine[4] * float(scale))
+    altitude = math.radians(float(altitude))
+    azimuths = (
+        MULTIDIRECTIONAL_AZIMUTHS
+        if mode == HillshadeMode.multidirectional
+        else (azimuth,)
     )
+    # light source directions relative to the aspect angle
+    directions = [
+        (
+            math.sin(math.radians(float(azimuth) - 90.0)),
+            math.cos(math.radians(float(azimuth) - 90.0)),
+        )
+        for azimuth in azimuths
+    ]
+    chunk_rows = chunk_rows or height
+    with np.errstate(all="ignore"):
+        for row in range(0, height - 2, chunk_rows):
+            rows = min(chunk_rows, height - 2 - row)
+            _shade_rows(
+                np.asarray(data[row : row + rows + 2], dtype=dtype),
+                out=shaded[row + 1 : row + rows + 1, 1:-1],
+                x_factor=x_factor,
+                y_factor=y_factor,
+                sin_altitude=math.sin(altitude),
+                cos_altitude=math.cos(altitude),
+                directions=directions,
+                mode=mode,
+            )
+
+    # pixels next to masked pixels cannot be shaded
+    if mask.any():
+        masked_neighbors = mask.copy()
+        masked_neighbors[1:] |= mask[:-1]
+        masked_neighbors[:-1] |= mask[1:]
+        masked_neighbors[:, 1:] |= masked_neighbors[:, :-1].copy()
+        masked_neighbors[:, :-1] |= masked_neighbors[:, 1:].copy()
+        shaded[masked_neighbors] = 1
+
+    # add one pixel padding using the edge values
+    shaded[0] = shaded[1]
+    shaded[-1] = shaded[-2]
+    shaded[:, 0] = shaded[:, 1]
+    shaded[:, -1] = shaded[:, -2]
+    return ma.masked_array(data=shaded, mask=mask)
+
+
+def _shade_rows(
+    elevation: np.ndarray,
+    out: np.ndarray,
+    x_factor: float,
+    y_factor: float,
+    sin_altitude: float,
+    cos_altitude: float,
+    directions: list,
+    mode: HillshadeMode,
+) -> None:
+    # Write shading of elevation rows without their first and last row and column
+    # into out.
+    #
+    # With x and y being the gradients and p = sqrt(x² + y²), slope and aspect do not
+    # have to be calculated explicitly:
+    #   sin(slope) = 1 / sqrt(1 + p²)
+    #   cos(slope) * cos(azimuth - aspect) = (cos(azimuth) * y + sin(azimuth) * x)
+    #                                         / sqrt(1 + p²)
+    # gradients from columns and rows of the 3x3 neighborhood
+    sums = np.add(elevation[:-2], elevation[2:])
+    sums += elevation[1:-1]
+    sums += elevation[1:-1]
+    x = np.subtract(sums[:, :-2], sums[:, 2:])
+    x *= x_factor
+    sums = np.add(elevation[:, :-2], elevation[:, 2:])
+    sums += elevation[:, 1:-1]
+    sums += elevation[:, 1:-1]
+    y = np.subtract(sums[2:], sums[:-2])
+    y *= y_factor
+    del sums
+
+    # p²
+    squared = np.multiply(x, x)
+    squared += y * y
+    # sqrt(1 + p²)
+    norm = np.add(squared, 1.0)
+    np.sqrt(norm, out=norm)
+
+    if mode == HillshadeMode.multidirectional:
+        # each direction is weighted by sin²(azimuth - aspect) = 1 - cos²(...),
+        # which sums up to 2 over all directions
+        shaded = np.zeros_like(x)
+        dot = np.empty_like(x)
+        weight = np.empty_like(x)
+        for sin_azimuth, cos_azimuth in directions:
+            np.multiply(x, sin_azimuth, out=dot)
+            dot += cos_azimuth * y
+            np.multiply(dot, dot, out=weight)
+            np.subtract(squared, weight, out=weight)
+            dot *= cos_altitude
+            dot += sin_altitude
+            dot *= weight
+            shaded += dot
+        squared *= 2.0
+        squared *= norm
+        flat = squared == 0
+        shaded /= squared
+        shaded[flat] = sin_altitude
+    else:
+        sin_azimuth, cos_azimuth = directions[0]
+        shaded = np.multiply(x, sin_azimuth * cos_altitude, out=x)
+        y *= cos_azimuth * cos_altitude
+        shaded += y
+        shaded += sin_altitude
+        shaded /= norm
+        if mode == HillshadeMode.combined:
+            # combine with slope, where slope is the terrain angle from 0 to pi/2
+            np.clip(shaded, -1.0, 1.0, out=shaded)
+            np.arccos(shaded, out=shaded)
+            np.sqrt(squared, out=squared)
+            np.arctan(squared, out=squared)
+            shaded *= squared
+            shaded *= -1.0 / (math.pi / 2) ** 2
+            shaded += 1.0
+
+    # stretch to 0 - 255
+    shaded *= 255.0
+    np.clip(shaded, 1, 255, out=shaded)
+    out[:] = shaded
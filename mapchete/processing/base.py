@@ -4,20 +4,35 @@ import json
 import logging
 import os
 import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import cached_property
 from contextlib import ExitStack
 from typing import Any, Generator, Iterator, List, Optional, Tuple, Union
 
-from cachetools import LRUCache
 from shapely.geometry import Polygon, base
 from shapely.ops import unary_union
 
 from mapchete.config import DaskSettings, MapcheteConfig
 from mapchete.enums import Concurrency, ProcessingMode
 from mapchete.errors import MapcheteNodataTile, ReprojectionFailed
-from mapchete.executor import Executor, ExecutorBase, MFuture
+from mapchete.executor import (
+    ConcurrentFuturesExecutor,
+    Executor,
+    ExecutorBase,
+    MFuture,
+    SequentialExecutor,
+)
 from mapchete.executor.types import Profiler
-from mapchete.path import batch_sort_property, tiles_exist
+from mapchete.formats.existence_index import TileExistenceIndex
+from mapchete.path import (
+    MPath,
+    _is_https_without_ls,
+    batch_sort_property,
+    tiles_exist,
+)
+from mapchete.processing.cache import ProcessTileCache
 from mapchete.processing.execute import batches, dask_graph, single_batch
+from mapchete.processing.prefetch import clear_input_prefetcher
 from mapchete.processing.tasks import (
     TaskBatch,
     TaskInfo,
@@ -25,10 +40,11 @@ from mapchete.processing.tasks import (
     TileTask,
     TileTaskBatch,
 )
+from mapchete.settings import mapchete_options
 from mapchete.stac import tile_direcotry_item_to_dict, update_tile_directory_stac_item
-from mapchete.tile import BatchBy, BufferedTile, count_tiles
+from mapchete.tile import BatchBy, BufferedTile, BufferedTileBatch, count_tiles
 from mapchete.timer import Timer
-from mapchete.types import TileLike, ZoomLevelsLike
+from mapchete.types import MPathLike, TileLike, ZoomLevelsLike
 from mapchete.validate import validate_tile
 from mapchete.zoom_levels import ZoomLevels
 
@@ -48,6 +64,12 @@ class Mapchete(object):
         Mapchete process configuration
     with_cache : bool
         cache processed output data in memory (default: False)
+    cache_size : int
+        memory ceiling of process tile cache in bytes (default: from
+        MAPCHETE_PROCESS_TILE_CACHE_SIZE or 1GiB)
+    cache_spill_dir : str or MPath
+        if set, tiles evicted from cache are spilled to this directory instead of being
+        discarded
 
     Attributes
     ----------
@@ -61,6 +83,8 @@ class Mapchete(object):
         self,
         config: MapcheteConfig,
         with_cache: bool = False,
+        cache_size: Optional[int] = None,
+        cache_spill_dir: Optional[MPathLike] = None,
     ):
         """
         Initialize Mapchete processing endpoint.
@@ -71,6 +95,10 @@ class Mapchete(object):
             Mapchete process configuration
         with_cache : bool
             cache processed output data in memory (default: False)
+        cache_size : int
+            memory ceiling of process tile cache in bytes
+        cache_spill_dir : str or MPath
+            directory to spill evicted process tiles to
         """
         logger.info("initialize process")
         if not isinstance(config, MapcheteConfig):
@@ -80,7 +108,15 @@ class Mapchete(object):
             True if self.config.mode == ProcessingMode.MEMORY else with_cache
         )
         if self.with_cache:
-            self.process_tile_cache = LRUCache(maxsize=512)
+            self.process_tile_cache = ProcessTileCache(
+                maxsize=(
+                    mapchete_options.process_tile_cache_size
+                    if cache_size is None
+                    else cache_size
+                ),
+                spill_dir=cache_spill_dir
+                or mapchete_options.process_tile_cache_spill_dir,
+            )
             self.current_processes = {}
             self.process_lock = threading.Lock()
         self._count_tiles_cache = {}
@@ -111,18 +147,12 @@ class Mapchete(object):
         # if batch_by is None and hasattr(self.config.output_reader, "tile_path_schema"):
         #     batch_by = batch_sort_property(self.config.output_reader.tile_path_schema)
         if zoom or zoom == 0:
-            for tile in self.config.process_pyramid.tiles_from_geom(
-                self.config.area_at_zoom(zoom),
-                zoom=zoom,
-                exact=True,
-            ):
-                yield tile
+            for batch in self._process_tiles_batches(zoom):
+                yield from batch
         else:
             for i in self.config.init_zoom_levels.descending():
-                for tile in self.config.process_pyramid.tiles_from_geom(
-                    self.config.area_at_zoom(i), zoom=i, exact=True
-                ):
-                    yield tile
+                for batch in self._process_tiles_batches(i):
+                    yield from batch
 
     def get_process_tiles_batches(
         self, zoom: Optional[int] = None, batch_by: BatchBy = BatchBy.row
@@ -150,19 +180,26 @@ class Mapchete(object):
         # if batch_by is None and hasattr(self.config.output_reader, "tile_path_schema"):
         #     batch_by = batch_sort_property(self.config.output_reader.tile_path_schema)
         if zoom or zoom == 0:
-            for batch in self.config.process_pyramid.tiles_from_geom_batches(
+            yield from self._process_tiles_batches(zoom, batch_by=batch_by)
+        else:
+            for i in self.config.init_zoom_levels.descending():
+                yield from self._process_tiles_batches(i, batch_by=batch_by)
+
+    def _process_tiles_batches(
+        self, zoom: int, batch_by: BatchBy = BatchBy.row
+    ) -> Iterator[BufferedTileBatch]:
+        # prefer the precomputed process area mask over intersecting tiles with the
+        # process area
+        area_mask = self.config.area_mask_at_zoom(zoom)
+        if area_mask is not None:
+            yield from area_mask.batches(batch_by=batch_by)
+        else:
+            yield from self.config.process_pyramid.tiles_from_geom_batches(
                 self.config.area_at_zoom(zoom),
                 zoom=zoom,
                 batch_by=batch_by,
                 exact=True,
-            ):
-                yield batch
-        else:
-            for i in self.config.init_zoom_levels.descending():
-                for batch in self.config.process_pyramid.tiles_from_geom_batches(
-                    self.config.area_at_zoom(i), zoom=i, batch_by=batch_by, exact=True
-                ):
-                    yield batch
+            )
 
     def skip_tiles(
         self,
@@ -185,7 +222,17 @@ class Mapchete(object):
         """
         logger.debug("determine which tiles to skip...")
         # only check for existing output in "continue" mode
-        if self.config.mode == ProcessingMode.CONTINUE:
+        if self.config.mode == ProcessingMode.CONTINUE and self._use_existence_index():
+            if tiles_batches:
+                for batch in tiles_batches:
+                    yield from self.config.output_reader.existence_index.process_tiles_exist(
+                        batch
+                    )
+            else:
+                yield from self.config.output_reader.existence_index.process_tiles_exist(
+                    tiles
+                )
+        elif self.config.mode == ProcessingMode.CONTINUE:
             yield from tiles_exist(
                 config=self.config,
                 process_tiles=tiles,
@@ -246,9 +293,15 @@ class Mapchete(object):
         propagate_results: bool = False,
         dask_settings: DaskSettings = DaskSettings(),
         remember_preprocessing_results: bool = False,
+        overview_cache_size: Optional[int] = None,
     ) -> Iterator[TaskInfo]:
         """
         Execute all tasks on given executor and yield TaskInfo as they finish.
+
+        When processing in batches, overview_cache_size (default:
+        MAPCHETE_OVERVIEW_CACHE_SIZE) sets how many bytes of tile outputs are kept in
+        memory to build the next overview zoom level from. If 0, overviews read their
+        child tiles from the output.
         """
         # determine tasks if not provided extra
         # we have to do this before it can be decided which type of processing can be applied
@@ -263,6 +316,12 @@ class Mapchete(object):
                 executor = exit_stack.enter_context(
                     Executor(concurrency=concurrency, workers=workers),
                 )
+            if mapchete_options.prefetch_depth and not _runs_in_this_process(executor):
+                logger.warning(
+                    "input prefetching is only available for sequential or threaded "
+                    "execution and has no effect using %s",
+                    executor,
+                )
 
             # tasks have no dependencies with each other and can be executed in
             # any arbitrary order
@@ -270,13 +329,15 @@ class Mapchete(object):
                 not self.config.baselevels or len(self.config.init_zoom_levels) == 1
             ):
                 logger.debug("decided to process tasks in single batch")
-                yield from single_batch(
+                for task_info in single_batch(
                     executor,
                     tasks,
                     output_writer=self.config.output,
                     write_in_parent_process=self.config.output.write_in_parent_process,
                     propagate_results=propagate_results,
-                )
+                ):
+                    self._register_written(task_info)
+                    yield task_info
 
             # tasks are connected via a dependency graph and will be sent to the
             # executor all at once
@@ -297,18 +358,42 @@ class Mapchete(object):
                             task_info.id, task_info.output
                         )
 
+                    self._register_written(task_info)
                     yield task_info
 
             # tasks are sorted into batches which have to be executed in a
             # particular order
             else:
                 logger.debug("decided to process tasks in batches")
+                overview_cache_size = (
+                    mapchete_options.overview_cache_size
+                    if overview_cache_size is None
+                    else overview_cache_size
+                )
+                overview_cache = (
+                    ProcessTileCache(
+                        maxsize=overview_cache_size,
+                        spill_dir=(
+                            MPath.from_inp(
+                                mapchete_options.process_tile_cache_spill_dir
+                            )
+                            / "overviews"
+                            if mapchete_options.process_tile_cache_spill_dir
+                            else None
+                        ),
+                    )
+                    if self.config.baselevels and overview_cache_size
+                    else None
+                )
+                if overview_cache is not None:
+                    exit_stack.callback(overview_cache.close)
                 for task_info in batches(
                     executor,
                     tasks,
                     output_writer=self.config.output,
                     write_in_parent_process=self.config.output.write_in_parent_process,
                     propagate_results=propagate_results,
+                    overview_cache=overview_cache,
                 ):
                     # TODO: is this really necessary?
                     if remember_preprocessing_results and task_info.tile is None:
@@ -316,6 +401,7 @@ class Mapchete(object):
                             task_info.id, task_info.output
                         )
 
+                    self._register_written(task_info)
                     yield task_info
 
     def execute_preprocessing_tasks(
@@ -400,7 +486,12 @@ class Mapchete(object):
             logger.debug("tiles counted in %s", t)
         return self._count_tiles_cache[(minzoom, maxzoom)]
 
-    def execute_tile(self, process_tile: TileLike, raise_nodata: bool = False) -> Any:
+    def execute_tile(
+        self,
+        process_tile: TileLike,
+        raise_nodata: bool = False,
+        executor: Optional[ExecutorBase] = None,
+    ) -> Any:
         """
         Run Mapchete process on a tile.
 
@@ -411,6 +502,9 @@ class Mapchete(object):
         process_tile : Tile or tile index tuple
             Member of the process tile pyramid (not necessarily the output
             pyramid, if output has a different metatiling setting)
+        executor : ExecutorBase
+            If given, the process runs on the executor (e.g. a process pool) instead
+            of the calling thread.
 
         Returns
         -------
@@ -420,10 +514,15 @@ class Mapchete(object):
         process_tile = validate_tile(process_tile, self.config.process_pyramid)
         # make sure preprocessing tasks are finished
         self.execute_preprocessing_tasks()
+        task = TileTask(tile=process_tile, config=self.config)
         try:
-            return self.config.output.streamline_output(
-                TileTask(tile=process_tile, config=self.config).execute()
-            )
+            if executor is None:
+                output = task.execute()
+            else:
+                output = executor.map(_execute_tile_task_or_none, [task])[0]
+                if output is None:
+                    raise MapcheteNodataTile
+            return self.config.output.streamline_output(output)
         except MapcheteNodataTile:
             if raise_nodata:  # pragma: no cover
                 raise
@@ -492,18 +591,28 @@ class Mapchete(object):
             )
         else:
             with Timer() as t:
-                self.config.output.write(process_tile=process_tile, data=data)
+                written_tiles = self.config.output.write(
+                    process_tile=process_tile, data=data
+                )
             message = "output written in %s" % t
             logger.debug((process_tile.id, message))
-            return TaskInfo(
+            task_info = TaskInfo(
                 tile=process_tile,
                 processed=False,
                 process_msg=None,
                 written=True,
                 write_msg=message,
+                written_tiles=written_tiles,
             )
+            self._register_written(task_info)
+            return task_info
 
-    def get_raw_output(self, tile: TileLike, _baselevel_readonly: bool = False) -> Any:
+    def get_raw_output(
+        self,
+        tile: TileLike,
+        _baselevel_readonly: bool = False,
+        executor: Optional[ExecutorBase] = None,
+    ) -> Any:
         """
         Get output raw data.
 
@@ -515,6 +624,8 @@ class Mapchete(object):
         tile : tuple, Tile or BufferedTile
             If a tile index is given, a tile from the output pyramid will be
             assumed. Tile cannot be bigger than process tile!
+        executor : ExecutorBase
+            Executor to run the process on if the tile has to be processed.
 
         Returns
         -------
@@ -544,7 +655,7 @@ class Mapchete(object):
             process_tile = self.config.process_pyramid.intersecting(tile)[0]
             return self._extract(
                 in_tile=process_tile,
-                in_data=self._execute_using_cache(process_tile),
+                in_data=self._execute_using_cache(process_tile, executor=executor),
                 out_tile=tile,
             )
 
@@ -567,9 +678,13 @@ class Mapchete(object):
             if self.config.output.tiles_exist(process_tile):
                 return self._read_existing_output(tile, output_tiles)
             else:
-                return self._process_and_overwrite_output(tile, process_tile)
+                return self._process_and_overwrite_output(
+                    tile, process_tile, executor=executor
+                )
         elif self.config.mode == ProcessingMode.OVERWRITE and not _baselevel_readonly:
-            return self._process_and_overwrite_output(tile, process_tile)
+            return self._process_and_overwrite_output(
+                tile, process_tile, executor=executor
+            )
 
     def write_stac(self, indent: int = 4) -> None:
         """
@@ -618,12 +733,46 @@ class Mapchete(object):
         except Exception as exc:  # pragma: no cover
             logger.warning("cannot create or update STAC item: %s", str(exc))
 
-    def _process_and_overwrite_output(self, tile, process_tile):
+    def _use_existence_index(self) -> bool:
+        """Existence index is only used on TileDirectories which can be listed."""
+        return (
+            mapchete_options.tiles_exist_index
+            and isinstance(
+                getattr(self.config.output_reader, "existence_index", None),
+                TileExistenceIndex,
+            )
+            and not _is_https_without_ls(self.config.output_reader.path)
+        )
+
+    @cached_property
+    def _maintains_existence_index(self) -> bool:
+        """Written tiles are only tracked if the index is used or already exists."""
+        existence_index = getattr(self.config.output_reader, "existence_index", None)
+        return isinstance(existence_index, TileExistenceIndex) and bool(
+            mapchete_options.tiles_exist_index or existence_index.path.exists()
+        )
+
+    def _register_written(self, task_info: TaskInfo) -> None:
+        """Remember written output tiles in existence index of output."""
+        if (
+            task_info.written
+            and task_info.tile is not None
+            and self._maintains_existence_index
+        ):
+            existence_index = self.config.output_reader.existence_index
+            if task_info.written_tiles is None:
+                # writer does not report which output tiles it actually wrote
+                existence_index.add_process_tile(task_info.tile)
+            else:
+                existence_index.add(task_info.written_tiles)
+
+    def _process_and_overwrite_output(self, tile, process_tile, executor=None):
         if self.with_cache:
-            output = self._execute_using_cache(process_tile)
+            # output gets written by the request which actually processes the tile
+            output = self._execute_using_cache(process_tile, executor=executor)
         else:
-            output = self.execute_tile(process_tile)
-        self.write(process_tile, output)
+            output = self.execute_tile(process_tile, executor=executor)
+            self.write(process_tile, output)
         return self._extract(in_tile=process_tile, in_data=output, out_tile=tile)
 
     def _read_existing_output(self, tile, output_tiles):
@@ -634,8 +783,9 @@ class Mapchete(object):
             out_tile=tile,
         )
 
-    def _execute_using_cache(self, process_tile):
-        # Extract Tile subset from process Tile and return.
+    def _execute_using_cache(self, process_tile, executor=None):
+        # Concurrent requests for the same process tile wait for the first one to finish
+        # and share its output.
         try:
             return self.process_tile_cache[process_tile.id]
         except KeyError:
@@ -647,17 +797,21 @@ class Mapchete(object):
             # Wait and return.
             if process_event:  # pragma: no cover
                 process_event.wait()
-                return self.process_tile_cache[process_tile.id]
+                try:
+                    return self.process_tile_cache[process_tile.id]
+                except KeyError:
+                    # output was too large for the cache or got evicted meanwhile
+                    return self._execute_using_cache(process_tile, executor=executor)
             else:
                 try:
-                    output = self.execute_tile(process_tile)
+                    output = self.execute_tile(process_tile, executor=executor)
                     self.process_tile_cache[process_tile.id] = output
                     if self.config.mode in [
                         ProcessingMode.CONTINUE,
                         ProcessingMode.OVERWRITE,
                     ]:
                         self.write(process_tile, output)
-                    return self.process_tile_cache[process_tile.id]
+                    return output
                 finally:
                     with self.process_lock:
                         process_event = self.current_processes.get(process_tile.id)
@@ -690,8 +844,20 @@ class Mapchete(object):
         self.config.output.close(
             exc_type=exc_type, exc_value=exc_value, exc_traceback=exc_traceback
         )
+        # update existence index with tiles written in this session; nothing was
+        # registered if the index is neither used nor exists
+        if self.config.mode in [ProcessingMode.CONTINUE, ProcessingMode.OVERWRITE]:
+            existence_index = getattr(
+                self.config.output_reader, "existence_index", None
+            )
+            if existence_index is not None:
+                existence_index.write(create=mapchete_options.tiles_exist_index)
+        # prefetched reads cannot be used by other processes
+        clear_input_prefetcher()
         # clean up internal cache
         if self.with_cache:
+            logger.debug("closing %s", self.process_tile_cache)
+            self.process_tile_cache.close()
             self.process_tile_cache = None
             self.current_processes = None
             self.process_lock = None
@@ -702,6 +868,13 @@ class Mapchete(object):
         )
 
 
+def _runs_in_this_process(executor: ExecutorBase) -> bool:
+    """Whether tasks are executed sequentially or in threads of this process."""
+    if isinstance(executor, ConcurrentFuturesExecutor):
+        return issubclass(executor._executor_cls, ThreadPoolExecutor)
+    return isinstance(executor, SequentialExecutor)
+
+
 def _task_batches(
     process: Mapchete,
     zoom: Optional[ZoomLevelsLike] = None,
@@ -834,6 +1007,14 @@ def _tile_task_batches(
                         # add parent tile to be reprocessed
                         overview_parents.add(tile.get_parent())
 
+                # let each task read the inputs of the following tasks in advance
+                depth = mapchete_options.prefetch_depth
+                if depth:
+                    for position, task in enumerate(tile_tasks, 1):
+                        task.add_prefetch_inputs(
+                            tile_tasks[position : position + depth]
+                        )
+
                 batches.append(
                     TileTaskBatch(
                         id=f"zoom-{zoom}",
@@ -863,3 +1044,11 @@ def _filter_skipable(
                 pass
             else:
                 yield tile
+
+
+def _execute_tile_task_or_none(task: TileTask) -> Any:
+    """Run TileTask on executor and signal empty output by returning None."""
+    try:
+        return task.execute()
+    except MapcheteNodataTile:
+        return None
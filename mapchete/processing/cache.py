@@ -0,0 +1,168 @@
+"""Size aware cache for process tile outputs."""
+
+import logging
+import pickle
+import sys
+import threading
+from dataclasses import dataclass
+from typing import Any, Hashable, Optional, Tuple
+
+import numpy as np
+import numpy.ma as ma
+from cachetools import Cache, LRUCache
+from shapely import get_num_coordinates
+from shapely.geometry.base import BaseGeometry
+
+from mapchete.path import MPath
+from mapchete.pretty import pretty_bytes
+from mapchete.types import MPathLike
+
+logger = logging.getLogger(__name__)
+
+_MARKER = object()
+
+
+@dataclass
+class CacheStats:
+    """Counters of cache usage."""
+
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    spilled: int = 0
+    unspilled: int = 0
+
+
+class ProcessTileCache(LRUCache):
+    """
+    Thread-safe LRU cache for process tile outputs with a memory ceiling.
+
+    Item sizes are accounted in bytes. If the cache exceeds its maximum size, the least
+    recently used items are evicted. If a spill directory is given, evicted items are
+    written there and loaded again when requested.
+    """
+
+    def __init__(
+        self,
+        maxsize: int = 1024 * 1024 * 1024,
+        spill_dir: Optional[MPathLike] = None,
+    ):
+        super().__init__(maxsize=maxsize, getsizeof=data_nbytes)
+        self.spill_dir = MPath.from_inp(spill_dir) if spill_dir else None
+        if self.spill_dir:
+            self.spill_dir.makedirs()
+        self.stats = CacheStats()
+        self._spilled = set()
+        self._lock = threading.RLock()
+
+    def __getitem__(self, key: Hashable) -> Any:
+        with self._lock:
+            try:
+                value = super().__getitem__(key)
+            except KeyError:
+                self.stats.misses += 1
+                raise
+            self.stats.hits += 1
+            return value
+
+    def __missing__(self, key: Hashable) -> Any:
+        if key in self._spilled:
+            value = self._unspill(key)
+            self[key] = value
+            return value
+        raise KeyError(key)
+
+    def __setitem__(self, key: Hashable, value: Any) -> None:
+        with self._lock:
+            if key in self._spilled:
+                self._spill_path(key).rm(ignore_errors=True)
+                self._spilled.discard(key)
+            try:
+                super().__setitem__(key, value)
+            except ValueError:
+                # item is larger than the whole cache
+                logger.debug(
+                    "item %s too large for cache (%s)",
+                    key,
+                    pretty_bytes(data_nbytes(value)),
+                )
+
+    def __contains__(self, key: Hashable) -> bool:
+        with self._lock:
+            return super().__contains__(key) or key in self._spilled
+
+    def pop(self, key: Hashable, default: Any = _MARKER) -> Any:
+        # don't use __getitem__ here in order to not alter the statistics
+        with self._lock:
+            if Cache.__contains__(self, key):
+                value = Cache.__getitem__(self, key)
+                del self[key]
+                return value
+            elif key in self._spilled:
+                return self._unspill(key)
+            elif default is _MARKER:
+                raise KeyError(key)
+            return default
+
+    def popitem(self) -> Tuple[Hashable, Any]:
+        """Evict the least recently used item and optionally spill it to disk."""
+        with self._lock:
+            key, value = super().popitem()
+            self.stats.evictions += 1
+            if self.spill_dir:
+                self._spill(key, value)
+            return key, value
+
+    def close(self) -> None:
+        """Clear cache and remove spilled items."""
+        with self._lock:
+            self.clear()
+            for key in list(self._spilled):
+                self._spill_path(key).rm(ignore_errors=True)
+            self._spilled.clear()
+
+    def _spill_path(self, key: Hashable) -> MPath:
+        name = "-".join(map(str, key)) if isinstance(key, tuple) else str(key)
+        return self.spill_dir / f"{name}.pkl"
+
+    def _spill(self, key: Hashable, value: Any) -> None:
+        logger.debug("spill %s to %s", key, self._spill_path(key))
+        with self._spill_path(key).open("wb") as dst:
+            pickle.dump(value, dst, protocol=pickle.HIGHEST_PROTOCOL)
+        self._spilled.add(key)
+        self.stats.spilled += 1
+
+    def _unspill(self, key: Hashable) -> Any:
+        logger.debug("load spilled %s from %s", key, self._spill_path(key))
+        path = self._spill_path(key)
+        with path.open("rb") as src:
+            value = pickle.load(src)
+        path.rm(ignore_errors=True)
+        self._spilled.discard(key)
+        self.stats.unspilled += 1
+        return value
+
+    def __repr__(self):  # pragma: no cover
+        return (
+            f"<ProcessTileCache items={len(self)}, size={pretty_bytes(self.currsize)}, "
+            f"maxsize={pretty_bytes(self.maxsize)}, stats={self.stats}>"
+        )
+
+
+def data_nbytes(data: Any) -> int:
+    """Estimate memory footprint of process output in bytes."""
+    if isinstance(data, ma.MaskedArray):
+        mask = ma.getmask(data)
+        return data.data.nbytes + (mask.nbytes if mask is not ma.nomask else 0)
+    elif isinstance(data, np.ndarray):
+        return data.nbytes
+    elif isinstance(data, BaseGeometry):
+        # two float64 values per coordinate
+        return sys.getsizeof(data) + int(get_num_coordinates(data)) * 16
+    elif isinstance(data, dict):
+        return sys.getsizeof(data) + sum(
+            data_nbytes(key) + data_nbytes(value) for key, value in data.items()
+        )
+    elif isinstance(data, (list, tuple)):
+        return sys.getsizeof(data) + sum(data_nbytes(item) for item in data)
+    return sys.getsizeof(data)
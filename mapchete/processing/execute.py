@@ -6,7 +6,8 @@ from typing import Callable, Iterator, Optional
 from mapchete.errors import MapcheteNodataTile
 from mapchete.executor import DaskExecutor, ExecutorBase
 from mapchete.formats.base import OutputDataWriter
-from mapchete.processing.tasks import Task, Tasks
+from mapchete.processing.cache import ProcessTileCache
+from mapchete.processing.tasks import Task, TaskBatch, Tasks, TileTask
 from mapchete.processing.types import TaskInfo, default_tile_task_id
 from mapchete.timer import Timer
 
@@ -48,16 +49,23 @@ def batches(
     output_writer: Optional[OutputDataWriter] = None,
     write_in_parent_process: bool = False,
     propagate_results: bool = False,
+    overview_cache: Optional[ProcessTileCache] = None,
 ) -> Iterator[TaskInfo]:
     """
     Execute batches in sequential order but tasks within batches don't have any order.
+
+    If an overview cache is given, tile outputs are kept there and handed over to the
+    tasks of the next lower zoom level which interpolate from them, instead of
+    reading them again from the output.
     """
     preprocessing_tasks_results = {}
 
+    # outputs are required in the parent process to fill the overview cache
+    append_data = propagate_results or overview_cache is not None
     task_wrapper = get_task_wrapper(
         write_in_parent_process=write_in_parent_process,
         output_writer=output_writer,
-        propagate_results=propagate_results,
+        propagate_results=append_data,
     )
 
     for batch in tasks.to_batches():
@@ -67,22 +75,76 @@ def batches(
                 for id, result in preprocessing_tasks_results.items():
                     task.add_dependency(id, result)
 
-        for future in executor.as_completed(task_wrapper, batch):
+        batch_zoom = None
+        for future in executor.as_completed(
+            task_wrapper,
+            batch
+            if overview_cache is None or batch.id == "preprocessing_tasks"
+            else _with_child_outputs(batch, overview_cache),
+        ):
             task_info = TaskInfo.from_future(future)
 
             if write_in_parent_process:
                 task_info = write_wrapper(
                     task_info,
                     output_writer=output_writer,
-                    append_data=propagate_results,
+                    append_data=append_data,
                 )
 
             # remember preprocessing task result
             if task_info.tile is None:
                 preprocessing_tasks_results[task_info.id] = task_info.output
 
+            elif overview_cache is not None:
+                batch_zoom = task_info.tile.zoom
+                if task_info.output is not None and not isinstance(
+                    task_info.output, str
+                ):
+                    overview_cache[task_info.tile.id] = task_info.output
+                if not propagate_results:
+                    task_info = _without_output(task_info)
+
             yield task_info
 
+        # child outputs which were not used by this zoom level are not needed anymore
+        if overview_cache is not None and batch_zoom is not None:
+            for tile_id in [key for key in overview_cache if key[0] > batch_zoom]:
+                overview_cache.pop(tile_id, None)
+            logger.debug("overview cache after zoom %s: %s", batch_zoom, overview_cache)
+
+
+def _with_child_outputs(
+    batch: TaskBatch, overview_cache: ProcessTileCache
+) -> Iterator[Task]:
+    """Attach cached child outputs to tasks just before they are submitted."""
+    for task in batch:
+        if isinstance(task, TileTask) and task.interpolates_from_lower():
+            for child in task.tile.get_children():
+                output = overview_cache.pop(child.id, None)
+                if output is not None:
+                    task.add_child_output(
+                        TaskInfo(
+                            id=default_tile_task_id(child),
+                            tile=child,
+                            processed=True,
+                            output=output,
+                        )
+                    )
+        yield task
+
+
+def _without_output(task_info: TaskInfo) -> TaskInfo:
+    return TaskInfo(
+        id=task_info.id,
+        processed=task_info.processed,
+        process_msg=task_info.process_msg,
+        written=task_info.written,
+        write_msg=task_info.write_msg,
+        tile=task_info.tile,
+        profiling=task_info.profiling,
+        written_tiles=task_info.written_tiles,
+    )
+
 
 def dask_graph(
     executor: DaskExecutor,
@@ -100,8 +162,10 @@ def dask_graph(
         propagate_results=propagate_results,
     )
 
-    for future in executor.compute_task_graph(
-        tasks.to_dask_graph(
+    # the graph is built lazily and submitted in chunks, so processing already starts
+    # while the rest of the graph is still being built
+    for future in executor.compute_task_graph_chunks(
+        tasks.to_dask_graph_chunks(
             preprocessing_task_wrapper=task_wrapper,
             tile_task_wrapper=task_wrapper,
         ),
@@ -192,7 +256,9 @@ def write_wrapper(
                 write_msg=message,
             )
         with Timer() as duration:
-            output_writer.write(process_tile=task_info.tile, data=output_data)
+            written_tiles = output_writer.write(
+                process_tile=task_info.tile, data=output_data
+            )
         message = "output written in %s" % duration
         logger.debug((task_info.tile.id, message))
         return TaskInfo(
@@ -203,6 +269,7 @@ def write_wrapper(
             written=True,
             write_msg=message,
             output=output_data if append_data else None,
+            written_tiles=written_tiles,
         )
 
     return task_info
@@ -96,7 +96,16 @@ class MapcheteProcess(object):
             raise ValueError("%s not found in config as input" % input_id)
         return self.input[input_id]
 
-    def hillshade(self, *_, **__) -> ma.MaskedArray:  # pragma: no cover
+    def hillshade(
+        self,
+        elevation: ma.MaskedArray,
+        azimuth: float = 315.0,
+        altitude: float = 45.0,
+        z: float = 1.0,
+        scale: float = 1.0,
+        mode: str = "single",
+        **kwargs,
+    ) -> ma.MaskedArray:
         """
         Calculate hillshading from elevation data.
 
@@ -113,13 +122,25 @@ class MapcheteProcess(object):
         scale : float
             scale factor of pixel size units versus height units (insert 112000
             when having elevation values in meters in a geodetic projection)
+        mode : str
+            "single", "multidirectional" or "combined" (default: single)
+        kwargs : further options of mapchete.processes.hillshade.hillshade()
 
         Returns
         -------
         hillshade : array
         """
-        raise DeprecationWarning(
-            "Run hillshade via mp is deprecated. Call the hillshade method from mapchete.processes.hillshade."
+        from mapchete.processes.hillshade import hillshade
+
+        return hillshade(
+            elevation,
+            self.tile.affine,
+            azimuth=azimuth,
+            altitude=altitude,
+            z=z,
+            scale=scale,
+            mode=mode,
+            **kwargs,
         )
 
     def contours(self, *_, **__) -> ma.MaskedArray:  # pragma: no cover
@@ -0,0 +1,220 @@
+"""
+Worker-local prefetching of input tile reads.
+
+Tasks only carry the inputs of upcoming tiles within the current process, so
+prefetching is not available when tasks are sent to process pools or dask workers.
+"""
+
+from __future__ import annotations
+
+import logging
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Callable,
+    Dict,
+    Hashable,
+    Iterable,
+    Iterator,
+    Optional,
+    Tuple,
+)
+
+from mapchete.pretty import pretty_bytes
+from mapchete.processing.cache import data_nbytes
+from mapchete.settings import mapchete_options
+
+if TYPE_CHECKING:  # pragma: no cover
+    from mapchete.formats.base import InputTile
+
+logger = logging.getLogger(__name__)
+
+_prefetcher: Optional[InputPrefetcher] = None
+_prefetcher_lock = threading.Lock()
+
+
+@dataclass
+class PrefetchStats:
+    """Counters of prefetcher usage."""
+
+    submitted: int = 0
+    hits: int = 0
+    misses: int = 0
+    skipped: int = 0
+    evictions: int = 0
+
+
+class InputPrefetcher:
+    """
+    Read input tiles of upcoming process tiles in background threads.
+
+    Reads are prefetched using the same read method and arguments the process used the
+    last time it read from the same input, so the first tile of every input is always
+    read directly. Prefetched reads are consumed once by the process tile reading the
+    same input with the same arguments.
+
+    The number of kept reads is bounded by depth + 1 times the number of inputs of a
+    tile. If it is exceeded, the oldest finished reads are dropped as they most likely
+    belong to tiles processed elsewhere. As long as the memory of finished reads exceeds
+    max_bytes, no new reads are issued.
+    """
+
+    def __init__(self, depth: int = 1, max_bytes: int = 512 * 1024 * 1024):
+        self.depth = depth
+        self.max_bytes = max_bytes
+        self.stats = PrefetchStats()
+        self._executor = ThreadPoolExecutor(
+            max_workers=depth, thread_name_prefix="mapchete-prefetch"
+        )
+        self._reads: Dict[Hashable, Future] = OrderedDict()
+        self._nbytes: Dict[Hashable, int] = {}
+        self._read_signatures: Dict[str, Tuple[str, Tuple]] = {}
+        self._max_reads = depth + 1
+        self._lock = threading.RLock()
+
+    @property
+    def nbytes(self) -> int:
+        """Memory of finished prefetched reads in bytes."""
+        with self._lock:
+            for key, future in self._reads.items():
+                if key not in self._nbytes and future.done():
+                    self._nbytes[key] = (
+                        0
+                        if future.cancelled() or future.exception()
+                        else data_nbytes(future.result())
+                    )
+            return sum(self._nbytes.values())
+
+    def __len__(self) -> int:
+        return len(self._reads)
+
+    def prefetch(self, input_tiles: Iterable[InputTile]) -> None:
+        """Issue background reads for input tiles."""
+        input_tiles = [
+            input_tile
+            for input_tile in input_tiles
+            if input_tile.input_key in self._read_signatures
+        ]
+        with self._lock:
+            # reads of the current tile are not yet consumed when prefetching for the
+            # upcoming tiles
+            inputs_count = len({input_tile.input_key for input_tile in input_tiles})
+            self._max_reads = max(self._max_reads, (self.depth + 1) * inputs_count)
+            for input_tile in input_tiles:
+                method, kwargs = self._read_signatures[input_tile.input_key]
+                key = _read_key(input_tile, method, kwargs)
+                if key in self._reads:
+                    continue
+                self._evict()
+                if len(self._reads) >= self._max_reads or self.nbytes >= self.max_bytes:
+                    self.stats.skipped += 1
+                    continue
+                logger.debug("prefetch %s of %s", method, input_tile)
+                future = self._executor.submit(
+                    getattr(input_tile, method), **dict(kwargs)
+                )
+                self._reads[key] = future
+                self.stats.submitted += 1
+
+    def read(self, input_tile: InputTile, read_func: Callable, **kwargs) -> Any:
+        """
+        Return prefetched read of input tile or read it now.
+
+        The read function has to be a method of the input tile.
+        """
+        method = read_func.__name__
+        kwargs = tuple(sorted(kwargs.items()))
+        key = _read_key(input_tile, method, kwargs)
+        with self._lock:
+            self._read_signatures[input_tile.input_key] = (method, kwargs)
+            future = self._reads.pop(key, None)
+            self._nbytes.pop(key, None)
+        if future is not None and not future.cancelled():
+            try:
+                result = future.result()
+                self.stats.hits += 1
+                return result
+            except Exception as exc:
+                # let the process read again and raise the error itself
+                logger.debug("prefetching %s failed: %s", input_tile, exc)
+        self.stats.misses += 1
+        return read_func(**dict(kwargs))
+
+    def clear(self) -> None:
+        with self._lock:
+            for future in self._reads.values():
+                future.cancel()
+            self._reads.clear()
+            self._nbytes.clear()
+            self._read_signatures.clear()
+
+    def _evict(self) -> None:
+        # drop oldest prefetched reads which were not consumed, e.g. because their
+        # process tile was executed on another worker
+        while self._reads and len(self._reads) >= self._max_reads:
+            key, future = next(iter(self._reads.items()))
+            if not future.done():
+                break
+            del self._reads[key]
+            self._nbytes.pop(key, None)
+            self.stats.evictions += 1
+
+    def __repr__(self):  # pragma: no cover
+        return (
+            f"<InputPrefetcher reads={len(self)}, size={pretty_bytes(self.nbytes)}, "
+            f"stats={self.stats}>"
+        )
+
+
+def input_prefetcher() -> Optional[InputPrefetcher]:
+    """
+    Return prefetcher of current worker process.
+
+    The prefetch depth and memory budget are configured by the MAPCHETE_PREFETCH_DEPTH
+    and MAPCHETE_PREFETCH_MAX_BYTES settings. If the depth is 0, no prefetcher is used.
+    """
+    global _prefetcher
+    if not mapchete_options.prefetch_depth:
+        return None
+    with _prefetcher_lock:
+        if _prefetcher is None:
+            _prefetcher = InputPrefetcher(
+                depth=mapchete_options.prefetch_depth,
+                max_bytes=mapchete_options.prefetch_max_bytes,
+            )
+        return _prefetcher
+
+
+def clear_input_prefetcher() -> None:
+    """Drop all prefetched reads of the current worker process."""
+    with _prefetcher_lock:
+        if _prefetcher is not None:
+            _prefetcher.clear()
+
+
+def read_prefetched(input_tile: InputTile, read_func: Callable, **kwargs) -> Any:
+    """Read from input tile, using a prefetched read if available."""
+    prefetcher = input_prefetcher()
+    if prefetcher is None:
+        return read_func(**kwargs)
+    return prefetcher.read(input_tile, read_func, **kwargs)
+
+
+def prefetchable_input_tiles(inputs: dict) -> Iterator[InputTile]:
+    """Yield input tiles from opened process inputs which support prefetching."""
+    for value in inputs.values():
+        if isinstance(value, list):
+            # input groups are lists of (key, input tile) tuples
+            yield from prefetchable_input_tiles(dict(value))
+        elif getattr(value, "prefetchable", False):
+            yield value
+
+
+def _read_key(input_tile: InputTile, method: str, kwargs: Tuple) -> Hashable:
+    # the tile itself is part of the key as the same input can be read for the same
+    # tile index of another grid or with another pixelbuffer
+    return (input_tile.input_key, input_tile.tile, method, repr(kwargs))
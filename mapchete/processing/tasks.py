@@ -7,6 +7,7 @@ from typing import (
     Callable,
     Dict,
     Generator,
+    Iterable,
     Iterator,
     List,
     Optional,
@@ -34,8 +35,9 @@ from mapchete.io import raster
 from mapchete.io.vector import IndexedFeatures
 from mapchete.path import MPath
 from mapchete.processing.mp import MapcheteProcess
+from mapchete.processing.prefetch import input_prefetcher, prefetchable_input_tiles
 from mapchete.processing.types import TaskInfo, default_tile_task_id
-from mapchete.tile import BufferedTile
+from mapchete.tile import BufferedTile, BufferedTileBatch
 from mapchete.timer import Timer
 from mapchete.types import BoundsLike, TileLike
 from mapchete.validate import validate_bounds
@@ -249,12 +251,20 @@ class TileTask(Task):
             self.output_params = config.output_reader.output_params
         self.mode = config.mode
         self.output_reader = config.output_reader if config.baselevels else None
+        self.prefetch_inputs = []
         self._dependencies = dict()
         super().__init__(self.func, id=self.id, geometry=tile.bbox)
 
     def __repr__(self):  # pragma: no cover
         return f"TileTask(id={self.id}, tile={self.tile}, bounds={self.bounds})"
 
+    def __getstate__(self):
+        # upcoming tasks are most likely executed by other workers, so don't send
+        # their inputs along to process pools or clusters
+        state = self.__dict__.copy()
+        state["prefetch_inputs"] = []
+        return state
+
     def add_dependency(self, task_key: str, result: Any, raise_error: bool = True):
         """Append preprocessing task result to input."""
         # if dependency has geo information, only add if it intersects with task!
@@ -286,6 +296,22 @@ class TileTask(Task):
         logger.debug("remember preprocessing task (%s) result for execution", task_key)
         self._dependencies[task_key] = result
 
+    def add_child_output(self, task_info: TaskInfo) -> None:
+        """Provide output of a child tile so it does not have to be read again."""
+        self._dependencies[task_info.id] = task_info
+
+    def add_prefetch_inputs(self, tasks: Iterable["TileTask"]) -> None:
+        """Register upcoming tasks whose inputs are read while this task runs."""
+        for task in tasks:
+            self.prefetch_inputs.extend(prefetchable_input_tiles(task.input))
+
+    def interpolates_from_lower(self) -> bool:
+        """Whether tile is an overview generated from the next higher zoom level."""
+        return bool(
+            self.config_baselevels
+            and self.tile.zoom < min(self.config_baselevels["zooms"])
+        )
+
     def execute(self, dependencies: Optional[dict] = None) -> Any:
         """
         Run the Mapchete process and return the result.
@@ -325,7 +351,17 @@ class TileTask(Task):
         # interpolate from other zoom levels.
         if self.config_baselevels:
             if self.tile.zoom < min(self.config_baselevels["zooms"]):
-                return self._interpolate_from_baselevel("lower", dependencies)
+                return self._interpolate_from_baselevel(
+                    "lower",
+                    dict(
+                        {
+                            task_key: task_info
+                            for task_key, task_info in self._dependencies.items()
+                            if task_key.startswith("tile_task")
+                        },
+                        **(dependencies or {}),
+                    ),
+                )
             elif self.tile.zoom > max(self.config_baselevels["zooms"]):
                 return self._interpolate_from_baselevel("higher", dependencies)
         # Otherwise, execute from process file.
@@ -350,6 +386,11 @@ class TileTask(Task):
                                     inp.set_preprocessing_task_result(
                                         task_key=task_key, result=task_result
                                     )
+                # read inputs of upcoming tasks in the background
+                if self.prefetch_inputs:
+                    prefetcher = input_prefetcher()
+                    if prefetcher is not None:
+                        prefetcher.prefetch(self.prefetch_inputs)
                 # Actually run process.
                 mp = MapcheteProcess(
                     tile=self.tile,
@@ -480,13 +521,11 @@ class TileTaskBatch(TaskBatch):
         return f"TileTaskBatch(id={self.id}, bounds={self.bounds}, tasks={len(self.tasks)})"
 
     def _update_bounds(self):
-        for tile in self.tasks.keys():
-            left, bottom, right, top = self.bounds
-            self.bounds = (
-                tile.left if left is None else min(left, tile.left),
-                tile.bottom if bottom is None else min(bottom, tile.bottom),
-                tile.right if right is None else max(right, tile.right),
-                tile.top if top is None else max(top, tile.top),
+        if self.tasks:
+            self.bounds = tuple(
+                BufferedTileBatch.from_tiles(
+                    self._tp, self._zoom, self.tasks.keys()
+                ).total_bounds
             )
 
     def intersection(self, other):
@@ -573,6 +612,68 @@ class Tasks:
         tile_task_wrapper: Optional[Callable] = None,
     ) -> List[Union[Delayed, DelayedLeaf]]:
         """Return task graph to use with dask Executor."""
+        with Timer() as duration:
+            graph = self._to_dask_graph(
+                preprocessing_task_wrapper=preprocessing_task_wrapper,
+                tile_task_wrapper=tile_task_wrapper,
+            )
+        logger.debug("task graph with %s tasks built in %s", len(graph), duration)
+        return graph
+
+    def to_dask_graph_chunks(
+        self,
+        preprocessing_task_wrapper: Optional[Callable] = None,
+        tile_task_wrapper: Optional[Callable] = None,
+        chunksize: int = 1000,
+    ) -> Iterator[Tuple[str, Dict[str, Tuple[Callable, Task, dict, Dict[str, str]]]]]:
+        """
+        Yield task graph lazily in chunks of tasks from the same batch.
+
+        Each chunk is a tuple of the batch ID and a dictionary mapping each task key
+        to a tuple of (function, task, function kwargs, dependencies), where
+        dependencies map task IDs to task keys. Dependencies always refer to tasks of
+        the previous batch, so chunks can be submitted one after another while only
+        keeping track of the last two batches.
+        """
+        previous_batch = None
+        for batch in self:
+            with Timer() as duration:
+                task_func = (
+                    tile_task_wrapper or batch.func
+                    if isinstance(batch, TileTaskBatch)
+                    else preprocessing_task_wrapper or batch.func
+                )
+                chunk = {}
+                for task in batch.values():
+                    chunk[task.result_key_name] = (
+                        task_func,
+                        task,
+                        batch.fkwargs,
+                        {
+                            dependency.id: dependency.result_key_name
+                            for dependency in previous_batch.intersection(task)
+                        }
+                        if previous_batch
+                        else {},
+                    )
+                    if len(chunk) == chunksize:
+                        yield batch.id, chunk
+                        chunk = {}
+                if chunk:
+                    yield batch.id, chunk
+            logger.debug(
+                "task graph for batch %s with %s tasks emitted in %s",
+                batch.id,
+                len(batch),
+                duration,
+            )
+            previous_batch = batch
+
+    def _to_dask_graph(
+        self,
+        preprocessing_task_wrapper: Optional[Callable] = None,
+        tile_task_wrapper: Optional[Callable] = None,
+    ) -> List[Union[Delayed, DelayedLeaf]]:
         tasks = {}
         previous_batch = None
         for batch in self:
@@ -1,7 +1,7 @@
 from __future__ import annotations
 
 from dataclasses import dataclass, field
-from typing import Any, Optional
+from typing import Any, List, Optional
 
 from mapchete.executor.future import MFuture
 from mapchete.settings import mapchete_options
@@ -24,6 +24,7 @@ class TaskInfo:
     output: Optional[Any] = None
     tile: Optional[BufferedTile] = None
     profiling: dict = field(default_factory=dict)
+    written_tiles: Optional[List[BufferedTile]] = None
 
     @staticmethod
     def from_future(future: MFuture) -> LazyTaskInfo:
@@ -56,6 +57,7 @@ class LazyTaskInfo(TaskInfo):
             self._output = task_info.output
             self._tile = task_info.tile
             self._profiling = task_info.profiling
+            self._written_tiles = task_info.written_tiles
             if self._future.profiling:
                 self._profiling = self._future.profiling
         else:  # pragma: no cover
@@ -64,6 +66,7 @@ class LazyTaskInfo(TaskInfo):
             )
             self._processed = True
             self._profiling = self._future.profiling
+            self._written_tiles = None
 
         self._result_is_set = True
         self._future = None
@@ -107,3 +110,8 @@ class LazyTaskInfo(TaskInfo):
     def profiling(self) -> dict:  # pragma: no cover
         self._set_result()
         return self._profiling
+
+    @property
+    def written_tiles(self) -> Optional[List[BufferedTile]]:  # pragma: no cover
+        self._set_result()
+        return self._written_tiles
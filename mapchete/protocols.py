@@ -17,6 +17,9 @@ class ObserverProtocol(Protocol):
 
 @runtime_checkable
 class GridProtocol(Protocol):
+    # allow implementations to use __slots__
+    __slots__ = ()
+
     transform: Affine
     width: int
     height: int
@@ -2,13 +2,13 @@
 Combine default values with environment variable values.
 """
 
-from typing import Literal, Tuple, Type, Union
+from typing import Literal, Optional, Tuple, Type, Union
 
 from aiohttp import ClientPayloadError, ClientResponseError
 from aiohttp.client_exceptions import ServerDisconnectedError
 from fiona.errors import FionaError
 from fsspec.exceptions import FSTimeoutError
-from pydantic import NonNegativeFloat, NonNegativeInt
+from pydantic import NonNegativeFloat, NonNegativeInt, PositiveInt
 from pydantic_settings import BaseSettings, SettingsConfigDict
 from rasterio.errors import RasterioError
 
@@ -80,9 +80,37 @@ class MapcheteOptions(BaseSettings):
     # timeout granted when fetching future results or exceptions
     future_timeout: NonNegativeFloat = 10
     tiles_exist_concurrency: Concurrency = Concurrency.threads
+    # use persistent index of existing tiles instead of listing output directories
+    tiles_exist_index: bool = False
     reproject_geometry_engine: Literal["pyproj", "fiona"] = "pyproj"
     execute_retries: NonNegativeInt = 0
     execute_delay: NonNegativeFloat = 0
+    # memory ceiling of process tile cache (in bytes) and directory to spill evicted tiles
+    process_tile_cache_size: NonNegativeInt = 1024 * 1024 * 1024
+    process_tile_cache_spill_dir: Optional[str] = None
+    # memory ceiling (in bytes) of child tile outputs kept to build overviews from (0 disables)
+    overview_cache_size: NonNegativeInt = 0
+    # number of threads reading multiple raster files concurrently (1 reads sequentially)
+    raster_read_workers: PositiveInt = 1
+    # number of reprojected vector features kept per worker to serve neighbouring tiles
+    # from one read (0 disables)
+    vector_read_cache_size: NonNegativeInt = 0
+    # maximum number of tile matrix cells of a precomputed process area mask
+    area_mask_max_cells: NonNegativeInt = 2**26
+    # number of upcoming process tiles of a batch whose inputs each worker reads in the
+    # background (0 disables) and memory ceiling of prefetched reads (in bytes); only
+    # used by sequential and threaded execution, as tasks sent to process pools or dask
+    # don't carry the inputs of upcoming tiles
+    prefetch_depth: NonNegativeInt = 0
+    prefetch_max_bytes: NonNegativeInt = 512 * 1024 * 1024
+    # concurrent.futures executors chunk tasks running shorter than this duration (in
+    # seconds, 0 disables) and limit the estimated memory of task results in flight
+    executor_chunk_duration: NonNegativeFloat = 0.1
+    executor_max_in_flight_bytes: NonNegativeInt = 1024 * 1024 * 1024
+    # arrays of at least this size (in bytes) are sent from process pool workers to the
+    # parent process via shared memory (0 disables); /dev/shm must be large enough to
+    # hold all outputs the parent keeps, e.g. for overviews
+    shared_memory_min_bytes: NonNegativeInt = 0
 
     # read from environment
     model_config = SettingsConfigDict(env_prefix="MAPCHETE_")
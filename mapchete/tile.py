@@ -4,8 +4,18 @@ from __future__ import annotations
 
 from enum import Enum
 import logging
-from itertools import product
-from typing import Generator, List, Literal, TypedDict, Union
+from functools import lru_cache
+from typing import (
+    Generator,
+    Iterable,
+    Iterator,
+    List,
+    Literal,
+    Optional,
+    Tuple,
+    TypedDict,
+    Union,
+)
 
 import numpy as np
 from affine import Affine
@@ -14,10 +24,31 @@ from rasterio.enums import Resampling
 from rasterio.features import rasterize, shapes
 from rasterio.transform import from_bounds
 from rasterio.warp import reproject
-from shapely import clip_by_rect
+from shapely import (
+    area,
+    boundary,
+    box,
+    clip_by_rect,
+    contains_properly,
+    get_dimensions,
+    get_parts,
+    intersection,
+    intersects,
+    is_empty,
+    prepare,
+    total_bounds,
+)
 from shapely.geometry import shape, mapping
 from shapely.ops import unary_union
-from tilematrix import Shape, Tile, TileIndex, TilePyramid, GridDefinition
+from tilematrix import (
+    GridDefinition,
+    Shape,
+    Tile,
+    TileIndex,
+    TilePyramid,
+    clip_geometry_to_srs_bounds,
+    validate_zoom,
+)
 from tilematrix._conf import ROUND
 
 from mapchete.bounds import Bounds
@@ -91,9 +122,67 @@ class BufferedTilePyramid(TilePyramid):
         """
         Return ``BufferedTile`` object of this ``BufferedTilePyramid``.
         """
-        return BufferedTile(
-            self.tile_pyramid.tile(zoom, row, col), pixelbuffer=self.pixelbuffer
-        )
+        if not all(
+            [
+                isinstance(zoom, int),
+                zoom >= 0,
+                isinstance(row, int),
+                row >= 0,
+                isinstance(col, int),
+                col >= 0,
+            ]
+        ):
+            raise TypeError("zoom, col and row must be integers >= 0")
+        cols = self.matrix_width(zoom)
+        rows = self.matrix_height(zoom)
+        if col >= cols:
+            raise ValueError("col (%s) exceeds matrix width (%s)" % (col, cols))
+        if row >= rows:
+            raise ValueError("row (%s) exceeds matrix height (%s)" % (row, rows))
+        return BufferedTile._from_index(self, zoom, row, col)
+
+    def tiles_bounds(
+        self,
+        zoom: int,
+        rows: np.ndarray,
+        cols: np.ndarray,
+        pixelbuffer: Optional[NonNegativeInt] = None,
+    ) -> np.ndarray:
+        """
+        Return bounds of multiple tiles as array of (left, bottom, right, top) rows.
+
+        If no pixelbuffer is given, the pyramid pixelbuffer is used.
+        """
+        pixelbuffer = self.pixelbuffer if pixelbuffer is None else pixelbuffer
+        pixel_x_size = self.pixel_x_size(zoom)
+        pixel_y_size = self.pixel_y_size(zoom)
+        height = pixel_y_size * self.tile_size * self.metatiling
+        width = pixel_x_size * self.tile_size * self.metatiling
+        # round like tilematrix does but only once per distinct row and column
+        unique_rows, rows_index = np.unique(np.asarray(rows), return_inverse=True)
+        unique_cols, cols_index = np.unique(np.asarray(cols), return_inverse=True)
+        top = np.array(
+            [round(self.top - (row * height), ROUND) for row in unique_rows.tolist()],
+            dtype=np.float64,
+        )[rows_index.ravel()]
+        left = np.array(
+            [round(self.left + (col * width), ROUND) for col in unique_cols.tolist()],
+            dtype=np.float64,
+        )[cols_index.ravel()]
+        # metatiles are clipped to TilePyramid bounds
+        bottom = np.maximum(top - height, self.bottom)
+        right = np.minimum(left + width, self.right)
+        if pixelbuffer:
+            offset = pixel_x_size * float(pixelbuffer)
+            left = left - offset
+            bottom = bottom - offset
+            right = right + offset
+            top = top + offset
+        # on global grids clip at northern and southern TilePyramid bound
+        if self.grid.is_global:
+            top = np.minimum(top, self.top)
+            bottom = np.maximum(bottom, self.bottom)
+        return np.stack([left, bottom, right, top], axis=-1)
 
     def tiles_from_bounds(
         self, bounds: BoundsLike, zoom: int
@@ -121,11 +210,11 @@ class BufferedTilePyramid(TilePyramid):
         """
         for tile in self.tile_pyramid.tiles_from_bbox(geometry, zoom=zoom):
             if isinstance(tile, Tile):
-                yield self.tile(*tile.id)
+                yield BufferedTile._from_index(self, *tile.id)
 
     def tiles_from_bbox_batches(
         self, geometry: Geometry, zoom: int, batch_by: BatchBy = BatchBy.row
-    ) -> Generator[Generator[BufferedTile, None, None], None, None]:
+    ) -> Generator[BufferedTileBatch, None, None]:
         """
         Yield batches of BufferedTiles intersecting with geometry bounds.
         """
@@ -134,7 +223,7 @@ class BufferedTilePyramid(TilePyramid):
             zoom=zoom,
             batch_by="column" if batch_by.value == "col" else batch_by.value,
         ):
-            yield (self.tile(*tile.id) for tile in batch if isinstance(tile, Tile))
+            yield BufferedTileBatch.from_tiles(self, zoom, batch)
 
     def tiles_from_geom(
         self, geometry: Geometry, zoom: int, exact: bool = False
@@ -142,9 +231,10 @@ class BufferedTilePyramid(TilePyramid):
         """
         Yield BufferedTiles intersecting with geometry.
         """
-        for tile in self.tile_pyramid.tiles_from_geom(geometry, zoom=zoom, exact=exact):
-            if isinstance(tile, Tile):
-                yield self.tile(*tile.id)
+        for batch in self.tiles_from_geom_batches(
+            geometry, zoom, batch_by=BatchBy.row, exact=exact
+        ):
+            yield from batch
 
     def tiles_from_geom_batches(
         self,
@@ -152,24 +242,209 @@ class BufferedTilePyramid(TilePyramid):
         zoom: int,
         batch_by: BatchBy = BatchBy.row,
         exact: bool = False,
-    ) -> Generator[Generator[BufferedTile, None, None], None, None]:
+    ) -> Generator[BufferedTileBatch, None, None]:
         """
         Yield batches of BufferedTiles intersecting with geometry.
+
+        Tiles are tested against the geometry batch-wise using vectorized shapely
+        functions.
         """
-        for batch in self.tile_pyramid.tiles_from_geom(
-            geometry,
-            zoom=zoom,
-            batch_by="column" if batch_by.value == "col" else batch_by.value,
-            exact=exact,
-        ):
-            yield (self.tile(*tile.id) for tile in batch if isinstance(tile, Tile))
+        validate_zoom(zoom)
+        if geometry.is_empty:
+            return
+        if not geometry.is_valid:
+            raise ValueError("no valid geometry: %s" % geometry.geom_type)
+        if geometry.geom_type == "Point":
+            tile = self.tile_pyramid.tile_from_xy(geometry.x, geometry.y, zoom)
+            yield BufferedTileBatch(self, zoom, [tile.row], [tile.col])
+            return
+        clipped = clip_geometry_to_srs_bounds(geometry, self.tile_pyramid)
+        prepare(clipped)
+        for rows, cols in self._bbox_index_batches(geometry.bounds, zoom, batch_by):
+            boxes = box(*self.tiles_bounds(zoom, rows, cols, pixelbuffer=0).T)
+            mask = intersects(clipped, boxes)
+            if exact:
+                # only tiles on the geometry boundary require the costly
+                # intersection, tiles within the geometry are always covered
+                # (older GEOS versions don't support this for GeometryCollections)
+                if clipped.geom_type != "GeometryCollection":
+                    boundary = mask & ~contains_properly(clipped, boxes)
+                else:  # pragma: no cover
+                    boundary = mask.copy()
+                mask[boundary] = area(intersection(clipped, boxes[boundary])) > 0
+            if mask.any():
+                yield BufferedTileBatch(self, zoom, rows[mask], cols[mask])
+
+    def tiles_mask(
+        self, geometry: Geometry, zoom: int, max_cells: Optional[int] = None
+    ) -> TileMask:
+        """
+        Return mask of tiles intersecting with geometry.
+
+        The mask yields the same tiles as tiles_from_geom(geometry, zoom, exact=True)
+        but is computed by rasterizing the geometry on the tile matrix. Only tiles on
+        the geometry boundary are intersected with the geometry.
+
+        If max_cells is given and the tile matrix window covering the geometry is
+        larger, a ValueError is raised.
+        """
+        validate_zoom(zoom)
+        if geometry.is_empty:
+            return TileMask.empty(self, zoom)
+        if not geometry.is_valid:
+            raise ValueError("no valid geometry: %s" % geometry.geom_type)
+        clipped = clip_geometry_to_srs_bounds(geometry, self.tile_pyramid)
+        # only polygonal parts can intersect with tiles by area
+        polygons = get_parts(get_parts(clipped))
+        polygons = polygons[(get_dimensions(polygons) == 2) & ~is_empty(polygons)]
+        if not len(polygons):
+            return TileMask.empty(self, zoom)
+
+        # window of the tile matrix covering the geometry
+        left, bottom, right, top = total_bounds(polygons)
+        left = max([self.left, left])
+        bottom = max([self.bottom, bottom])
+        right = min([self.right, right])
+        top = min([self.top, top])
+        if left >= right or bottom >= top:
+            return TileMask.empty(self, zoom)
+        lb = self.tile_pyramid.tile_from_xy(left, bottom, zoom, on_edge_use="rt")
+        rt = self.tile_pyramid.tile_from_xy(right, top, zoom, on_edge_use="lb")
+        out_shape = (lb.row - rt.row + 1, rt.col - lb.col + 1)
+        if max_cells is not None and out_shape[0] * out_shape[1] > max_cells:
+            raise ValueError(
+                f"tile mask of {out_shape[0]}x{out_shape[1]} cells exceeds {max_cells} cells"
+            )
+        transform = Affine(
+            round(self.x_size / self.matrix_width(zoom), ROUND),
+            0,
+            self.left,
+            0,
+            -round(self.y_size / self.matrix_height(zoom), ROUND),
+            self.top,
+        ) * Affine.translation(lb.col, rt.row)
+
+        # cells touched by the geometry
+        mask = rasterize(
+            polygons,
+            out_shape=out_shape,
+            transform=transform,
+            dtype=np.uint8,
+            all_touched=True,
+        ).astype(bool)
+        # cells touched by the geometry boundary and their neighbors have to be
+        # refined, all other touched cells are covered by the geometry
+        edges = _dilate(
+            rasterize(
+                boundary(polygons),
+                out_shape=out_shape,
+                transform=transform,
+                dtype=np.uint8,
+                all_touched=True,
+            ).astype(bool)
+        )
+        mask &= ~edges
+        edge_rows, edge_cols = np.nonzero(edges)
+        rows, row_starts = np.unique(edge_rows, return_index=True)
+        for row, cols in zip(rows, np.split(edge_cols, row_starts[1:])):
+            bounds = self.tiles_bounds(
+                zoom, np.full(len(cols), row + rt.row), cols + lb.col, pixelbuffer=0
+            )
+            boxes = box(*bounds.T)
+            # intersect tiles only with the part of the geometry within their row
+            row_bounds = total_bounds(boxes)
+            row_geometry = clip_by_rect(clipped, *row_bounds)
+            # clipping by rectangle is fast but does not guarantee valid output
+            if not row_geometry.is_valid:  # pragma: no cover
+                row_geometry = intersection(clipped, box(*row_bounds))
+            prepare(row_geometry)
+            row_mask = intersects(row_geometry, boxes)
+            if row_geometry.geom_type != "GeometryCollection":
+                undecided = row_mask & ~contains_properly(row_geometry, boxes)
+            else:  # pragma: no cover
+                undecided = row_mask.copy()
+            # only the area is of interest, so clipping by rectangle is sufficient
+            row_mask[undecided] = [
+                clip_by_rect(row_geometry, *tile_bounds).area > 0
+                for tile_bounds in bounds[undecided].tolist()
+            ]
+            mask[row, cols] = row_mask
+        return TileMask(self, zoom, mask, row_offset=rt.row, col_offset=lb.col)
+
+    def _bbox_index_batches(
+        self, bounds: BoundsLike, zoom: int, batch_by: BatchBy = BatchBy.row
+    ) -> Generator[Tuple[np.ndarray, np.ndarray], None, None]:
+        # Yield rows and columns of unbuffered tiles intersecting with bounds in
+        # batches, following the tilematrix logic without creating Tile objects.
+        left, bottom, right, top = bounds
+        bounds_geometry = None
+        if self.is_global:
+            top = min([self.top, top])
+            bottom = max([self.bottom, bottom])
+            # bounds crossing the antimeridian are shifted to the valid side
+            if left < self.left or right > self.right:
+                width = self.right - self.left
+                parts = []
+                if left < self.left:
+                    parts.append(
+                        box(
+                            left + width,
+                            bottom,
+                            min([right + width, self.right]),
+                            top,
+                        )
+                    )
+                    if right > self.left:
+                        parts.append(
+                            box(self.left, bottom, min([right, self.right]), top)
+                        )
+                if right > self.right:
+                    parts.append(
+                        box(max([left - width, self.left]), bottom, right - width, top)
+                    )
+                    if left < self.right:
+                        parts.append(
+                            box(max([left, self.left]), bottom, self.right, top)
+                        )
+                unioned = unary_union(parts).buffer(0)
+                left, bottom, right, top = unioned.bounds
+                if unioned.geom_type.startswith("Multi"):
+                    bounds_geometry = unioned
+                    prepare(bounds_geometry)
+        else:
+            left = max([self.left, left])
+            bottom = max([self.bottom, bottom])
+            right = min([self.right, right])
+            top = min([self.top, top])
+            if left > right or bottom > top:  # pragma: no cover
+                return
+        lb = self.tile_pyramid.tile_from_xy(left, bottom, zoom, on_edge_use="rt")
+        rt = self.tile_pyramid.tile_from_xy(right, top, zoom, on_edge_use="lb")
+        rows = np.arange(rt.row, lb.row + 1, dtype=np.int64)
+        cols = np.arange(lb.col, rt.col + 1, dtype=np.int64)
+        if batch_by == BatchBy.row:
+            batches = ((np.full(len(cols), row), cols) for row in rows)
+        else:
+            batches = ((rows, np.full(len(rows), col)) for col in cols)
+        for batch_rows, batch_cols in batches:
+            if bounds_geometry is not None:
+                mask = intersects(
+                    bounds_geometry,
+                    box(
+                        *self.tiles_bounds(
+                            zoom, batch_rows, batch_cols, pixelbuffer=0
+                        ).T
+                    ),
+                )
+                batch_rows, batch_cols = batch_rows[mask], batch_cols[mask]
+            yield batch_rows, batch_cols
 
     def intersecting(self, tile: BufferedTile) -> List[BufferedTile]:
         """
         Return all BufferedTiles intersecting with tile.
         """
         return [
-            self.tile(*intersecting_tile.id)
+            BufferedTile._from_index(self, *intersecting_tile.id)
             for intersecting_tile in self.tile_pyramid.intersecting(tile)
         ]
 
@@ -223,61 +498,150 @@ class BufferedTilePyramid(TilePyramid):
 class BufferedTile(GridProtocol):
     """
     A Tile member of a BufferedTilePyramid.
+
+    Only the tile index and a reference to the pyramid are stored, all other properties
+    are computed on first access.
     """
 
+    __slots__ = (
+        "buffered_tp",
+        "pixelbuffer",
+        "zoom",
+        "row",
+        "col",
+        "_base_tile",
+        "_bounds",
+        "_bbox",
+        "_shape",
+        "_affine",
+    )
+
     zoom: int
     row: int
     col: int
-    id: TileIndex
     pixelbuffer: NonNegativeInt
-    bounds: Bounds
-    bbox: Union[Polygon, MultiPolygon]
-    left: float
-    bottom: float
-    right: float
-    top: float
-    shape: Shape
-    height: int
-    width: int
-    affine: Affine
-    transform: Affine
-    crs: CRSLike
-    tp: TilePyramid
-    pixel_x_size: float
-    pixel_y_size: float
+    buffered_tp: BufferedTilePyramid
 
     def __init__(self, tile: Tile, pixelbuffer: NonNegativeInt = 0):
         """Initialize."""
-        if isinstance(tile, BufferedTile):
-            tile = TilePyramid(
-                tile.tp.grid, tile_size=tile.tp.tile_size, metatiling=tile.tp.metatiling
-            ).tile(*tile.id)
-        self._tile = tile
-        self.pixelbuffer = pixelbuffer
-        self.buffered_tp = BufferedTilePyramid(
-            tile.tp.to_dict(), pixelbuffer=pixelbuffer
+        self._init(
+            _buffered_pyramid(tile.tp, pixelbuffer), tile.zoom, tile.row, tile.col
         )
-        bounds = Bounds.from_inp(self._tile.bounds(pixelbuffer=self.pixelbuffer))
-        self.left = bounds.left
-        self.bottom = bounds.bottom
-        self.right = bounds.right
-        self.top = bounds.top
-        self.bounds = bounds
-        self.bbox = self._tile.bbox(pixelbuffer=self.pixelbuffer)
-        self.__geo_interface__ = mapping(self.bbox)
-        self.shape = self._tile.shape(pixelbuffer=self.pixelbuffer)
-        self.height = self.shape.height
-        self.width = self.shape.width
-        self.affine = self._tile.affine(pixelbuffer=self.pixelbuffer)
-        self.transform = self._tile.affine(pixelbuffer=self.pixelbuffer)
-        self.zoom = tile.zoom
-        self.row = tile.row
-        self.col = tile.col
-        self.id = tile.id
-        self.crs = tile.crs
-        self.tp = self.tile_pyramid = tile.tp
-        self.pixel_x_size = tile.pixel_x_size
-        self.pixel_y_size = tile.pixel_y_size
+        if isinstance(tile, Tile):
+            self._base_tile = tile
+
+    @classmethod
+    def _from_index(
+        cls, buffered_tp: BufferedTilePyramid, zoom: int, row: int, col: int
+    ) -> BufferedTile:
+        # skips validation and pyramid lookup, so only use with valid tile indexes
+        tile = cls.__new__(cls)
+        tile._init(buffered_tp, zoom, row, col)
+        return tile
+
+    def _init(
+        self, buffered_tp: BufferedTilePyramid, zoom: int, row: int, col: int
+    ) -> None:
+        self.buffered_tp = buffered_tp
+        self.pixelbuffer = buffered_tp.pixelbuffer
+        self.zoom = zoom
+        self.row = row
+        self.col = col
+        self._base_tile = None
+        self._bounds = None
+        self._bbox = None
+        self._shape = None
+        self._affine = None
+
+    @property
+    def _tile(self) -> Tile:
+        if self._base_tile is None:
+            self._base_tile = self.buffered_tp.tile_pyramid.tile(
+                self.zoom, self.row, self.col
+            )
+        return self._base_tile
+
+    @property
+    def id(self) -> TileIndex:
+        return TileIndex(self.zoom, self.row, self.col)
+
+    @property
+    def tp(self) -> TilePyramid:
+        return self.buffered_tp.tile_pyramid
+
+    @property
+    def tile_pyramid(self) -> TilePyramid:
+        return self.buffered_tp.tile_pyramid
+
+    @property
+    def crs(self) -> CRSLike:
+        return self.buffered_tp.crs
+
+    @property
+    def pixel_x_size(self) -> float:
+        return self.buffered_tp.pixel_x_size(self.zoom)
+
+    @property
+    def pixel_y_size(self) -> float:
+        return self.buffered_tp.pixel_y_size(self.zoom)
+
+    @property
+    def bounds(self) -> Bounds:
+        if self._bounds is None:
+            self._bounds = Bounds.from_inp(
+                self._tile.bounds(pixelbuffer=self.pixelbuffer)
+            )
+        return self._bounds
+
+    @property
+    def left(self) -> float:
+        return self.bounds.left
+
+    @property
+    def bottom(self) -> float:
+        return self.bounds.bottom
+
+    @property
+    def right(self) -> float:
+        return self.bounds.right
+
+    @property
+    def top(self) -> float:
+        return self.bounds.top
+
+    @property
+    def bbox(self) -> Union[Polygon, MultiPolygon]:
+        if self._bbox is None:
+            self._bbox = self._tile.bbox(pixelbuffer=self.pixelbuffer)
+        return self._bbox
+
+    @property
+    def __geo_interface__(self) -> dict:
+        return mapping(self.bbox)
+
+    @property
+    def shape(self) -> Shape:
+        if self._shape is None:
+            self._shape = self._tile.shape(pixelbuffer=self.pixelbuffer)
+        return self._shape
+
+    @property
+    def height(self) -> int:
+        return self.shape.height
+
+    @property
+    def width(self) -> int:
+        return self.shape.width
+
+    @property
+    def affine(self) -> Affine:
+        if self._affine is None:
+            self._affine = self._tile.affine(pixelbuffer=self.pixelbuffer)
+        return self._affine
+
+    @property
+    def transform(self) -> Affine:
+        return self.affine
 
     def is_valid(self) -> bool:  # pragma: no cover
         return self._tile.is_valid()
@@ -286,13 +650,19 @@ class BufferedTile(GridProtocol):
         """
         Get tile children (intersecting tiles in next zoom level).
         """
-        return [BufferedTile(t, self.pixelbuffer) for t in self._tile.get_children()]
+        return [
+            BufferedTile._from_index(self.buffered_tp, *t.id)
+            for t in self._tile.get_children()
+        ]
 
     def get_parent(self) -> BufferedTile:
         """
         Get tile parent (intersecting tile in previous zoom level).
         """
-        return BufferedTile(self._tile.get_parent(), self.pixelbuffer)  # type: ignore
+        return BufferedTile._from_index(
+            self.buffered_tp,
+            *self._tile.get_parent().id,  # type: ignore
+        )
 
     def get_neighbors(self, connectedness: Literal[4, 8] = 8) -> List[BufferedTile]:
         """
@@ -315,7 +685,7 @@ class BufferedTile(GridProtocol):
         # -------------
         """
         return [
-            BufferedTile(t, self.pixelbuffer)
+            BufferedTile._from_index(self.buffered_tp, *t.id)
             for t in self._tile.get_neighbors(connectedness=connectedness)
         ]
 
@@ -331,9 +701,14 @@ class BufferedTile(GridProtocol):
     def __eq__(self, other: BufferedTile):
         return (
             isinstance(other, self.__class__)
+            and self.zoom == other.zoom
+            and self.row == other.row
+            and self.col == other.col
             and self.pixelbuffer == other.pixelbuffer
-            and self.buffered_tp == other.buffered_tp
-            and self.id == other.id
+            and (
+                self.buffered_tp is other.buffered_tp
+                or self.buffered_tp == other.buffered_tp
+            )
         )
 
     def __ne__(self, other: BufferedTile):
@@ -343,13 +718,206 @@ class BufferedTile(GridProtocol):
         return f"BufferedTile(zoom={self.zoom}, row={self.row}, col={self.col})"
 
     def __hash__(self):
-        return hash(repr(self))
+        return hash((self.zoom, self.row, self.col))
 
     def __iter__(self):
         yield self.zoom
         yield self.row
         yield self.col
 
+    def __getstate__(self):
+        # don't serialize cached properties
+        return self.buffered_tp, self.zoom, self.row, self.col
+
+    def __setstate__(self, state):
+        self._init(*state)
+
+
+class BufferedTileBatch:
+    """
+    Compact batch of tiles from one zoom level of a BufferedTilePyramid.
+
+    Tiles are stored as arrays of rows and columns and only converted into BufferedTile
+    objects when iterating over the batch.
+    """
+
+    __slots__ = ("pyramid", "zoom", "rows", "cols")
+
+    pyramid: BufferedTilePyramid
+    zoom: int
+    rows: np.ndarray
+    cols: np.ndarray
+
+    def __init__(
+        self,
+        pyramid: BufferedTilePyramid,
+        zoom: int,
+        rows: Union[np.ndarray, List[int]],
+        cols: Union[np.ndarray, List[int]],
+    ):
+        self.pyramid = pyramid
+        self.zoom = zoom
+        self.rows = np.asarray(rows, dtype=np.int64)
+        self.cols = np.asarray(cols, dtype=np.int64)
+        if self.rows.shape != self.cols.shape:  # pragma: no cover
+            raise ValueError("rows and cols must have the same shape")
+
+    @staticmethod
+    def from_tiles(
+        pyramid: BufferedTilePyramid,
+        zoom: int,
+        tiles: Iterable[Union[Tile, BufferedTile]],
+    ) -> BufferedTileBatch:
+        """Create batch from tiles."""
+        indexes = [(tile.row, tile.col) for tile in tiles]
+        if indexes:
+            rows, cols = zip(*indexes)
+        else:
+            rows, cols = (), ()
+        return BufferedTileBatch(pyramid, zoom, rows, cols)
+
+    @property
+    def bounds(self) -> np.ndarray:
+        """Array of (left, bottom, right, top) bounds of all tiles."""
+        return self.pyramid.tiles_bounds(self.zoom, self.rows, self.cols)
+
+    @property
+    def total_bounds(self) -> Bounds:
+        """Bounds covering all tiles."""
+        if not len(self):  # pragma: no cover
+            raise ValueError("empty batch has no bounds")
+        bounds = self.bounds
+        return Bounds(
+            float(bounds[:, 0].min()),
+            float(bounds[:, 1].min()),
+            float(bounds[:, 2].max()),
+            float(bounds[:, 3].max()),
+        )
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def __iter__(self) -> Iterator[BufferedTile]:
+        for row, col in zip(self.rows.tolist(), self.cols.tolist()):
+            yield BufferedTile._from_index(self.pyramid, self.zoom, row, col)
+
+    def __repr__(self):  # pragma: no cover
+        return f"BufferedTileBatch(zoom={self.zoom}, tiles={len(self)})"
+
+
+class TileMask:
+    """
+    Boolean mask of tiles from one zoom level of a BufferedTilePyramid.
+
+    The mask covers a window of the tile matrix. It can be indexed by tiles, by
+    (row, col) tuples or by arrays of rows and columns.
+    """
+
+    __slots__ = ("pyramid", "zoom", "mask", "row_offset", "col_offset")
+
+    pyramid: BufferedTilePyramid
+    zoom: int
+    mask: np.ndarray
+    row_offset: int
+    col_offset: int
+
+    def __init__(
+        self,
+        pyramid: BufferedTilePyramid,
+        zoom: int,
+        mask: np.ndarray,
+        row_offset: int = 0,
+        col_offset: int = 0,
+    ):
+        self.pyramid = pyramid
+        self.zoom = zoom
+        self.mask = mask
+        self.row_offset = row_offset
+        self.col_offset = col_offset
+
+    @staticmethod
+    def empty(pyramid: BufferedTilePyramid, zoom: int) -> TileMask:
+        return TileMask(pyramid, zoom, np.zeros((0, 0), dtype=bool))
+
+    def __len__(self) -> int:
+        return int(np.count_nonzero(self.mask))
+
+    def __contains__(self, tile: Union[Tile, BufferedTile, Tuple[int, int]]) -> bool:
+        if isinstance(tile, tuple):
+            row, col = tile
+        else:
+            if tile.zoom != self.zoom:
+                return False
+            row, col = tile.row, tile.col
+        return bool(self[row, col])
+
+    def __getitem__(
+        self, index: Tuple[Union[int, np.ndarray], Union[int, np.ndarray]]
+    ) -> Union[bool, np.ndarray]:
+        rows, cols = index
+        rows = np.asarray(rows, dtype=np.int64) - self.row_offset
+        cols = np.asarray(cols, dtype=np.int64) - self.col_offset
+        height, width = self.mask.shape
+        inside = (rows >= 0) & (rows < height) & (cols >= 0) & (cols < width)
+        out = np.zeros(np.broadcast(rows, cols).shape, dtype=bool)
+        out[inside] = self.mask[
+            np.broadcast_to(rows, out.shape)[inside],
+            np.broadcast_to(cols, out.shape)[inside],
+        ]
+        return out if out.ndim else bool(out)
+
+    def batches(
+        self, batch_by: BatchBy = BatchBy.row
+    ) -> Generator[BufferedTileBatch, None, None]:
+        """Yield batches of tiles within mask by row or column."""
+        if batch_by == BatchBy.row:
+            for row, cols in enumerate(self.mask):
+                cols = np.flatnonzero(cols)
+                if len(cols):
+                    yield BufferedTileBatch(
+                        self.pyramid,
+                        self.zoom,
+                        np.full(len(cols), row + self.row_offset),
+                        cols + self.col_offset,
+                    )
+        else:
+            for col, rows in enumerate(self.mask.T):
+                rows = np.flatnonzero(rows)
+                if len(rows):
+                    yield BufferedTileBatch(
+                        self.pyramid,
+                        self.zoom,
+                        rows + self.row_offset,
+                        np.full(len(rows), col + self.col_offset),
+                    )
+
+    def tiles(self) -> Generator[BufferedTile, None, None]:
+        """Yield tiles within mask."""
+        for batch in self.batches():
+            yield from batch
+
+    def __repr__(self):  # pragma: no cover
+        return f"TileMask(zoom={self.zoom}, tiles={len(self)}, shape={self.mask.shape})"
+
+
+def _dilate(mask: np.ndarray) -> np.ndarray:
+    # grow mask by one cell in every direction (8-connectedness)
+    out = mask.copy()
+    out[1:] |= mask[:-1]
+    out[:-1] |= mask[1:]
+    rows = out.copy()
+    out[:, 1:] |= rows[:, :-1]
+    out[:, :-1] |= rows[:, 1:]
+    return out
+
+
+@lru_cache(maxsize=128)
+def _buffered_pyramid(
+    tile_pyramid: TilePyramid, pixelbuffer: NonNegativeInt = 0
+) -> BufferedTilePyramid:
+    # share one pyramid instance between all tiles instead of creating one per tile
+    return BufferedTilePyramid(**tile_pyramid.to_dict(), pixelbuffer=pixelbuffer)
+
 
 def count_tiles(
     geometry: Geometry,
@@ -363,47 +931,67 @@ def count_tiles(
     Count number of tiles intersecting with geometry.
     """
 
-    def _count_tiles(tiles, geometry, minzoom, maxzoom):
+    def _count_tiles(pyramid, geometry, init_zoom, minzoom, maxzoom):
+        # process one zoom level at a time and intersect all tiles at once
+        rows, cols = (
+            index.ravel()
+            for index in np.meshgrid(
+                np.arange(pyramid.matrix_height(init_zoom)),
+                np.arange(pyramid.matrix_width(init_zoom)),
+                indexing="ij",
+            )
+        )
+        # each tile is intersected with the data covered by its parent tile
+        geometries = np.full(len(rows), geometry, dtype=object)
         count = 0
-        for tile in tiles:
-            # determine data covered by tile
-            tile_intersection = geometry.intersection(tile.bbox)
-
-            # skip if there is no intersection
-            if not tile_intersection.area:
-                continue
-
-            # increase counter as tile contains data
-            if tile.zoom >= minzoom:
-                count += 1
-
-            # if there are further zoom levels, analyze descendants
-            if tile.zoom < maxzoom:
-                # if tile is half full, analyze each descendant
-                # also do this if the tile children are not four in which case we cannot use
-                # the count formula below
-                if (
-                    tile_intersection.area < tile.bbox.area
-                    or len(tile.get_children()) != 4
-                ):
-                    count += _count_tiles(
-                        tile.get_children(), tile_intersection, minzoom, maxzoom
-                    )
+        for zoom in range(init_zoom, maxzoom + 1):
+            boxes = box(*pyramid.tiles_bounds(zoom, rows, cols, pixelbuffer=0).T)
+            # determine data covered by tiles
+            tiles_intersection = intersection(geometries, boxes)
+            intersection_area = area(tiles_intersection)
+
+            # skip tiles where there is no intersection
+            has_data = intersection_area > 0
+            rows, cols, boxes = rows[has_data], cols[has_data], boxes[has_data]
+            tiles_intersection = tiles_intersection[has_data]
+            intersection_area = intersection_area[has_data]
+
+            # increase counter as tiles contain data
+            if zoom >= minzoom:
+                count += len(rows)
+
+            # if there are no further zoom levels, we are done
+            if zoom == maxzoom or not len(rows):
+                break
 
-                # if tile is full, all of its descendants will be full as well
-                else:
-                    # sum up tiles for each remaining zoom level
-                    count += sum(
-                        [
-                            4**z
-                            for z in range(
-                                # only count zoom levels which are greater than minzoom or
-                                # count all zoom levels from tile zoom level to maxzoom
-                                minzoom - tile.zoom if tile.zoom < minzoom else 1,
-                                maxzoom - tile.zoom + 1,
-                            )
-                        ]
+            # children of tiles which are cut by the pyramid bounds are not four in
+            # which case we cannot use the count formula below
+            child_rows = rows[:, np.newaxis] * 2 + np.array([0, 0, 1, 1])
+            child_cols = cols[:, np.newaxis] * 2 + np.array([0, 1, 1, 0])
+            valid_children = (child_rows < pyramid.matrix_height(zoom + 1)) & (
+                child_cols < pyramid.matrix_width(zoom + 1)
+            )
+
+            # if tile is full, all of its descendants will be full as well
+            full = (intersection_area >= area(boxes)) & valid_children.all(axis=1)
+            # sum up tiles for each remaining zoom level
+            count += int(full.sum()) * sum(
+                [
+                    4**z
+                    for z in range(
+                        # only count zoom levels which are greater than minzoom or
+                        # count all zoom levels from tile zoom level to maxzoom
+                        minzoom - zoom if zoom < minzoom else 1,
+                        maxzoom - zoom + 1,
                     )
+                ]
+            )
+
+            # if tile is half full, analyze each descendant
+            valid_children[full] = False
+            rows = child_rows[valid_children]
+            cols = child_cols[valid_children]
+            geometries = np.repeat(tiles_intersection, valid_children.sum(axis=1))
 
         return count
 
@@ -472,19 +1060,7 @@ def count_tiles(
         return _count_cells(unbuffered_pyramid, geometry, minzoom, maxzoom)
 
     logger.debug("count tiles using tile logic")
-    return _count_tiles(
-        [
-            unbuffered_pyramid.tile(*tile_id)
-            for tile_id in product(
-                [init_zoom],
-                range(pyramid.matrix_height(init_zoom)),
-                range(pyramid.matrix_width(init_zoom)),
-            )
-        ],
-        geometry,
-        minzoom,
-        maxzoom,
-    )
+    return _count_tiles(unbuffered_pyramid, geometry, init_zoom, minzoom, maxzoom)
 
 
 def snap_geometry_to_tiles(
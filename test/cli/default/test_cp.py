@@ -93,6 +93,18 @@ def test_cp(mp_tmpdir, cleantopo_br, wkt_geom, testdata_dir):
             "threads",
         ]
     )
+    # overwrite changed tiles comparing checksums
+    run_cli(
+        [
+            "cp",
+            out_path,
+            mp_tmpdir / "all",
+            "-z",
+            "5",
+            "--overwrite",
+            "--checksum",
+        ]
+    )
 
 
 @pytest.mark.integration
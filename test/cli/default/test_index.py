@@ -261,6 +261,28 @@ def test_text(cleantopo_br):
             assert line.endswith("7.tif\n")
 
 
+def test_text_incremental(cleantopo_br):
+    # execute process
+    run_cli(
+        ["execute", cleantopo_br.path, "-z", "5", "--debug", "--concurrency", "none"]
+    )
+
+    # generate index twice
+    for _ in range(2):
+        run_cli(
+            ["index", cleantopo_br.path, "-z", "5", "--txt", "--incremental", "--debug"]
+        )
+        with mapchete.open(cleantopo_br.dict) as mp:
+            files = mp.config.output.path.ls(absolute_paths=False)
+            assert "5.txt" in files
+            assert "5.watermark.json" in files
+        with open(mp.config.output.path / "5.txt") as src:
+            lines = list(src)
+            assert len(lines) == 1
+            for line in lines:
+                assert line.endswith("7.tif\n")
+
+
 def test_errors(cleantopo_br):
     with pytest.raises(ValueError):
         run_cli(["index", cleantopo_br.path, "-z", "5", "--debug"])
@@ -34,3 +34,32 @@ def test_rm(cleantopo_br):
         ]
     )
     assert not out_path.exists()
+
+
+def test_rm_confirm(cleantopo_br):
+    run_cli(["execute", cleantopo_br.path, "-z", "5", "--concurrency", "none"])
+    out_path = cleantopo_br.dict["output"]["path"] / 5 / 3 / "7.tif"
+    assert out_path.exists()
+
+    # abort
+    run_cli(
+        ["rm", cleantopo_br.output_path, "-z", "5"],
+        input="n\n",
+        expected_exit_code=1,
+        output_contains="Aborted",
+        raise_exc=False,
+    )
+    assert out_path.exists()
+
+    run_cli(
+        ["rm", cleantopo_br.output_path, "-z", "5"],
+        input="y\n",
+        output_contains="Do you want to delete 1 tiles?",
+    )
+    assert not out_path.exists()
+
+    # nothing left to delete
+    run_cli(
+        ["rm", cleantopo_br.output_path, "-z", "5"],
+        output_contains="No tiles found to delete.",
+    )
@@ -4,6 +4,12 @@ from test.cli.default import run_cli
 import pytest
 from rasterio.io import MemoryFile
 
+import mapchete
+from mapchete.cli.mapchete.serve import _existing_output_path, create_app
+from mapchete.executor import Executor
+from mapchete.testing import clear_dict
+from mapchete.tile import BufferedTilePyramid
+
 
 def test_serve_cli_params(cleantopo_br):
     """Test whether different CLI params pass."""
@@ -15,6 +21,7 @@ def test_serve_cli_params(cleantopo_br):
         ["serve", cleantopo_br.path],
         ["serve", cleantopo_br.path, "--port", "5001"],
         ["serve", cleantopo_br.path, "--internal-cache", "512"],
+        ["serve", cleantopo_br.path, "--cache-spill-dir", cleantopo_br.output_path],
         ["serve", cleantopo_br.path, "--zoom", "5"],
         ["serve", cleantopo_br.path, "--bounds", "-1", "-1", "1", "1"],
         ["serve", cleantopo_br.path, "--overwrite"],
@@ -59,3 +66,69 @@ def test_serve(client):
     # test invalid url
     response = client.get(tile_base_url + "invalid_url")
     assert response.status_code == 404
+
+
+def _unbuffered_mapchete_file(process_fixture, mp_tmpdir, tile_size=256):
+    config = dict(
+        process_fixture.dict,
+        pyramid=dict(
+            process_fixture.dict["pyramid"], pixelbuffer=0, tile_size=tile_size
+        ),
+        output=dict(process_fixture.dict["output"], pixelbuffer=0),
+    )
+    mapchete_file = mp_tmpdir / "unbuffered.mapchete"
+    mapchete_file.write_yaml(clear_dict(config))
+    return mapchete_file
+
+
+def test_serve_existing_tiles(cleantopo_br_metatiling_1, mp_tmpdir):
+    """Stream already written tiles and respond to conditional requests."""
+    mapchete_file = _unbuffered_mapchete_file(cleantopo_br_metatiling_1, mp_tmpdir)
+    with mapchete.open(mapchete_file) as mp:
+        list(mp.execute(zoom=5))
+        tile = mp.config.output_pyramid.tile(5, 31, 63)
+        path = mp.config.output_reader.get_path(tile)
+    assert path.exists()
+
+    client = create_app(mapchete_files=[mapchete_file], mode="readonly").test_client()
+    url = "/wmts_simple/1.0.0/unbuffered/default/WGS84/{}/{}/{}.tif".format(*tile.id)
+    response = client.get(url)
+    assert response.status_code == 200
+    assert response.mimetype == "image/tiff"
+    assert response.headers["ETag"]
+    assert response.headers["Last-Modified"]
+    with path.open("rb") as src:
+        assert response.data == src.read()
+
+    response = client.get(url, headers={"If-None-Match": response.headers["ETag"]})
+    assert response.status_code == 304
+    assert not response.data
+
+
+def test_serve_existing_tiles_other_tile_size(cleantopo_br_metatiling_1, mp_tmpdir):
+    """Don't stream output tiles which cover a different area than the web tile."""
+    mapchete_file = _unbuffered_mapchete_file(
+        cleantopo_br_metatiling_1, mp_tmpdir, tile_size=512
+    )
+    with mapchete.open(mapchete_file) as mp:
+        list(mp.execute(zoom=5))
+    with mapchete.open(mapchete_file, mode="readonly") as mp:
+        web_tile = BufferedTilePyramid("geodetic").tile(5, 31, 63)
+        assert mp.config.output_reader.get_path(
+            mp.config.output_pyramid.tile(*web_tile.id)
+        ).exists()
+        assert _existing_output_path(mp, web_tile) is None
+
+
+def test_serve_executor(cleantopo_br_metatiling_1, mp_tmpdir):
+    """Process tiles on a process pool."""
+    mapchete_file = _unbuffered_mapchete_file(cleantopo_br_metatiling_1, mp_tmpdir)
+    with Executor(concurrency="processes", max_workers=2) as executor:
+        client = create_app(
+            mapchete_files=[mapchete_file], mode="memory", executor=executor
+        ).test_client()
+        response = client.get("/wmts_simple/1.0.0/unbuffered/default/WGS84/5/31/63.tif")
+        assert response.status_code == 200
+        with MemoryFile(response.data) as memfile:
+            with memfile.open() as dataset:
+                assert dataset.read().any()
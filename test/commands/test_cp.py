@@ -4,6 +4,7 @@ import pytest
 
 import mapchete
 from mapchete.commands import cp
+from mapchete.protocols import ObserverProtocol
 
 
 def test_cp(mp_tmpdir, cleantopo_br, wkt_geom, testdata_dir):
@@ -64,3 +65,51 @@ def test_cp_http(mp_tmpdir, http_tiledir):
         observers=[task_counter],
     )
     assert task_counter.tasks
+
+
+class MessageCollector(ObserverProtocol):
+    def __init__(self):
+        self.messages = []
+
+    def update(self, *args, message=None, **kwargs):
+        if message:
+            self.messages.append(message)
+
+
+@pytest.mark.parametrize("checksum", [True, False])
+def test_cp_overwrite_sync(mp_tmpdir, cleantopo_br, testdata_dir, checksum):
+    with mapchete.open(cleantopo_br.dict) as mp:
+        list(mp.execute(zoom=5))
+    src_path = testdata_dir / cleantopo_br.dict["output"]["path"]
+    dst_path = mp_tmpdir / "sync"
+    cp(src_path, dst_path, zoom=5)
+    src_tiles = sorted(next((src_path / "5").paginate()), key=str)
+    dst_tiles = sorted(next((dst_path / "5").paginate()), key=str)
+    assert len(src_tiles) == len(dst_tiles)
+
+    # nothing changed, so nothing is copied
+    messages = MessageCollector()
+    cp(
+        src_path,
+        dst_path,
+        zoom=5,
+        overwrite=True,
+        checksum=checksum,
+        observers=[messages],
+    )
+    assert "0 tiles copied" in messages.messages
+
+    # only the changed destination tile gets replaced
+    with dst_tiles[0].open("wb") as dst:
+        dst.write(b"invalid")
+    messages = MessageCollector()
+    cp(
+        src_path,
+        dst_path,
+        zoom=5,
+        overwrite=True,
+        checksum=checksum,
+        observers=[messages],
+    )
+    assert "1 tiles copied" in messages.messages
+    assert dst_tiles[0].checksum() == src_tiles[0].checksum()
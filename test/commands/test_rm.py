@@ -4,6 +4,13 @@ import pytest
 
 import mapchete
 from mapchete.commands import rm
+from mapchete.commands.rm import (
+    DeleteBatch,
+    _rm_batch,
+    existing_paths,
+    existing_tiles_count,
+)
+from mapchete.settings import mapchete_options
 
 
 def test_rm(cleantopo_br, testdata_dir):
@@ -44,3 +51,86 @@ def test_rm_path_list_s3(s3_testdata_dir):
     assert out_path.exists()
     rm(paths=[out_path])
     assert not out_path.exists()
+
+
+def test_rm_prefixes(cleantopo_br, testdata_dir):
+    # generate TileDirectory
+    with mapchete.open(
+        cleantopo_br.dict, bounds=[169.19251592399996, -90, 180, -80.18582802550002]
+    ) as mp:
+        list(mp.execute(zoom=5))
+    out_path = testdata_dir / cleantopo_br.dict["output"]["path"]
+
+    # create dummy tiles covering the whole zoom level
+    for row in range(2):
+        (out_path / 1 / row).makedirs()
+        for col in range(4):
+            with (out_path / 1 / row / f"{col}.tif").open("w") as dst:
+                dst.write("foo")
+
+    # northern row is covered entirely and gets removed as a whole
+    task_counter = TaskCounter()
+    rm(out_path, zoom=1, bounds=[-180, 0, 180, 90], observers=[task_counter])
+    assert task_counter.tasks == 4
+    assert not (out_path / 1 / 0).exists()
+    assert len((out_path / 1 / 1).ls()) == 4
+
+    # whole zoom level is covered
+    task_counter = TaskCounter()
+    rm(out_path, zoom=1, observers=[task_counter])
+    assert task_counter.tasks == 4
+    assert not (out_path / 1).exists()
+
+
+def test_rm_path_list_batches(mp_tmpdir):
+    paths = [mp_tmpdir / f"some_file_{i}.txt" for i in range(10)]
+    for path in paths:
+        with path.open("w") as dst:
+            dst.write("foo")
+
+    task_counter = TaskCounter()
+    rm(paths=paths, batch_size=3, observers=[task_counter])
+    assert task_counter.tasks == 10
+    assert not any(path.exists() for path in paths)
+
+
+@pytest.mark.parametrize("area_mask_max_cells", [None, 1])
+def test_rm_partial_rows(
+    cleantopo_br_metatiling_1, testdata_dir, monkeypatch, area_mask_max_cells
+):
+    if area_mask_max_cells:
+        # determine tiles within area without an area mask
+        monkeypatch.setattr(
+            mapchete_options, "area_mask_max_cells", area_mask_max_cells
+        )
+    # generate TileDirectory
+    with mapchete.open(
+        cleantopo_br_metatiling_1.dict,
+        bounds=[169.19251592399996, -90, 180, -80.18582802550002],
+    ) as mp:
+        list(mp.execute(zoom=5))
+    out_path = testdata_dir / cleantopo_br_metatiling_1.dict["output"]["path"]
+
+    # create dummy tiles covering the whole zoom level
+    for row in range(2):
+        (out_path / 1 / row).makedirs()
+        for col in range(4):
+            with (out_path / 1 / row / f"{col}.tif").open("w") as dst:
+                dst.write("foo")
+
+    # western half of both rows
+    assert len(existing_paths(out_path, zoom=1, bounds=[-180, -90, 0, 90])) == 4
+    assert existing_tiles_count(out_path, zoom=1, bounds=[-180, -90, 0, 90]) == 4
+    task_counter = TaskCounter()
+    rm(out_path, zoom=1, bounds=[-180, -90, 0, 90], observers=[task_counter])
+    assert task_counter.tasks == 4
+    for row in range(2):
+        assert sorted(path.name for path in (out_path / 1 / row).ls()) == [
+            "2.tif",
+            "3.tif",
+        ]
+
+
+def test_rm_prefix_error(mp_tmpdir):
+    with pytest.raises(FileNotFoundError):
+        _rm_batch(DeleteBatch([], prefix=mp_tmpdir / "missing", tiles_count=1))
@@ -49,6 +49,25 @@ def test_dask_cancellederror(dask_executor, items=10):
         list(dask_executor.as_completed(raise_cancellederror, range(items)))
 
 
+def test_compute_task_graph_chunks(dask_executor):
+    def _add(value, dependencies=None):
+        return value + sum(dependencies.values())
+
+    chunks = [
+        ("first", {f"first-{i}": (_add, i, {}, {}) for i in range(5)}),
+        ("first", {f"first-{i}": (_add, i, {}, {}) for i in range(5, 10)}),
+        (
+            "second",
+            {"second": (_add, 0, {}, {i: f"first-{i}" for i in range(10)})},
+        ),
+    ]
+    results = [
+        future.result()
+        for future in dask_executor.compute_task_graph_chunks(chunks, with_results=True)
+    ]
+    assert sorted(results) == sorted([*range(10), sum(range(10))])
+
+
 def test_compute_task_graph(dask_executor):
     for future in dask_executor.compute_task_graph(
         dask_collection=[delayed(str)(number) for number in range(10)]
@@ -0,0 +1,98 @@
+import os
+import sys
+
+import pytest
+
+from mapchete.commands import cp, execute
+from mapchete.config.process_func import _loaded_modules
+from mapchete.enums import Concurrency
+from mapchete.executor import WorkerPool
+from mapchete.executor.concurrent_futures import ConcurrentFuturesExecutor
+
+
+def _pid(_):
+    return os.getpid()
+
+
+def _crash(_):
+    os._exit(1)
+
+
+def test_worker_pool_reuse():
+    with WorkerPool(max_workers=2) as pool:
+        pids = set()
+        for _ in range(2):
+            with pool() as executor:
+                assert isinstance(executor, ConcurrentFuturesExecutor)
+                assert executor.max_workers == 2
+                pids.update(
+                    future.result() for future in executor.as_completed(_pid, range(10))
+                )
+                assert not executor.futures
+        # same workers were used by both executors
+        assert len(pids) <= 2
+        assert pool._pool is not None
+    assert pool._pool is None
+
+
+def test_worker_pool_broken():
+    with WorkerPool(max_workers=1) as pool:
+        broken = pool.pool
+        with pytest.raises(Exception):
+            with pool() as executor:
+                list(executor.as_completed(_crash, range(2)))
+        with pool() as executor:
+            assert [future.result() for future in executor.as_completed(_pid, [0])]
+        assert pool.pool is not broken
+
+
+def test_worker_pool_threads_preload(process_error_py):
+    with WorkerPool(
+        concurrency=Concurrency.threads,
+        max_workers=2,
+        preload=[str(process_error_py)],
+    ) as pool:
+        assert str(process_error_py) in _loaded_modules
+        assert "process_error" in sys.modules
+        with pool() as executor:
+            assert [future.result() for future in executor.as_completed(_pid, [0])] == [
+                os.getpid()
+            ]
+
+
+def test_worker_pool_mismatching_arguments():
+    with WorkerPool(concurrency=Concurrency.threads, max_workers=2) as pool:
+        with pytest.warns(UserWarning, match="processes concurrency requested"):
+            with pool(concurrency=Concurrency.processes):
+                pass
+        with pytest.warns(UserWarning, match="4 workers requested"):
+            with pool(concurrency="threads", max_workers=4):
+                pass
+
+
+def test_worker_pool_invalid_concurrency():
+    with pytest.raises(ValueError):
+        WorkerPool(concurrency=Concurrency.dask)
+
+
+def test_worker_pool_commands(cleantopo_br_metatiling_1, mp_tmpdir):
+    with WorkerPool(max_workers=2) as pool:
+        workers = pool.pool
+        execute(
+            cleantopo_br_metatiling_1.dict,
+            zoom=5,
+            concurrency=Concurrency.processes,
+            workers=2,
+            executor_getter=pool,
+        )
+        cp(
+            cleantopo_br_metatiling_1.mp().config.output_reader.path,
+            mp_tmpdir / "copy",
+            zoom=5,
+            concurrency=Concurrency.processes,
+            workers=2,
+            executor_getter=pool,
+        )
+        # both commands used the same workers
+        assert pool.pool is workers
+    assert (mp_tmpdir / "copy" / "5").ls()
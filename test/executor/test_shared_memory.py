@@ -0,0 +1,171 @@
+import glob
+import mmap
+from multiprocessing.reduction import ForkingPickler
+from multiprocessing.shared_memory import SharedMemory
+
+import numpy as np
+import numpy.ma as ma
+import pytest
+
+import mapchete
+
+from mapchete.executor import SequentialExecutor
+from mapchete.executor.concurrent_futures import ConcurrentFuturesExecutor
+from mapchete.executor.shared_memory import (
+    SharedArray,
+    register_shared_memory_reducers,
+)
+from mapchete.settings import mapchete_options
+
+
+def _masked_array(value=1, shape=(3, 256, 256), dtype=np.uint16):
+    array = ma.masked_array(np.full(shape, value, dtype=dtype), fill_value=7)
+    array[:, :10, :10] = ma.masked
+    return array
+
+
+def _shared_memory_segments():
+    return set(glob.glob("/dev/shm/psm_*"))
+
+
+def test_shared_array_masked():
+    array = _masked_array()
+    shared = SharedArray.from_array(array)
+    assert shared.masked
+    assert shared.mask_offset % 64 == 0
+
+    restored = shared.to_array()
+    assert isinstance(restored, ma.MaskedArray)
+    assert restored.dtype == array.dtype
+    assert restored.fill_value == 7
+    assert np.array_equal(restored.data, array.data)
+    assert np.array_equal(restored.mask, array.mask)
+    # data and mask are views on the shared memory segment
+    assert not restored.data.flags.owndata
+    assert not restored.mask.flags.owndata
+
+    # segment is unlinked after it was attached
+    with pytest.raises(FileNotFoundError):
+        SharedMemory(name=shared.name)
+    with pytest.raises(FileNotFoundError):
+        shared.to_array()
+
+    # array can be modified
+    restored[0, 20, 20] = 5
+    assert restored[0, 20, 20] == 5
+
+
+def test_shared_array_plain():
+    array = np.arange(1000, dtype=np.float64).reshape(10, 100)
+    shared = SharedArray.from_array(array)
+    assert not shared.masked
+    restored = shared.to_array()
+    assert not isinstance(restored, ma.MaskedArray)
+    assert np.array_equal(restored, array)
+
+
+def test_shared_array_nomask_and_non_contiguous():
+    array = ma.masked_array(np.arange(100, dtype=np.uint8).reshape(10, 10))[:, ::2]
+    restored = SharedArray.from_array(array).to_array()
+    assert not restored.mask.any()
+    assert np.array_equal(restored.data, array.data)
+
+
+def test_shared_array_empty():
+    array = ma.masked_array(np.zeros((0, 10), dtype=np.uint8))
+    restored = SharedArray.from_array(array).to_array()
+    assert restored.shape == (0, 10)
+
+
+def test_register_shared_memory_reducers(monkeypatch):
+    # don't change reducers of the test process
+    monkeypatch.setattr(ForkingPickler, "_extra_reducers", {})
+    register_shared_memory_reducers(min_bytes=1024)
+
+    array = _masked_array()
+    dumped = ForkingPickler.dumps(array)
+    # only the handle was pickled
+    assert len(dumped) < 1024
+    restored = ForkingPickler.loads(dumped)
+    assert np.array_equal(restored.data, array.data)
+    assert np.array_equal(restored.mask, array.mask)
+
+    # small arrays are pickled as usual
+    small = np.arange(10)
+    dumped = ForkingPickler.dumps(small)
+    assert len(dumped) > small.nbytes
+    assert np.array_equal(ForkingPickler.loads(dumped), small)
+
+
+def test_register_shared_memory_reducers_disabled(monkeypatch):
+    monkeypatch.setattr(ForkingPickler, "_extra_reducers", {})
+    register_shared_memory_reducers(min_bytes=0)
+    assert not ForkingPickler._extra_reducers
+
+
+def test_register_shared_memory_reducers_no_space(monkeypatch):
+    monkeypatch.setattr(ForkingPickler, "_extra_reducers", {})
+    monkeypatch.setattr(
+        "mapchete.executor.shared_memory._shared_memory_free_bytes", lambda: 1024
+    )
+    register_shared_memory_reducers(min_bytes=1024)
+
+    array = _masked_array()
+    segments = _shared_memory_segments()
+    dumped = ForkingPickler.dumps(array)
+    # array was pickled as usual
+    assert len(dumped) > array.nbytes
+    assert _shared_memory_segments() == segments
+    restored = ForkingPickler.loads(dumped)
+    assert np.array_equal(restored.data, array.data)
+    assert np.array_equal(restored.mask, array.mask)
+
+
+@pytest.mark.parametrize("min_bytes", [0, 1024])
+def test_processes_executor_shared_memory(monkeypatch, min_bytes, items=6):
+    monkeypatch.setattr(mapchete_options, "shared_memory_min_bytes", min_bytes)
+    segments = _shared_memory_segments()
+    with ConcurrentFuturesExecutor(concurrency="processes", max_workers=2) as executor:
+        outputs = [
+            future.result()
+            for future in executor.as_completed(_masked_array, range(items))
+        ]
+    assert sorted(int(output.data.max()) for output in outputs) == list(range(items))
+    for output in outputs:
+        assert output.mask[:, :10, :10].all()
+        assert not output.mask[:, 10:, 10:].any()
+    # all segments were unlinked
+    assert _shared_memory_segments() == segments
+
+
+def _propagated_outputs(config, executor):
+    with mapchete.open(config, mode="overwrite") as mp:
+        return {
+            task_info.tile.id: task_info.output
+            for task_info in mp.execute(executor=executor, propagate_results=True)
+        }
+
+
+def _memory_owner(array):
+    while isinstance(array, np.ndarray) and array.base is not None:
+        array = array.base
+    return array
+
+
+@pytest.mark.parametrize("min_bytes", [0, 1])
+def test_execute_propagate_results_shared_memory(baselevels, monkeypatch, min_bytes):
+    # baselevels of the first run differ as they are built from the tiles written
+    _propagated_outputs(baselevels.dict, SequentialExecutor())
+    control = _propagated_outputs(baselevels.dict, SequentialExecutor())
+
+    monkeypatch.setattr(mapchete_options, "shared_memory_min_bytes", min_bytes)
+    with ConcurrentFuturesExecutor(concurrency="processes", max_workers=2) as executor:
+        outputs = _propagated_outputs(baselevels.dict, executor)
+
+    assert outputs.keys() == control.keys()
+    for tile_id, output in outputs.items():
+        assert isinstance(output, ma.MaskedArray)
+        # output memory is mapped from shared memory
+        assert isinstance(_memory_owner(output.data), mmap.mmap) == bool(min_bytes)
+        assert np.array_equal(output.mask, control[tile_id].mask)
+        assert np.array_equal(output.data, control[tile_id].data)
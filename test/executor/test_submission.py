@@ -0,0 +1,176 @@
+import time
+
+import numpy as np
+import pytest
+
+from mapchete.commands import execute
+from mapchete.enums import Concurrency
+from mapchete.errors import MapcheteTaskFailed
+from mapchete.executor.concurrent_futures import ConcurrentFuturesExecutor
+from mapchete.executor.submission import (
+    SubmissionController,
+    SubmissionStats,
+    result_nbytes,
+    run_chunk,
+)
+from mapchete.executor.types import Result
+
+
+def _cheap(i):
+    return i + 1
+
+
+def _failing(i):
+    if i == 5:
+        raise RuntimeError("failing task")
+    return i
+
+
+def _finish(controller, tasks, duration, nbytes=0):
+    controller.submitted(tasks)
+    for _ in range(tasks):
+        controller.finished(duration, nbytes)
+
+
+def test_controller_initial_window():
+    controller = SubmissionController(workers=4, max_submitted_tasks=100)
+    assert controller.window == 100
+    assert controller.chunksize == 1
+    assert controller.free_slots() == 100
+    controller.submitted(10)
+    assert controller.free_slots(pending=5) == 85
+
+
+def test_controller_cheap_tasks():
+    controller = SubmissionController(workers=4, chunk_duration=0.1)
+    _finish(controller, 10, 0.001)
+    # each chunk should take about chunk_duration
+    assert controller.chunksize == 100
+    assert controller.window == 4 * 3 * 100
+    assert controller.stats.in_flight == 0
+    assert controller.stats.finished == 10
+    assert controller.stats.throughput > 0
+
+
+def test_controller_expensive_tasks():
+    controller = SubmissionController(workers=4, chunk_duration=0.1)
+    _finish(controller, 10, 2.0)
+    assert controller.chunksize == 1
+    assert controller.window == 12
+
+
+def test_controller_large_results():
+    controller = SubmissionController(
+        workers=4, chunk_duration=0.1, max_in_flight_bytes=1000
+    )
+    _finish(controller, 10, 0.001, nbytes=100)
+    assert controller.window == 10
+    assert controller.chunksize == 2
+
+    # keep workers busy even if single results exceed limit
+    _finish(controller, 50, 0.001, nbytes=10_000)
+    assert controller.window == 4
+    assert controller.chunksize == 1
+
+
+def test_controller_fixed_chunksize():
+    controller = SubmissionController(workers=2, chunksize=5, max_submitted_tasks=10)
+    assert controller.window == 50
+    _finish(controller, 10, 0.0001)
+    assert controller.chunksize == 5
+    assert controller.window == 30
+
+
+def test_controller_no_chunking():
+    controller = SubmissionController(workers=2, chunk_duration=0)
+    _finish(controller, 10, 0.0001)
+    assert controller.chunksize == 1
+
+
+def test_run_chunk():
+    results = run_chunk(_cheap, [1, 2, 3])
+    assert [result for result, _ in results] == [2, 3, 4]
+    assert all(duration >= 0 for _, duration in results)
+
+
+def test_result_nbytes():
+    array = np.zeros((10, 10), dtype=np.uint8)
+    assert result_nbytes(Result(output=array)) == 100
+    assert result_nbytes(array) == 100
+
+
+@pytest.mark.parametrize("concurrency", ["threads", "processes"])
+@pytest.mark.parametrize("chunksize", [None, 7])
+def test_as_completed_chunks(concurrency, chunksize, items=500):
+    with ConcurrentFuturesExecutor(concurrency=concurrency, max_workers=2) as executor:
+        results = [
+            future.result()
+            for future in executor.as_completed(
+                _cheap, range(items), max_submitted_tasks=4, chunksize=chunksize
+            )
+        ]
+        assert sorted(results) == list(range(1, items + 1))
+        assert not executor.futures
+        stats = executor.submission_stats
+        assert isinstance(stats, SubmissionStats)
+        assert stats.submitted == stats.finished == items
+        assert stats.in_flight == 0
+        assert stats.chunksize > 1
+
+
+def test_as_completed_chunks_skip(items=50):
+    with ConcurrentFuturesExecutor(concurrency="threads", max_workers=2) as executor:
+        futures = list(
+            executor.as_completed(
+                _cheap,
+                [(i, i % 2 == 0, "skipped") for i in range(items)],
+                item_skip_bool=True,
+            )
+        )
+        assert len([future for future in futures if future.skipped]) == items // 2
+        assert sorted(
+            future.result() for future in futures if not future.skipped
+        ) == list(range(2, items + 1, 2))
+
+
+def test_as_completed_chunks_exception():
+    with ConcurrentFuturesExecutor(concurrency="threads", max_workers=2) as executor:
+        with pytest.raises(MapcheteTaskFailed):
+            for future in executor.as_completed(_failing, range(20), chunksize=4):
+                future.result()
+
+
+def test_as_completed_window_limits_in_flight(items=40):
+    in_flight = []
+
+    def _task(i):
+        time.sleep(0.01)
+        return i
+
+    with ConcurrentFuturesExecutor(concurrency="threads", max_workers=2) as executor:
+        for _ in executor.as_completed(
+            _task, range(items), max_submitted_tasks=4, chunksize=1
+        ):
+            in_flight.append(executor.submission_stats.in_flight)
+    assert max(in_flight) < 4
+    assert executor.submission_stats.window == 4
+
+
+def test_execute_submission_stats(cleantopo_br_metatiling_1):
+    class StatsObserver:
+        stats = []
+
+        def update(self, *args, submission_stats=None, **kwargs):
+            if submission_stats:
+                self.stats.append(submission_stats)
+
+    observer = StatsObserver()
+    execute(
+        cleantopo_br_metatiling_1.dict,
+        zoom=5,
+        concurrency=Concurrency.threads,
+        workers=2,
+        observers=[observer],
+    )
+    assert observer.stats
+    assert observer.stats[-1].finished
@@ -2,11 +2,12 @@ import pytest
 from fiona.crs import CRS  # type: ignore
 from pytest_lazyfixture import lazy_fixture
 from shapely import wkt
-from shapely.geometry import Point, Polygon, box
+from shapely.errors import TopologicalError
+from shapely.geometry import LinearRing, Point, Polygon, box
 
 from mapchete.errors import ReprojectionFailed
-from mapchete.geometry import reproject_geometry
-from mapchete.geometry.reproject import get_crs_bounds
+from mapchete.geometry import reproject_geometries, reproject_geometry
+from mapchete.geometry.reproject import get_crs_bounds, get_transformer
 from mapchete.tile import BufferedTilePyramid
 
 
@@ -237,3 +238,82 @@ def test_get_crs_bounds_custom():
                 "+proj=ortho +lat_0=90 +lon_0=0 +x_0=0 +y_0=0 +ellps=WGS84 +units=m +no_defs"
             )
         )
+
+
+@pytest.mark.parametrize("clip_to_crs_bounds", [True, False])
+@pytest.mark.parametrize(
+    "dst_crs",
+    [
+        CRS.from_epsg(3857),
+        CRS.from_epsg(3035),
+        CRS.from_epsg(4326),
+        CRS.from_string(
+            "+proj=ortho +lat_0=90 +lon_0=0 +x_0=0 +y_0=0 +ellps=WGS84 +units=m +no_defs"
+        ),
+    ],
+)
+def test_reproject_geometries(
+    point,
+    multipoint,
+    linestring,
+    multilinestring,
+    polygon,
+    multipolygon,
+    geometrycollection,
+    dst_crs,
+    clip_to_crs_bounds,
+):
+    geometries = [
+        point,
+        multipoint,
+        linestring,
+        multilinestring,
+        polygon,
+        multipolygon,
+        geometrycollection,
+        Polygon(),
+        # partly outside of CRS bounds
+        box(-180, -90, 180, 90),
+    ]
+    src_crs = CRS.from_epsg(4326)
+    out_geoms = reproject_geometries(
+        geometries,
+        src_crs=src_crs,
+        dst_crs=dst_crs,
+        clip_to_crs_bounds=clip_to_crs_bounds,
+    )
+    assert len(out_geoms) == len(geometries)
+    for geometry, out_geom in zip(geometries, out_geoms):
+        try:
+            expected = reproject_geometry(
+                geometry,
+                src_crs=src_crs,
+                dst_crs=dst_crs,
+                clip_to_crs_bounds=clip_to_crs_bounds,
+            )
+        except ReprojectionFailed:
+            continue
+        assert out_geom.equals(expected)
+
+
+def test_reproject_geometries_empty_input():
+    assert len(reproject_geometries([], "EPSG:4326", "EPSG:3857")) == 0
+
+
+def test_reproject_geometries_skip_invalid():
+    # self-intersecting line strings cannot be repaired
+    invalid = LinearRing([(0, 0), (1, 1), (1, 0), (0, 1)])
+    with pytest.raises(TopologicalError):
+        reproject_geometries([invalid], "EPSG:4326", "EPSG:3857")
+    assert (
+        reproject_geometries(
+            [invalid, Point(1, 1)], "EPSG:4326", "EPSG:3857", skip_invalid=True
+        )[0]
+        is None
+    )
+
+
+def test_get_transformer_cache():
+    assert get_transformer(CRS.from_epsg(4326), CRS.from_epsg(3857)) is get_transformer(
+        CRS.from_epsg(4326), CRS.from_epsg(3857)
+    )
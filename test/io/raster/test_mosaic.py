@@ -1,5 +1,8 @@
+import tracemalloc
 from itertools import product
+
 import numpy as np
+import numpy.ma as ma
 import pytest
 from shapely import box, unary_union
 
@@ -171,3 +174,81 @@ def test_create_mosaic_antimeridian():
         tp.tile(*tiles_ids[0]).top,
     )
     assert mosaic.bounds == control_bounds
+
+
+@pytest.mark.parametrize("pixelbuffer", [0, 10])
+def test_create_mosaic_masked(pixelbuffer):
+    """Masked pixels neither overwrite existing pixels nor get unmasked."""
+    tp = BufferedTilePyramid("geodetic", pixelbuffer=pixelbuffer)
+    tiles = [tp.tile(5, row, col) for row, col in product(range(2), range(2))]
+    tiles_arrays = []
+    for value, tile in enumerate(tiles, 1):
+        data = ma.masked_array(
+            np.full(tile.shape, value, dtype="uint8"),
+            mask=np.zeros(tile.shape, dtype=bool),
+        )
+        # mask left half of each tile
+        data.mask[:, : tile.width // 2] = True
+        tiles_arrays.append((tile, data))
+    # fully valid tile is put on top
+    tiles_arrays.append((tiles[0], np.full(tiles[0].shape, 9, dtype="uint8")))
+
+    mosaic = create_mosaic(tiles_arrays)
+    assert mosaic.data.mask.dtype == bool
+    height, width = tiles[0].shape
+    half = width // 2
+    # first tile is covered by fully valid tile
+    assert not mosaic.data.mask[0, :height, :width].any()
+    assert (mosaic.data[0, :height, :width] == 9).all()
+    # last tile only has valid pixels in its right half
+    top, left = height - 2 * pixelbuffer, width - 2 * pixelbuffer
+    assert (mosaic.data[0, top:, left + half :] == 4).all()
+    # pixels masked in all tiles stay masked
+    assert mosaic.data.mask[0, height:, width : left + half].all()
+
+
+@pytest.mark.parametrize("pixelbuffer", [0, 10])
+def test_create_mosaic_masked_nodata(pixelbuffer, monkeypatch):
+    """Values below the mask of input tiles are not carried into the mosaic."""
+    # don't rely on masked values being filled when preparing the arrays
+    monkeypatch.setattr(
+        "mapchete.io.raster.mosaic.prepare_array", lambda data, **_: data
+    )
+    tp = BufferedTilePyramid("geodetic", pixelbuffer=pixelbuffer)
+    tiles_arrays = []
+    for tile in [tp.tile(5, 0, col) for col in range(2)]:
+        data = ma.masked_array(np.full(tile.shape, 200, dtype="uint8"), mask=True)
+        data.mask[:, tile.width // 2 :] = False
+        data.data[:, tile.width // 2 :] = 1
+        tiles_arrays.append((tile, data))
+
+    mosaic = create_mosaic(tiles_arrays, nodata=0)
+    assert (mosaic.data.data[mosaic.data.mask] == 0).all()
+    assert (mosaic.data.data[~mosaic.data.mask] == 1).all()
+
+
+def test_create_mosaic_memory():
+    """Mosaicking metatiled overview children does not copy the full array."""
+    tp = BufferedTilePyramid("geodetic", metatiling=4, pixelbuffer=16)
+    tiles = [tp.tile(8, row, col) for row, col in product((10, 11), (20, 21))]
+    tiles_arrays = []
+    for tile in tiles:
+        data = ma.masked_array(
+            np.ones(tile.shape, dtype="uint16"),
+            mask=np.zeros(tile.shape, dtype=bool),
+        )
+        data.mask[:, :100] = True
+        tiles_arrays.append((tile, data))
+    tile_nbytes = tiles_arrays[0][1].data.nbytes + tiles_arrays[0][1].mask.nbytes
+
+    tracemalloc.start()
+    try:
+        mosaic = create_mosaic(tiles_arrays)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    mosaic_nbytes = mosaic.data.data.nbytes + mosaic.data.mask.nbytes
+    assert mosaic.data.mask.dtype == bool
+    # output array plus a few temporary arrays of tile size
+    assert peak < mosaic_nbytes + 3 * tile_nbytes
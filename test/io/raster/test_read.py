@@ -7,10 +7,12 @@ import numpy.ma as ma
 import pytest
 from pytest_lazyfixture import lazy_fixture
 from rasterio.enums import Compression
+from rasterio.transform import from_bounds
 from shapely import MultiPoint, box, convex_hull
 
 import mapchete
 from mapchete.errors import MapcheteIOError
+from mapchete.grid import Grid
 from mapchete.io.raster.array import resample_from_array
 from mapchete.io.raster.mosaic import create_mosaic
 from mapchete.io.raster.open import rasterio_open
@@ -530,3 +532,70 @@ def test_read_raster_tile_remote(path):
 )
 def test_read_raster_tile_integration(path):
     test_read_raster_tile(path)
+
+
+def _write_constant_raster(path, bounds, value, shape=(10, 10)):
+    left, bottom, right, top = bounds
+    with rasterio_open(
+        path,
+        "w",
+        driver="GTiff",
+        count=1,
+        dtype="uint8",
+        nodata=0,
+        crs="EPSG:4326",
+        width=shape[1],
+        height=shape[0],
+        transform=from_bounds(left, bottom, right, top, shape[1], shape[0]),
+    ) as dst:
+        dst.write(np.full((1, *shape), value, dtype="uint8"))
+    return path
+
+
+@pytest.mark.parametrize("read_workers", [1, 4])
+@pytest.mark.parametrize(
+    "merge_method,expected",
+    [("first", 1), ("last", 3), ("mean", 2), ("min", 1), ("max", 3)],
+)
+def test_read_raster_window_merge_method(
+    mp_tmpdir, merge_method, expected, read_workers
+):
+    grid = Grid.from_bounds(bounds=(0, 0, 4, 1), shape=(10, 40), crs="EPSG:4326")
+    paths = [
+        _write_constant_raster(mp_tmpdir / "left.tif", (0, 0, 2, 1), 1),
+        _write_constant_raster(mp_tmpdir / "middle.tif", (1, 0, 3, 1), 3),
+        # does not intersect with grid
+        _write_constant_raster(mp_tmpdir / "outside.tif", (10, 10, 11, 11), 5),
+    ]
+    arr = read_raster_window(
+        paths,
+        grid,
+        indexes=1,
+        merge_method=merge_method,
+        read_workers=read_workers,
+    )
+    assert arr.shape == (10, 40)
+    assert (arr[:, :10] == 1).all()
+    assert (arr[:, 10:20] == expected).all()
+    assert (arr[:, 20:30] == 3).all()
+    assert arr.mask[:, 30:].all()
+    assert not arr.mask[:, :30].any()
+
+
+@pytest.mark.parametrize("read_workers", [1, 2])
+def test_read_raster_window_merge_stop_early(mp_tmpdir, read_workers):
+    grid = Grid.from_bounds(bounds=(0, 0, 1, 1), shape=(10, 10), crs="EPSG:4326")
+    paths = [
+        _write_constant_raster(mp_tmpdir / "full.tif", (0, 0, 1, 1), 1),
+        mp_tmpdir / "missing.tif",
+    ]
+    # second file is not opened because output is covered by first file
+    arr = read_raster_window(
+        paths, grid, indexes=[1], merge_method="first", read_workers=read_workers
+    )
+    assert arr.shape == (1, 10, 10)
+    assert (arr == 1).all()
+    with pytest.raises(FileNotFoundError):
+        read_raster_window(
+            paths, grid, indexes=[1], merge_method="mean", read_workers=read_workers
+        )
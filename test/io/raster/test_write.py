@@ -1,11 +1,17 @@
 import numpy as np
 import numpy.ma as ma
 import pytest
+from affine import Affine
 from pytest_lazyfixture import lazy_fixture
+from rasterio.windows import Window
 
 from mapchete.io.profiles import COGDeflateProfile
 from mapchete.io.raster.open import rasterio_open
-from mapchete.io.raster.write import rasterio_write, write_raster_window
+from mapchete.io.raster.write import (
+    RasterioStreamingWriter,
+    rasterio_write,
+    write_raster_window,
+)
 from mapchete.path import path_exists
 from mapchete.tile import BufferedTilePyramid
 
@@ -121,3 +127,45 @@ def test_rasterio_write_remote_exception(mp_s3_tmpdir, in_memory):
             **COGDeflateProfile(dtype="uint8"),
         ):
             raise ValueError()
+
+
+@pytest.mark.parametrize("driver", ["GTiff", "COG"])
+def test_rasterio_streaming_writer(mp_tmpdir, driver):
+    profile = dict(
+        COGDeflateProfile(),
+        driver=driver,
+        count=1,
+        dtype="uint8",
+        crs="EPSG:4326",
+        width=1000,
+        height=600,
+        transform=Affine(0.1, 0, 0, 0, -0.1, 60),
+        blocksize=256,
+    )
+    path = mp_tmpdir / "streamed.tif"
+    data = np.arange(600 * 1000, dtype="uint8").reshape(1, 600, 1000)
+    with RasterioStreamingWriter(
+        path, overviews_levels=[2, 4, 8], tempdir=mp_tmpdir, **profile
+    ) as dst:
+        # write in unaligned windows in arbitrary order
+        for row_off, col_off in [(300, 500), (0, 0), (300, 0), (0, 500)]:
+            window = Window(col_off, row_off, 500, 300)
+            dst.write(
+                data[:, row_off : row_off + 300, col_off : col_off + 500],
+                window=window,
+            )
+        assert dst.read(window=Window(0, 0, 10, 10)).any()
+    with rasterio_open(path) as src:
+        assert src.driver == "GTiff"
+        assert src.overviews(1) == [2, 4, 8]
+        assert np.array_equal(src.read(), data)
+        # overviews match decimated data, nearest resampling picks the last pixel of
+        # each 2x2 block on every level
+        assert np.array_equal(src.read(out_shape=(1, 75, 125))[0], data[0, 7::8, 7::8])
+    # only target file remains
+    assert [p.name for p in mp_tmpdir.ls()] == ["streamed.tif"]
+
+
+def test_rasterio_streaming_writer_errors(mp_tmpdir):
+    with pytest.raises(ValueError):
+        RasterioStreamingWriter(mp_tmpdir / "streamed.tif", overviews_levels=[2, 3])
@@ -0,0 +1,97 @@
+import os
+
+import pytest
+from shapely import unary_union
+
+from mapchete.geometry import to_shape
+from mapchete.io.vector import read_vector_window
+from mapchete.io.vector.cache import VectorWindowCache, row_window, vector_window_cache
+from mapchete.path import MPath
+from mapchete.settings import mapchete_options
+from mapchete.tile import BufferedTilePyramid
+
+
+@pytest.mark.parametrize("grid", ["geodetic", "mercator"])
+def test_vector_window_cache_read(landpoly, grid):
+    tp = BufferedTilePyramid(grid)
+    cache = VectorWindowCache()
+    tiles = list(tp.tiles_from_bounds(bounds=tp.bounds, zoom=3))
+    for tile in tiles:
+        window = row_window(tile.bounds, tp.bounds)
+        cached = cache.read(landpoly, tile, window=window)
+        uncached = read_vector_window(landpoly, tile)
+        if uncached:
+            cached_geom = unary_union([to_shape(f) for f in cached])
+            uncached_geom = unary_union([to_shape(f) for f in uncached])
+            assert cached_geom.symmetric_difference(
+                uncached_geom
+            ).area == pytest.approx(0, abs=uncached_geom.area * 1e-3)
+            assert {tuple(f["properties"].items()) for f in cached} == {
+                tuple(f["properties"].items()) for f in uncached
+            }
+        else:
+            assert not cached
+
+    # only the first tile of each row had to read the file
+    assert cache.stats.misses == tp.matrix_height(3)
+    assert cache.stats.hits == len(tiles) - tp.matrix_height(3)
+
+
+def test_vector_window_cache_size(landpoly):
+    tp = BufferedTilePyramid("geodetic")
+    cache = VectorWindowCache(maxsize=1)
+    for tile in tp.tiles_from_bounds(bounds=tp.bounds, zoom=2):
+        cache.read(landpoly, tile, window=row_window(tile.bounds, tp.bounds))
+    assert len(cache) <= 1
+    cache.clear()
+    assert len(cache) == 0
+
+
+def test_row_window():
+    assert row_window((0, 0, 1, 1), (-10, -10, 10, 10)) == (-10, 0, 10, 1)
+    # window always contains grid
+    assert row_window((0, 0, 1, 1), (5, 5, 10, 10)) == (0, 0, 10, 1)
+
+
+def test_vector_window_cache_setting(monkeypatch):
+    monkeypatch.setattr(mapchete_options, "vector_read_cache_size", 0)
+    assert vector_window_cache() is None
+    monkeypatch.setattr(mapchete_options, "vector_read_cache_size", 1000)
+    assert isinstance(vector_window_cache(), VectorWindowCache)
+    assert vector_window_cache() is vector_window_cache()
+
+
+def test_vector_window_cache_modified_file(landpoly, mp_tmpdir):
+    path = mp_tmpdir / "landpoly.geojson"
+    landpoly.cp(path)
+    tp = BufferedTilePyramid("geodetic")
+    tile = tp.tile(2, 0, 0)
+    window = row_window(tile.bounds, tp.bounds)
+    cache = VectorWindowCache()
+    cache.read(MPath(path), tile, window=window)
+    cache.read(MPath(path), tile, window=window)
+    assert cache.stats.misses == 1
+
+    # file was modified, e.g. between two runs using the same worker
+    mtime = os.path.getmtime(str(path)) + 10
+    os.utime(str(path), (mtime, mtime))
+    cache.read(MPath(path), tile, window=window)
+    assert cache.stats.misses == 2
+
+
+def test_vector_window_cache_file_version(landpoly, monkeypatch):
+    tp = BufferedTilePyramid("geodetic")
+    tile = tp.tile(2, 0, 0)
+    window = row_window(tile.bounds, tp.bounds)
+    cache = VectorWindowCache()
+
+    # a given file version is not looked up again
+    def _path_version(path):  # pragma: no cover
+        raise AssertionError("file version looked up")
+
+    monkeypatch.setattr("mapchete.io.vector.cache.path_version", _path_version)
+    cache.read(landpoly, tile, window=window, file_version="1")
+    cache.read(landpoly, tile, window=window, file_version="1")
+    assert cache.stats.misses == 1
+    cache.read(landpoly, tile, window=window, file_version="2")
+    assert cache.stats.misses == 2
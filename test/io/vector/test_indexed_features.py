@@ -1,15 +1,18 @@
+import pickle
+
 import pytest
 from rasterio.crs import CRS
 from shapely.geometry import mapping, box
 
 from mapchete.errors import NoCRSError, NoGeoError
 from mapchete.geometry.reproject import reproject_geometry
-from mapchete.io.vector import fiona_open, IndexedFeatures
+from mapchete.io.vector import fiona_open, IndexedFeatures, STRtreeFeatures
 from mapchete.io.vector.indexed_features import (
     object_bounds,
     object_crs,
     object_geometry,
     read_union_geometry,
+    read_vector,
 )
 from mapchete.tile import BufferedTilePyramid
 
@@ -127,6 +130,92 @@ def test_indexed_features_read_union_geometry(aoi_br_geojson):
     ).is_empty
 
 
+def test_strtree_features(landpoly):
+    with fiona_open(str(landpoly)) as src:
+        some_id = next(iter(src))["id"]
+        features = STRtreeFeatures(src)
+        assert features.crs == src.crs
+        assert len(features) == len(src)
+
+    assert features[some_id]["id"] == some_id
+    with pytest.raises(KeyError):
+        features[-999]
+
+    assert len(list(features.items())) == len(features)
+    assert len(list(features.keys())) == len(features)
+
+    for f in features:
+        assert "properties" in f
+        assert "geometry" in f
+
+
+def test_strtree_features_filter(landpoly):
+    with fiona_open(str(landpoly)) as src:
+        features = list(src)
+        bounds = src.bounds
+    rtree_idx = IndexedFeatures(features)
+    strtree_idx = STRtreeFeatures(features)
+    assert strtree_idx.bounds == bounds
+    assert len(strtree_idx.filter()) == len(features)
+    tp = BufferedTilePyramid("geodetic")
+    tiles = list(tp.tiles_from_bounds(bounds=bounds, zoom=3))
+    for tile, tile_features in zip(
+        tiles, strtree_idx.filter_many([tile.bounds for tile in tiles])
+    ):
+        expected = sorted(f["id"] for f in rtree_idx.filter(tile.bounds))
+        assert sorted(f["id"] for f in strtree_idx.filter(tile.bounds)) == expected
+        assert sorted(f["id"] for f in tile_features) == expected
+        assert sorted(f["id"] for f in strtree_idx.subset(tile.bounds)) == expected
+    assert len(strtree_idx.filter(target_geometry_type="Point")) == 0
+
+
+def test_strtree_features_properties():
+    features = STRtreeFeatures(
+        [
+            {"id": 0, "properties": {"a": 1}, "geometry": box(0, 0, 1, 1)},
+            {"id": 1, "properties": {"b": [1, 2]}, "geometry": box(2, 2, 3, 3)},
+        ]
+    )
+    assert features[0]["properties"] == {"a": 1, "b": None}
+    assert features[1]["properties"] == {"a": None, "b": [1, 2]}
+    assert [f["id"] for f in features.filter((0.5, 0.5, 1.5, 1.5))] == [0]
+
+
+def test_strtree_features_non_geo_objects():
+    features = STRtreeFeatures(
+        [
+            {"id": 0, "geometry": box(0, 0, 1, 1)},
+            {"id": 1, "properties": {"foo": "bar"}},
+        ],
+        allow_non_geo_objects=True,
+    )
+    assert features.bounds == (0, 0, 1, 1)
+    assert [f["id"] for f in features.filter((5, 5, 6, 6))] == [1]
+    with pytest.raises(NoGeoError):
+        STRtreeFeatures([{"id": 1, "properties": {"foo": "bar"}}])
+
+
+def test_strtree_features_pickle(aoi_br_geojson):
+    features = STRtreeFeatures.from_file(aoi_br_geojson)
+    features.filter(features.bounds)
+    unpickled = pickle.loads(pickle.dumps(features))
+    assert len(unpickled.filter(features.bounds)) == len(features)
+
+
+def test_strtree_features_read_union_geometry(aoi_br_geojson):
+    rtree_idx = IndexedFeatures.from_file(aoi_br_geojson)
+    strtree_idx = read_vector(aoi_br_geojson, index="strtree")
+    assert isinstance(strtree_idx, STRtreeFeatures)
+    assert strtree_idx.read_union_geometry().equals(rtree_idx.read_union_geometry())
+
+    tp = BufferedTilePyramid("geodetic")
+    tile = next(tp.tiles_from_bounds(bounds=strtree_idx.bounds, zoom=5))
+    assert strtree_idx.read_union_geometry(bounds=tile.bounds, clip=True).is_empty
+    assert not strtree_idx.read_union_geometry(
+        bounds=(-180, -90, 180, 90), clip=True
+    ).is_empty
+
+
 def test_read_union_geometry(aoi_br_geojson):
     assert read_union_geometry(aoi_br_geojson).is_valid
 
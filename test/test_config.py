@@ -15,10 +15,11 @@ import mapchete
 from mapchete.config import MapcheteConfig, ProcessConfig, snap_bounds
 from mapchete.config.models import DaskAdaptOptions, DaskSpecs
 from mapchete.config.parse import bounds_from_opts, guess_geometry
-from mapchete.config.process_func import ProcessFunc
+from mapchete.config.process_func import ProcessFunc, _loaded_modules
 from mapchete.errors import GeometryTypeError, MapcheteConfigError
 from mapchete.io import fiona_open, rasterio_open
 from mapchete.path import MPath
+from mapchete.settings import mapchete_options
 from mapchete.bounds import Bounds
 
 SCRIPT_DIR = MPath(os.path.dirname(os.path.realpath(__file__)))
@@ -636,6 +637,23 @@ def test_process_pickle(process_src, example_custom_process_mapchete):
     assert reloaded(mp) is not None
 
 
+def test_process_file_reloaded(mp_tmpdir):
+    process_file = mp_tmpdir / "reloaded_process.py"
+    with process_file.open("w") as dst:
+        dst.write("def execute(mp):\n    return 1\n")
+    assert ProcessFunc(str(process_file))(None) == 1
+
+    # modified file is loaded again and replaces the previous module
+    with process_file.open("w") as dst:
+        dst.write("def execute(mp):\n    return 2\n")
+    mtime = os.path.getmtime(str(process_file)) + 10
+    os.utime(str(process_file), (mtime, mtime))
+    assert ProcessFunc(str(process_file))(None) == 2
+    assert [path for path in _loaded_modules if "reloaded_process" in path] == [
+        str(process_file)
+    ]
+
+
 def test_dask_specs(dask_specs):
     with dask_specs.mp() as mp:
         assert isinstance(mp.config.parsed_config.dask_specs, DaskSpecs)
@@ -673,3 +691,18 @@ def test_input_union_special_case():
     # the small gap _is_ the output which obviously is wrong
     config_area_at_zoom = init_area.intersection(input_union)
     assert config_area_at_zoom.area == pytest.approx(init_area.area)
+
+
+def test_area_mask_at_zoom(files_bounds, monkeypatch):
+    config = MapcheteConfig(files_bounds.dict)
+    mask = config.area_mask_at_zoom(10)
+    assert set(mask.tiles()) == set(
+        config.process_pyramid.tiles_from_geom(config.area_at_zoom(10), 10, exact=True)
+    )
+    # cached
+    assert config.area_mask_at_zoom(10) is mask
+
+    # masks exceeding the maximum size are not created
+    monkeypatch.setattr(mapchete_options, "area_mask_max_cells", 1)
+    config = MapcheteConfig(files_bounds.dict)
+    assert config.area_mask_at_zoom(10) is None
@@ -0,0 +1,108 @@
+import numpy as np
+import pytest
+
+import mapchete
+from mapchete.commands import rm
+from mapchete.formats.existence_index import (
+    TileExistenceIndex,
+    existence_index_path,
+)
+from mapchete.settings import mapchete_options
+
+
+def _written_output_tiles(output_path, output_pyramid, zoom):
+    written_output_tiles = set()
+    for rowdir in (output_path / zoom).ls():
+        for file in rowdir.ls():
+            zoom, row, col = map(int, file.without_suffix().elements[-3:])
+            written_output_tiles.add(output_pyramid.tile(zoom, row, col))
+    return written_output_tiles
+
+
+def test_existence_index_rebuild(cleantopo_br):
+    zoom = 5
+    with mapchete.open(cleantopo_br.dict) as mp:
+        list(mp.execute(zoom=zoom))
+        output_pyramid = mp.config.output_pyramid
+
+    written = _written_output_tiles(cleantopo_br.output_path, output_pyramid, zoom)
+    assert written
+
+    index = TileExistenceIndex(cleantopo_br.output_path, output_pyramid)
+    assert not index.exists(zoom)
+    tile_ids = index.rebuild(zoom)
+    assert set(tile_ids.tolist()) == set(index.tile_id(tile) for tile in written)
+    assert existence_index_path(cleantopo_br.output_path, zoom).exists()
+
+    # a new instance reads the stored index
+    assert np.array_equal(
+        TileExistenceIndex(cleantopo_br.output_path, output_pyramid).read(zoom),
+        tile_ids,
+    )
+
+
+def test_existence_index_skip_tiles(cleantopo_br, monkeypatch):
+    monkeypatch.setattr(mapchete_options, "tiles_exist_index", True)
+    zoom = 5
+    with mapchete.open(cleantopo_br.dict) as mp:
+        process_tiles = list(mp.get_process_tiles(zoom))
+        # nothing written yet, so nothing to skip
+        assert not any(skip for _, skip in mp.skip_tiles(tiles=process_tiles))
+        written_process_tiles = set(
+            task_info.tile for task_info in mp.execute(zoom=zoom) if task_info.written
+        )
+    assert written_process_tiles
+
+    # index was updated after processing
+    assert existence_index_path(cleantopo_br.output_path, zoom).exists()
+
+    with mapchete.open(cleantopo_br.dict) as mp:
+        skipped = set(tile for tile, skip in mp.skip_tiles(tiles=process_tiles) if skip)
+        assert skipped == written_process_tiles
+        # no tasks left to process
+        assert not len(mp.tasks(zoom=zoom))
+
+
+def test_existence_index_update_like_rebuild(cleantopo_br, monkeypatch):
+    monkeypatch.setattr(mapchete_options, "tiles_exist_index", True)
+    zoom = 5
+    # process tiles contain empty output tiles
+    config = dict(
+        cleantopo_br.dict, output=dict(cleantopo_br.dict["output"], metatiling=1)
+    )
+    with mapchete.open(config) as mp:
+        list(mp.execute(zoom=zoom))
+        output_pyramid = mp.config.output_pyramid
+    updated = TileExistenceIndex(cleantopo_br.output_path, output_pyramid).read(zoom)
+
+    # empty output tiles of written process tiles are not registered
+    written = _written_output_tiles(cleantopo_br.output_path, output_pyramid, zoom)
+    assert len(updated) == len(written)
+    assert np.array_equal(
+        updated,
+        TileExistenceIndex(cleantopo_br.output_path, output_pyramid).rebuild(zoom),
+    )
+
+
+def test_existence_index_only_updated_if_existing(cleantopo_br, monkeypatch):
+    def _read(*args, **kwargs):  # pragma: no cover
+        raise AssertionError("existence index should not be read")
+
+    monkeypatch.setattr(TileExistenceIndex, "read", _read)
+    zoom = 5
+    with mapchete.open(cleantopo_br.dict) as mp:
+        list(mp.execute(zoom=zoom))
+    assert not existence_index_path(cleantopo_br.output_path, zoom).exists()
+
+
+@pytest.mark.parametrize("from_mapchete_file", [False, True])
+def test_existence_index_invalidated_by_rm(cleantopo_br, from_mapchete_file):
+    zoom = 5
+    with mapchete.open(cleantopo_br.dict) as mp:
+        list(mp.execute(zoom=zoom))
+        index = TileExistenceIndex(cleantopo_br.output_path, mp.config.output_pyramid)
+    index.rebuild(zoom)
+    assert existence_index_path(cleantopo_br.output_path, zoom).exists()
+
+    rm(cleantopo_br.path if from_mapchete_file else cleantopo_br.output_path, zoom=zoom)
+    assert not existence_index_path(cleantopo_br.output_path, zoom).exists()
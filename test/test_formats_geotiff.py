@@ -493,3 +493,63 @@ def test_output_single_gtiff_cog_s3(output_single_gtiff_cog_s3):
     assert path_exists(mp.config.output.path)
     with mp.config.output.path.rio_env() as env:
         assert cog_validate(mp.config.output.path, strict=True, config=env.__dict__)
+
+
+@pytest.mark.skipif(
+    not GDAL_COG_AVAILABLE, reason="GDAL>=3.1 with COG driver is required"
+)
+def test_output_single_gtiff_cog_streaming(output_single_gtiff_cog, mp_tmpdir):
+    tempdir = mp_tmpdir / "streaming"
+    tempdir.makedirs()
+    with mapchete.open(
+        dict(
+            output_single_gtiff_cog.dict,
+            output=dict(
+                output_single_gtiff_cog.dict["output"],
+                streaming=True,
+                tempdir=str(tempdir),
+                overviews_resampling="bilinear",
+            ),
+        )
+    ) as mp:
+        process_tile = mp.config.process_pyramid.tile(5, 3, 7)
+        assert not mp.config.output.tiles_exist(process_tile)
+        list(mp.execute(workers=2))
+        # read from streamed data before file is assembled
+        assert mp.config.output.tiles_exist(process_tile)
+        assert not mp.config.output.read(process_tile)[0].mask.all()
+    assert cog_validate(mp.config.output.path, strict=True)
+    # temporary files are removed
+    assert not list(tempdir.ls())
+    with rasterio_open(mp.config.output.path) as src:
+        assert src.overviews(1)
+        assert src.tags().get("OVR_RESAMPLING_ALG").lower() == "bilinear"
+        for o in [1, 2, 4, 8]:
+            a = src.read(
+                masked=True, out_shape=(1, int(src.height / o), int(src.width / o))
+            )
+            assert not a.mask.all()
+
+
+def test_output_single_gtiff_streaming(output_single_gtiff):
+    output_params = dict(
+        output_single_gtiff.dict["output"], streaming=True, overviews=True
+    )
+    with mapchete.open(dict(output_single_gtiff.dict, output=output_params)) as mp:
+        list(mp.execute(tile=(5, 3, 7)))
+    with rasterio_open(mp.config.output.path) as src:
+        streamed = src.read(masked=True)
+        assert src.overviews(1)
+
+    # same data as without streaming
+    with mapchete.open(
+        dict(
+            output_single_gtiff.dict,
+            output=dict(output_params, streaming=False),
+        ),
+        mode="overwrite",
+    ) as mp:
+        list(mp.execute(tile=(5, 3, 7)))
+    with rasterio_open(mp.config.output.path) as src:
+        assert np.array_equal(streamed, src.read(masked=True))
+        assert src.overviews(1)
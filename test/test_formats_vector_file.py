@@ -1,8 +1,11 @@
 from typing import Union
 
 import pytest
+from shapely import unary_union
 
 from mapchete import VectorInput
+from mapchete.geometry import to_shape
+from mapchete.settings import mapchete_options
 from mapchete.testing import ProcessFixture
 
 
@@ -113,3 +116,36 @@ def test_read_as_raster_mask_invert_empty(flatgeobuf: ProcessFixture, invert: bo
     vector_input: VectorInput = flatgeobuf.process_mp(tile=(4, 0, 0)).open("file1")  # type: ignore
     mask = vector_input.read_as_raster_mask(invert=invert)
     assert (mask.all()) == invert
+
+
+def test_read_vector_window_cache(flatgeobuf: ProcessFixture, monkeypatch):
+    vector_input: VectorInput = flatgeobuf.process_mp().open("file1")  # type: ignore
+    features = vector_input.read()
+    monkeypatch.setattr(mapchete_options, "vector_read_cache_size", 100_000)
+    vector_input: VectorInput = flatgeobuf.process_mp().open("file1")  # type: ignore
+    cached = vector_input.read()
+    assert len(cached) == len(features)
+    assert unary_union([to_shape(f) for f in cached]).symmetric_difference(
+        unary_union([to_shape(f) for f in features])
+    ).area == pytest.approx(0)
+
+
+def test_read_vector_window_cache_file_version(flatgeobuf: ProcessFixture, monkeypatch):
+    monkeypatch.setattr(mapchete_options, "vector_read_cache_size", 100_000)
+    lookups = []
+
+    def _path_version(path):
+        lookups.append(path)
+        return "version"
+
+    monkeypatch.setattr(
+        "mapchete.formats.default.vector_file.path_version", _path_version
+    )
+    monkeypatch.setattr("mapchete.io.vector.cache.path_version", _path_version)
+    mp = flatgeobuf.mp()
+    for tile in mp.config.process_pyramid.tiles_from_bounds(mp.config.bounds, 4):
+        vector_input = mp.config.get_inputs_for_tile(tile)["file1"]
+        assert vector_input.file_version == "version"
+        vector_input.read()
+    # file version was determined once for all tiles
+    assert len(lookups) == 1
@@ -1,4 +1,6 @@
 import os
+import time
+from types import SimpleNamespace
 
 import numpy as np
 import pytest
@@ -203,3 +205,142 @@ def test_vrt_mercator(cleantopo_br_mercator):
                 vrt=True,
             )
         )
+
+
+def test_incremental(cleantopo_br, mp_tmpdir):
+    zoom = 8
+    config = dict(cleantopo_br.dict, zoom_levels=dict(min=0, max=zoom))
+    out_dir = cleantopo_br.output_path
+
+    def gen_indexes():
+        with mapchete.open(config, mode="readonly") as mp:
+            return list(
+                zoom_index_gen(
+                    mp=mp,
+                    zoom=zoom,
+                    out_dir=out_dir,
+                    geojson=True,
+                    txt=True,
+                    vrt=True,
+                    incremental=True,
+                )
+            )
+
+    def index_entries():
+        with fiona_open(out_dir / f"{zoom}.geojson") as src:
+            geojson_entries = len(src)
+        with (out_dir / f"{zoom}.txt").open() as src:
+            txt_entries = len(src.readlines())
+        return geojson_entries, txt_entries
+
+    # write output but keep back one tile
+    with mapchete.open(config) as mp:
+        list(mp.execute(zoom=zoom))
+    tiles = [path for page in (out_dir / zoom).paginate() for path in page]
+    assert len(tiles) > 1
+    kept_back = mp_tmpdir / "kept_back.tif"
+    with tiles[0].open("rb") as src:
+        with kept_back.open("wb") as dst:
+            dst.write(src.read())
+    tiles[0].rm()
+
+    # first incremental run checks all tiles and writes watermark
+    indexed = gen_indexes()
+    assert len(indexed) >= len(tiles) - 1
+    assert (out_dir / f"{zoom}.watermark.json").exists()
+    assert index_entries() == (len(tiles) - 1, len(tiles) - 1)
+
+    # nothing was written in the meantime
+    assert not gen_indexes()
+    assert index_entries() == (len(tiles) - 1, len(tiles) - 1)
+
+    # write tile again
+    with kept_back.open("rb") as src:
+        with tiles[0].open("wb") as dst:
+            dst.write(src.read())
+
+    # only new tile is added
+    assert len(gen_indexes()) == 1
+    assert index_entries() == (len(tiles), len(tiles))
+    with rasterio_open(out_dir / f"{zoom}.vrt") as vrt:
+        assert vrt.read().any()
+
+
+def test_incremental_clock_ahead(cleantopo_br, mp_tmpdir, monkeypatch):
+    zoom = 8
+    config = dict(cleantopo_br.dict, zoom_levels=dict(min=0, max=zoom))
+    out_dir = cleantopo_br.output_path
+
+    def gen_indexes():
+        with mapchete.open(config, mode="readonly") as mp:
+            return list(
+                zoom_index_gen(
+                    mp=mp, zoom=zoom, out_dir=out_dir, txt=True, incremental=True
+                )
+            )
+
+    with mapchete.open(config) as mp:
+        list(mp.execute(zoom=zoom))
+    tiles = [path for page in (out_dir / zoom).paginate() for path in page]
+    kept_back = mp_tmpdir / "kept_back.tif"
+    with tiles[0].open("rb") as src:
+        with kept_back.open("wb") as dst:
+            dst.write(src.read())
+    tiles[0].rm()
+
+    # local clock is one hour ahead of the storage when writing the watermark
+    clock = time.time
+    monkeypatch.setattr(
+        mapchete.index, "time", SimpleNamespace(time=lambda: clock() + 3600)
+    )
+    gen_indexes()
+    monkeypatch.undo()
+
+    # tile written after the watermark is still added
+    with kept_back.open("rb") as src:
+        with tiles[0].open("wb") as dst:
+            dst.write(src.read())
+    assert len(gen_indexes()) == 1
+    with (out_dir / f"{zoom}.txt").open() as src:
+        assert len(src.readlines()) == len(tiles)
+
+
+def test_gti(cleantopo_br):
+    zoom = 8
+    with mapchete.open(
+        dict(cleantopo_br.dict, zoom_levels=dict(min=0, max=zoom))
+    ) as mp:
+        # generate output
+        list(mp.execute(zoom=zoom))
+
+        # generate indexes twice, second run must not add entries
+        for _ in range(2):
+            list(
+                zoom_index_gen(
+                    mp=mp,
+                    zoom=zoom,
+                    out_dir=mp.config.output.path,
+                    vrt=True,
+                    gti=True,
+                )
+            )
+
+    with fiona_open(mp.config.output.path / f"{zoom}.gti.gpkg") as src:
+        assert len(src) == len(
+            [
+                path
+                for page in (mp.config.output.path / zoom).paginate()
+                for path in page
+            ]
+        )
+    with rasterio_open(mp.config.output.path / f"{zoom}.vrt") as vrt:
+        with rasterio_open(mp.config.output.path / f"{zoom}.gti") as gti:
+            assert gti.driver == "GTI"
+            assert gti.dtypes[0] == "uint16"
+            assert gti.count == 1
+            assert gti.nodata == 0
+            assert gti.crs == vrt.crs
+            assert gti.bounds == vrt.bounds
+            vrt_data = vrt.read()
+            assert vrt_data.any()
+            assert np.array_equal(vrt_data, gti.read())
@@ -164,6 +164,33 @@ def test_ls(path):
         assert p._info
 
 
+@pytest.mark.parametrize(
+    "path, prefix",
+    [
+        ("s3://bucket/out/1", "out/1/"),
+        ("s3://bucket/out/1/", "out/1/"),
+        ("s3://bucket", ""),
+    ],
+)
+def test_paginate_s3_prefix(path, prefix, monkeypatch):
+    import boto3
+
+    prefixes = []
+
+    class _Paginator:
+        def paginate(self, Prefix=None, **kwargs):
+            prefixes.append(Prefix)
+            return [{"Contents": []}]
+
+    class _Client:
+        def get_paginator(self, *args):
+            return _Paginator()
+
+    monkeypatch.setattr(boto3, "client", lambda *args, **kwargs: _Client())
+    assert list(MPath(path).paginate()) == [[]]
+    assert prefixes == [prefix]
+
+
 @pytest.mark.integration
 @pytest.mark.parametrize(
     "path",
@@ -1,13 +1,19 @@
 """Test Mapchete commons module."""
 
+import math
+import tracemalloc
+
 import numpy as np
 import numpy.ma as ma
 import pytest
+from affine import Affine
+from shapely.geometry import Polygon, shape
 
 from mapchete import Empty, MapcheteNodataTile
 from mapchete.processes import clip, contours, convert, hillshade
 from mapchete.processes.examples import example_process
 from mapchete.testing import get_process_mp
+from mapchete.tile import BufferedTilePyramid
 
 
 def test_example_process(cleantopo_tl):
@@ -126,6 +132,109 @@ def test_contours_empty_clip(local_raster, landpoly):
         contours.execute(mp.open("dem"), mp.open("clip"))
 
 
+def _contour_tile(pixelbuffer=0, row=0, col=0):
+    return BufferedTilePyramid("geodetic", pixelbuffer=pixelbuffer).tile(10, row, col)
+
+
+def _contour_lines(array, tile, **kwargs):
+    return [
+        (feature["properties"]["elev"], shape(feature["geometry"]))
+        for feature in contours.generate_contours(array, tile, **kwargs)
+    ]
+
+
+def test_generate_contours_orientation():
+    # values increase from west to east, so contours have to run north to south
+    tile = _contour_tile()
+    _, cols = np.mgrid[0 : tile.height, 0 : tile.width]
+    lines = _contour_lines(ma.masked_array(cols * 1.0), tile, interval=100)
+    assert [elevation for elevation, _ in lines] == [0, 100, 200]
+    for elevation, line in lines:
+        # contours are traced through pixel centers
+        expected_x = tile.left + (elevation + 0.5) * tile.pixel_x_size
+        assert np.allclose(np.array(line.coords)[:, 0], expected_x)
+        assert line.bounds[1] == pytest.approx(tile.bottom + tile.pixel_y_size / 2)
+        assert line.bounds[3] == pytest.approx(tile.top - tile.pixel_y_size / 2)
+
+
+def test_generate_contours_closed_rings():
+    tile = _contour_tile()
+    rows, cols = np.mgrid[0 : tile.height, 0 : tile.width]
+    peak = 1000 * np.exp(-((rows - 100) ** 2 + (cols - 150) ** 2) / 2000)
+    lines = _contour_lines(ma.masked_array(peak), tile, interval=250)
+    assert [elevation for elevation, _ in lines] == [250, 500, 750]
+    for _, line in lines:
+        assert line.is_ring
+        assert line.centroid.x == pytest.approx(
+            tile.left + 150.5 * tile.pixel_x_size, rel=1e-6
+        )
+        assert line.centroid.y == pytest.approx(
+            tile.top - 100.5 * tile.pixel_y_size, rel=1e-6
+        )
+    # higher contours are nested within lower contours
+    assert Polygon(lines[0][1]).contains(Polygon(lines[1][1]))
+
+
+def test_generate_contours_masked():
+    tile = _contour_tile()
+    _, cols = np.mgrid[0 : tile.height, 0 : tile.width]
+    mask = np.zeros(tile.shape, dtype=bool)
+    mask[:, 90:110] = True
+    values = np.where(mask, np.nan, cols * 1.0)
+    lines = _contour_lines(ma.masked_array(values, mask=mask), tile, interval=100)
+    assert [elevation for elevation, _ in lines] == [0, 200]
+
+    # NaN values are treated like masked values
+    lines = _contour_lines(ma.masked_array(values), tile, interval=100)
+    assert [elevation for elevation, _ in lines] == [0, 200]
+
+    assert not list(
+        contours.generate_contours(
+            ma.masked_array(values, mask=np.ones(tile.shape, dtype=bool)), tile
+        )
+    )
+
+
+def test_generate_contours_seamless():
+    # contours of neighboring tiles with a pixelbuffer meet at the tile boundary
+    left_tile = _contour_tile(pixelbuffer=4, row=100, col=200)
+    right_tile = _contour_tile(pixelbuffer=4, row=100, col=201)
+
+    def dem(tile):
+        rows, cols = np.mgrid[0 : tile.height, 0 : tile.width]
+        x = tile.left + (cols + 0.5) * tile.pixel_x_size
+        y = tile.top - (rows + 0.5) * tile.pixel_y_size
+        return ma.masked_array(1000 * np.sin(x * 50) * np.cos(y * 40))
+
+    boundary = left_tile.tile_pyramid.tile(*left_tile.id).bounds().right
+    endpoints = []
+    for tile in [left_tile, right_tile]:
+        endpoints.append(
+            sorted(
+                (elevation, round(point[1], 9))
+                for elevation, line in _contour_lines(
+                    dem(tile), tile, interval=200, smoothing=1
+                )
+                for point in [line.coords[0], line.coords[-1]]
+                if point[0] == pytest.approx(boundary)
+            )
+        )
+    assert endpoints[0]
+    assert endpoints[0] == endpoints[1]
+
+
+def test_generate_contours_smoothing():
+    tile = _contour_tile()
+    _, cols = np.mgrid[0 : tile.height, 0 : tile.width]
+    noise = np.random.default_rng(0).normal(0, 20, tile.shape)
+    values = ma.masked_array(cols * 1.0 + noise)
+    rough = _contour_lines(values, tile, interval=100)
+    smooth = _contour_lines(values, tile, interval=100, smoothing=3)
+    assert sum(line.length for _, line in smooth) < sum(
+        line.length for _, line in rough
+    )
+
+
 @pytest.mark.parametrize(
     "min_val, max_val, base, interval, control",
     [
@@ -169,6 +278,110 @@ def test_hillshade_clip_empty(local_raster, landpoly):
         hillshade.execute(mp.open("dem"), mp.open("clip"))
 
 
+def _legacy_hillshade(
+    elevation, affine, azimuth=315.0, altitude=45.0, z=1.0, scale=1.0
+):
+    # hillshade implementation based on calculate_slope_aspect() on masked arrays
+    slope, aspect = hillshade.calculate_slope_aspect(
+        elevation, affine[0], affine[4], z=z, scale=scale
+    )
+    deg2rad = math.pi / 180.0
+    shaded = np.sin(altitude * deg2rad) * np.sin(slope) + np.cos(
+        altitude * deg2rad
+    ) * np.cos(slope) * np.cos((azimuth - 90.0) * deg2rad - aspect)
+    return ma.masked_array(
+        data=np.pad(np.clip(shaded * 255.0, 1, 255).astype(np.uint8), 1, mode="edge"),
+        mask=elevation.mask,
+    )
+
+
+def _elevation(size=512):
+    rows, cols = np.mgrid[0:size, 0:size] / size
+    data = 2000 * np.sin(6 * cols) * np.cos(5 * rows)
+    data += np.random.default_rng(0).random((size, size)) * 20
+    mask = np.zeros(data.shape, dtype=bool)
+    mask[100:110, 200:260] = True
+    return ma.masked_array(data, mask=mask)
+
+
+@pytest.mark.parametrize(
+    "kwargs",
+    [dict(), dict(azimuth=200.0, altitude=30.0, z=3.0, scale=112000.0)],
+)
+def test_hillshade_like_legacy(kwargs):
+    elevation = _elevation()
+    affine = Affine(0.001, 0, 0, 0, -0.001, 0)
+    expected = _legacy_hillshade(elevation, affine, **kwargs)
+
+    # identical in double precision
+    shaded = hillshade.hillshade(elevation, affine, dtype=np.float64, **kwargs)
+    assert shaded.dtype == np.uint8
+    assert (shaded.mask == expected.mask).all()
+    assert (shaded.data[~shaded.mask] == expected.data[~expected.mask]).all()
+
+    # rounding differences in single precision
+    shaded = hillshade.hillshade(elevation, affine, **kwargs)
+    assert (shaded.mask == expected.mask).all()
+    diff = np.abs(shaded.data.astype(int) - expected.data.astype(int))[~shaded.mask]
+    assert diff.max() <= 1
+    assert np.count_nonzero(diff) < diff.size / 1000
+
+    # chunking does not change the result
+    for chunk_rows in [None, 1, 7]:
+        assert (
+            hillshade.hillshade(elevation, affine, chunk_rows=chunk_rows, **kwargs).data
+            == shaded.data
+        ).all()
+
+
+@pytest.mark.parametrize("mode", list(hillshade.HillshadeMode))
+def test_hillshade_modes(mode):
+    elevation = _elevation(128)
+    affine = Affine(0.001, 0, 0, 0, -0.001, 0)
+    shaded = hillshade.hillshade(elevation, affine, mode=mode, scale=112000.0)
+    assert shaded.shape == elevation.shape
+    assert shaded.data.min() >= 1
+    assert (shaded.mask == elevation.mask).all()
+
+    # flat terrain
+    flat = hillshade.hillshade(
+        ma.masked_array(np.zeros((10, 10))), affine, mode=mode, altitude=45.0
+    )
+    if mode == hillshade.HillshadeMode.combined:
+        assert (flat == 255).all()
+    else:
+        assert (flat == int(math.sin(math.radians(45.0)) * 255)).all()
+
+
+def test_hillshade_mp(local_raster):
+    mp = get_process_mp(input=dict(dem=local_raster), tile=(8, 68, 35))
+    dem = mp.open("dem").read()
+    assert (
+        mp.hillshade(dem, mode="multidirectional")
+        == hillshade.hillshade(dem, mp.tile.affine, mode="multidirectional")
+    ).all()
+
+
+def test_hillshade_memory():
+    """Compare peak memory with the legacy implementation."""
+    elevation = _elevation(2048)
+    affine = Affine(0.001, 0, 0, 0, -0.001, 0)
+    peaks = {}
+    for name, func in [
+        ("legacy", _legacy_hillshade),
+        ("hillshade", hillshade.hillshade),
+    ]:
+        tracemalloc.start()
+        try:
+            func(elevation, affine)
+            _, peaks[name] = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+
+    # output array (uint8) and mask are counted as well
+    assert peaks["hillshade"] < peaks["legacy"] / 10
+
+
 def test_clip(local_raster, landpoly):
     tile = (8, 28, 89)
     mp = get_process_mp(input=dict(inp=local_raster, clip=landpoly), tile=tile)
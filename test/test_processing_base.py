@@ -892,3 +892,41 @@ def test_execute_no_tasks(preprocess_cache_memory):
         assert tasks.tile_tasks_count == len(process_tiles) == 0
         assert tasks.preprocessing_tasks_count == 0
         assert len(tasks) == 0
+
+
+def test_baselevels_overview_cache(baselevels, monkeypatch):
+    """Overviews are built from cached child outputs instead of reading them again."""
+    with mapchete.open(baselevels.dict, mode="overwrite") as mp:
+        list(mp.execute(concurrency=None, overview_cache_size=0))
+        expected = {
+            tile: mp.config.output_reader.read(tile)
+            for zoom in [3, 4]
+            for tile in mp.config.output_pyramid.tiles_from_bounds(
+                mp.config.bounds, zoom
+            )
+        }
+
+    read_tiles = []
+    reader_cls = type(mp.config.output_reader)
+    original_read = reader_cls.read
+
+    def _read(self, output_tile, **kwargs):
+        read_tiles.append(output_tile)
+        return original_read(self, output_tile, **kwargs)
+
+    monkeypatch.setattr(reader_cls, "read", _read)
+    with mapchete.open(baselevels.dict, mode="overwrite") as mp:
+        processed = [
+            task_info.tile
+            for task_info in mp.execute(
+                concurrency=None, overview_cache_size=1024 * 1024 * 1024
+            )
+            if task_info.tile.zoom in [4, 5]
+        ]
+    assert processed
+    # overview zoom levels 3 and 4 did not read their processed children again
+    assert not set(processed).intersection(read_tiles)
+
+    with mapchete.open(baselevels.dict, mode="readonly") as mp:
+        for tile, data in expected.items():
+            assert np.array_equal(mp.config.output_reader.read(tile), data)
@@ -0,0 +1,79 @@
+import numpy as np
+import numpy.ma as ma
+import pytest
+from shapely.geometry import box
+
+import mapchete
+from mapchete.processing.cache import ProcessTileCache, data_nbytes
+
+
+def _array(value=1, shape=(100, 100)):
+    # 80000 bytes of data + 10000 bytes of mask
+    return ma.masked_array(
+        np.full(shape, value, dtype=np.float64), mask=np.zeros(shape, dtype=bool)
+    )
+
+
+def test_data_nbytes():
+    arr = _array()
+    assert data_nbytes(arr) == 90000
+    assert data_nbytes(arr.data) == 80000
+    assert data_nbytes(ma.masked_array(arr.data)) == 80000
+    features = [dict(geometry=box(0, 0, 1, 1), properties=dict(id=1))]
+    assert data_nbytes(features) > 5 * 16
+
+
+def test_process_tile_cache_lru_eviction():
+    cache = ProcessTileCache(maxsize=200000)
+    cache[(0, 0, 0)] = _array()
+    cache[(0, 0, 1)] = _array()
+    assert cache.currsize == 180000
+    # touch first item, so second gets evicted
+    assert cache[(0, 0, 0)] is not None
+    cache[(0, 0, 2)] = _array()
+    assert (0, 0, 0) in cache
+    assert (0, 0, 1) not in cache
+    assert (0, 0, 2) in cache
+    assert cache.stats.evictions == 1
+    assert cache.stats.hits == 1
+    with pytest.raises(KeyError):
+        cache[(0, 0, 1)]
+    assert cache.stats.misses == 1
+
+
+def test_process_tile_cache_too_large_item():
+    cache = ProcessTileCache(maxsize=1000)
+    cache[(0, 0, 0)] = _array()
+    assert (0, 0, 0) not in cache
+    assert cache.currsize == 0
+
+
+def test_process_tile_cache_spill(mp_tmpdir):
+    spill_dir = mp_tmpdir / "spill"
+    cache = ProcessTileCache(maxsize=100000, spill_dir=spill_dir)
+    cache[(0, 0, 0)] = _array(1)
+    cache[(0, 0, 1)] = _array(2)
+    assert cache.stats.spilled == 1
+    assert len(spill_dir.ls()) == 1
+
+    # spilled item is loaded again and now the other one gets spilled
+    assert (0, 0, 0) in cache
+    assert np.array_equal(cache[(0, 0, 0)], _array(1))
+    assert cache.stats.unspilled == 1
+    assert cache.stats.spilled == 2
+    assert np.array_equal(cache[(0, 0, 1)], _array(2))
+
+    cache.close()
+    assert not spill_dir.ls()
+
+
+def test_mapchete_process_tile_cache(cleantopo_br):
+    with mapchete.open(
+        cleantopo_br.dict, mode="memory", cache_size=64 * 1024 * 1024
+    ) as mp:
+        assert isinstance(mp.process_tile_cache, ProcessTileCache)
+        assert mp.process_tile_cache.maxsize == 64 * 1024 * 1024
+        tile = mp.config.output_pyramid.tile(5, 0, 0)
+        mp.get_raw_output(tile)
+        mp.get_raw_output(tile)
+        assert mp.process_tile_cache.stats.hits
@@ -0,0 +1,214 @@
+import pickle
+
+import numpy as np
+import numpy.ma as ma
+import pytest
+
+import mapchete
+from mapchete.processing import prefetch
+from mapchete.processing.prefetch import (
+    InputPrefetcher,
+    clear_input_prefetcher,
+    input_prefetcher,
+    prefetchable_input_tiles,
+    read_prefetched,
+)
+from mapchete.settings import mapchete_options
+from mapchete.tile import BufferedTilePyramid
+
+
+class _InputTile:
+    prefetchable = True
+
+    def __init__(self, tile_id, input_key="input", fail=False, pixelbuffer=0):
+        self.input_key = input_key
+        self.tile = BufferedTilePyramid("geodetic", pixelbuffer=pixelbuffer).tile(
+            *tile_id
+        )
+        self.fail = fail
+        self.reads = 0
+
+    def _read(self, value=1):
+        self.reads += 1
+        if self.fail:
+            raise ValueError("read failed")
+        return np.full((10, 10), value, dtype=np.float64)
+
+
+@pytest.fixture
+def clean_prefetcher(monkeypatch):
+    monkeypatch.setattr(prefetch, "_prefetcher", None)
+    yield
+    monkeypatch.setattr(prefetch, "_prefetcher", None)
+
+
+def test_prefetcher_learns_read_signature():
+    prefetcher = InputPrefetcher(depth=1)
+    first, second = _InputTile((5, 0, 0)), _InputTile((5, 0, 1))
+
+    # nothing to prefetch before input was read once
+    prefetcher.prefetch([first])
+    assert not len(prefetcher)
+    assert prefetcher.read(first, first._read, value=2).mean() == 2
+    assert prefetcher.stats.misses == 1
+
+    prefetcher.prefetch([second])
+    assert prefetcher.stats.submitted == 1
+    assert prefetcher.read(second, second._read, value=2).mean() == 2
+    assert prefetcher.stats.hits == 1
+    assert second.reads == 1
+    assert not len(prefetcher)
+
+
+def test_prefetcher_other_arguments():
+    prefetcher = InputPrefetcher(depth=1)
+    first, second = _InputTile((5, 0, 0)), _InputTile((5, 0, 1))
+    prefetcher.read(first, first._read, value=2)
+    prefetcher.prefetch([second])
+    # read with other arguments than prefetched
+    assert prefetcher.read(second, second._read, value=3).mean() == 3
+    assert prefetcher.stats.hits == 0
+    assert second.reads == 2
+
+
+def test_prefetcher_other_tile_shape():
+    prefetcher = InputPrefetcher(depth=1)
+    first, second = _InputTile((5, 0, 0)), _InputTile((5, 0, 1))
+    prefetcher.read(first, first._read)
+    prefetcher.prefetch([second])
+    # same tile index with another pixelbuffer must not get the prefetched read
+    buffered = _InputTile((5, 0, 1), pixelbuffer=16)
+    prefetcher.read(buffered, buffered._read)
+    assert prefetcher.stats.hits == 0
+    assert buffered.reads == 1
+    assert prefetcher.read(second, second._read) is not None
+    assert prefetcher.stats.hits == 1
+
+
+def test_clear_input_prefetcher(clean_prefetcher, monkeypatch):
+    # nothing happens without a prefetcher
+    clear_input_prefetcher()
+
+    monkeypatch.setattr(mapchete_options, "prefetch_depth", 1)
+    prefetcher = input_prefetcher()
+    first, second = _InputTile((5, 0, 0)), _InputTile((5, 0, 1))
+    prefetcher.read(first, first._read)
+    prefetcher.prefetch([second])
+    assert len(prefetcher)
+    clear_input_prefetcher()
+    assert not len(prefetcher)
+
+
+def test_prefetcher_failed_read():
+    prefetcher = InputPrefetcher(depth=1)
+    first, second = _InputTile((5, 0, 0)), _InputTile((5, 0, 1), fail=True)
+    prefetcher.read(first, first._read)
+    prefetcher.prefetch([second])
+    # error is raised by the process read, not by the prefetch
+    with pytest.raises(ValueError):
+        prefetcher.read(second, second._read)
+    assert second.reads == 2
+
+
+def test_prefetcher_limits():
+    first = _InputTile((5, 0, 0))
+    tiles = [_InputTile((5, 0, col)) for col in range(1, 10)]
+
+    prefetcher = InputPrefetcher(depth=2)
+    prefetcher.read(first, first._read)
+    prefetcher.prefetch(tiles[:2])
+    assert prefetcher.stats.submitted == 2
+    prefetcher._reads[next(iter(prefetcher._reads))].result()
+    # stale reads are dropped to make room for upcoming ones
+    prefetcher.prefetch(tiles[2:5])
+    assert len(prefetcher) <= 3
+    assert prefetcher.stats.evictions
+
+    # memory budget
+    prefetcher = InputPrefetcher(depth=4, max_bytes=1)
+    prefetcher.read(first, first._read)
+    prefetcher.prefetch(tiles[:1])
+    prefetcher._reads[next(iter(prefetcher._reads))].result()
+    assert prefetcher.nbytes == 800
+    prefetcher.prefetch(tiles[1:2])
+    assert prefetcher.stats.submitted == 1
+    assert prefetcher.stats.skipped == 1
+
+
+def test_input_prefetcher_settings(clean_prefetcher, monkeypatch):
+    assert input_prefetcher() is None
+    tile = _InputTile((5, 0, 0))
+    assert read_prefetched(tile, tile._read, value=4).mean() == 4
+
+    monkeypatch.setattr(mapchete_options, "prefetch_depth", 2)
+    prefetcher = input_prefetcher()
+    assert isinstance(prefetcher, InputPrefetcher)
+    assert prefetcher.depth == 2
+    assert input_prefetcher() is prefetcher
+
+
+def test_prefetchable_input_tiles():
+    tile = _InputTile((5, 0, 0))
+    other = _InputTile((5, 0, 0), input_key="other")
+    other.prefetchable = False
+    grouped = _InputTile((5, 0, 0), input_key="grouped")
+    assert list(
+        prefetchable_input_tiles(
+            {"tile": tile, "other": other, "group": [("grouped", grouped)]}
+        )
+    ) == [tile, grouped]
+
+
+def test_execute_with_prefetch(
+    cleantopo_br_metatiling_1, clean_prefetcher, monkeypatch
+):
+    zoom = 5
+
+    def _outputs(mp):
+        return {
+            tile: mp.config.output.read(tile)
+            for tile in mp.config.output_pyramid.tiles_from_bounds(
+                mp.config.bounds_at_zoom(zoom), zoom
+            )
+        }
+
+    with mapchete.open(cleantopo_br_metatiling_1.dict, mode="overwrite") as mp:
+        list(mp.execute(zoom=zoom, concurrency=None))
+        expected = _outputs(mp)
+
+    monkeypatch.setattr(mapchete_options, "prefetch_depth", 1)
+    with mapchete.open(cleantopo_br_metatiling_1.dict, mode="overwrite") as mp:
+        tasks = list(mp.tasks(zoom=zoom).to_batch())
+        assert len(tasks) > 1
+        assert tasks[0].prefetch_inputs
+        assert tasks[0].prefetch_inputs[0].tile == tasks[1].tile
+        assert not tasks[-1].prefetch_inputs
+        # upcoming inputs are not sent to other processes
+        assert not pickle.loads(pickle.dumps(tasks[0])).prefetch_inputs
+        list(mp.execute(zoom=zoom, concurrency=None))
+        result = _outputs(mp)
+
+    assert input_prefetcher().stats.hits
+    # prefetched reads are dropped when the process is closed
+    assert not len(input_prefetcher())
+    assert expected.keys() == result.keys()
+    for tile, data in expected.items():
+        assert ma.allequal(data, result[tile])
+
+
+@pytest.mark.parametrize(
+    "concurrency,warned",
+    [(None, False), ("threads", False), ("processes", True)],
+)
+def test_execute_with_prefetch_warning(
+    cleantopo_br_metatiling_1,
+    clean_prefetcher,
+    monkeypatch,
+    caplog,
+    concurrency,
+    warned,
+):
+    monkeypatch.setattr(mapchete_options, "prefetch_depth", 1)
+    with mapchete.open(cleantopo_br_metatiling_1.dict, mode="overwrite") as mp:
+        list(mp.execute(zoom=5, concurrency=concurrency, workers=2))
+    assert ("input prefetching is only available" in caplog.text) == warned
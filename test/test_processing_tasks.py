@@ -202,6 +202,33 @@ def test_task_batches_as_dask_graph(dem_to_hillshade):
     # dask.compute(graph, scheduler=dask_executor._executor_client)
 
 
+def test_task_batches_as_dask_graph_chunks(dem_to_hillshade):
+    task_batches = Tasks(task_batches_generator(dem_to_hillshade))
+    chunks = list(task_batches.to_dask_graph_chunks(chunksize=2))
+    assert chunks
+    for _, chunk in chunks:
+        assert 0 < len(chunk) <= 2
+
+    # every task is emitted exactly once
+    keys = [key for _, chunk in chunks for key in chunk]
+    assert len(keys) == len(set(keys))
+    assert len(keys) == sum(len(batch) for batch in task_batches)
+
+    # dependencies only point to tasks of the previous batch
+    batch_ids = [batch_id for batch_id, _ in chunks]
+    batch_keys = {}
+    for batch_id, chunk in chunks:
+        batch_keys.setdefault(batch_id, set()).update(chunk)
+    for batch_id, chunk in chunks:
+        position = list(dict.fromkeys(batch_ids)).index(batch_id)
+        for _, _, _, dependencies in chunk.values():
+            if dependencies:
+                previous_batch_id = list(dict.fromkeys(batch_ids))[position - 1]
+                assert set(dependencies.values()).issubset(
+                    batch_keys[previous_batch_id]
+                )
+
+
 def test_task_batches_as_layered_batches(dem_to_hillshade):
     task_batches = Tasks(task_batches_generator(dem_to_hillshade))
     assert len(task_batches.preprocessing_batches) == 1
@@ -0,0 +1,219 @@
+import pickle
+
+import numpy as np
+import pytest
+from shapely.affinity import scale
+from shapely.geometry import LineString, Point, Polygon, box
+from tilematrix import TilePyramid
+
+from mapchete.tile import (
+    BatchBy,
+    BufferedTile,
+    BufferedTileBatch,
+    BufferedTilePyramid,
+    TileMask,
+)
+
+
+@pytest.mark.parametrize("grid", ["geodetic", "mercator"])
+@pytest.mark.parametrize("metatiling", [1, 4])
+@pytest.mark.parametrize("pixelbuffer", [0, 10])
+def test_buffered_tile_properties(grid, metatiling, pixelbuffer):
+    pyramid = BufferedTilePyramid(grid, metatiling=metatiling, pixelbuffer=pixelbuffer)
+    for row, col in [(0, 0), (2, 3)]:
+        tile = pyramid.tile(4, row, col)
+        reference = TilePyramid(grid, metatiling=metatiling).tile(4, row, col)
+        assert tuple(tile.bounds) == reference.bounds(pixelbuffer=pixelbuffer)
+        assert tile.shape == reference.shape(pixelbuffer=pixelbuffer)
+        assert tile.affine == reference.affine(pixelbuffer=pixelbuffer)
+        assert tile.bbox.equals(reference.bbox(pixelbuffer=pixelbuffer))
+        assert tile.crs == reference.crs
+        assert tile.id == reference.id
+        assert tile.tp == reference.tp
+        # tile created from a tilematrix Tile is the same
+        assert BufferedTile(reference, pixelbuffer=pixelbuffer) == tile
+
+
+def test_buffered_tile_invalid():
+    pyramid = BufferedTilePyramid("geodetic")
+    with pytest.raises(TypeError):
+        pyramid.tile(4, -1, 0)
+    with pytest.raises(ValueError):
+        pyramid.tile(4, 0, pyramid.matrix_width(4))
+    with pytest.raises(ValueError):
+        pyramid.tile(4, pyramid.matrix_height(4), 0)
+
+
+def test_buffered_tile_compact():
+    tile = BufferedTilePyramid("geodetic", pixelbuffer=2).tile(5, 5, 5)
+    assert not hasattr(tile, "__dict__")
+    # all tiles share the same pyramid
+    assert all(child.buffered_tp is tile.buffered_tp for child in tile.get_children())
+    assert tile.get_parent().buffered_tp is tile.buffered_tp
+
+    unpickled = pickle.loads(pickle.dumps(tile))
+    assert unpickled == tile
+    assert unpickled.bounds == tile.bounds
+    assert hash(unpickled) == hash(tile)
+
+
+@pytest.mark.parametrize("grid", ["geodetic", "mercator"])
+@pytest.mark.parametrize("metatiling", [1, 16])
+@pytest.mark.parametrize("pixelbuffer", [0, 10])
+def test_tiles_bounds(grid, metatiling, pixelbuffer):
+    pyramid = BufferedTilePyramid(grid, metatiling=metatiling, pixelbuffer=pixelbuffer)
+    zoom = 5
+    rows, cols = np.meshgrid(
+        np.arange(pyramid.matrix_height(zoom)), np.arange(pyramid.matrix_width(zoom))
+    )
+    bounds = pyramid.tiles_bounds(zoom, rows.ravel(), cols.ravel())
+    assert bounds.shape == (rows.size, 4)
+    for (row, col), tile_bounds in zip(zip(rows.ravel(), cols.ravel()), bounds):
+        assert np.allclose(
+            tile_bounds, pyramid.tile(zoom, int(row), int(col)).bounds, rtol=0
+        )
+
+
+def test_tiles_from_geom_batches():
+    pyramid = BufferedTilePyramid("geodetic", metatiling=2)
+    geometry = box(0, 0, 20, 10)
+    zoom = 6
+    batches = list(
+        pyramid.tiles_from_geom_batches(geometry, zoom, batch_by=BatchBy.row)
+    )
+    assert batches
+    tiles = []
+    for batch in batches:
+        assert isinstance(batch, BufferedTileBatch)
+        batch_tiles = list(batch)
+        assert len(batch) == len(batch_tiles)
+        assert len(set(tile.row for tile in batch_tiles)) == 1
+        assert np.allclose(
+            batch.total_bounds,
+            (
+                min(tile.left for tile in batch_tiles),
+                min(tile.bottom for tile in batch_tiles),
+                max(tile.right for tile in batch_tiles),
+                max(tile.top for tile in batch_tiles),
+            ),
+        )
+        tiles.extend(batch_tiles)
+    assert set(tiles) == set(pyramid.tiles_from_geom(geometry, zoom))
+
+
+@pytest.mark.parametrize("grid", ["geodetic", "mercator"])
+@pytest.mark.parametrize("metatiling", [1, 16])
+@pytest.mark.parametrize("exact", [True, False])
+@pytest.mark.parametrize(
+    "geometry",
+    [
+        box(-10, -10, 20, 15),
+        # crossing the antimeridian
+        box(170, -10, 190, 10),
+        box(-190, -5, -170, 5),
+        Point(5, 5).buffer(12).union(Point(-178, 30).buffer(3)),
+        LineString([(0, 0), (30, 10), (-170, 40)]),
+        Point(3.3, 4.4),
+    ],
+)
+def test_tiles_from_geom_like_tilematrix(grid, metatiling, exact, geometry):
+    pyramid = BufferedTilePyramid(grid, metatiling=metatiling, pixelbuffer=5)
+    if grid == "mercator":
+        geometry = scale(geometry, 100_000, 100_000, origin=(0, 0))
+    for zoom in [0, 3, 6]:
+        # same tiles in same order
+        assert [tile.id for tile in pyramid.tiles_from_geom(geometry, zoom, exact)] == [
+            tile.id
+            for tile in TilePyramid(grid, metatiling=metatiling).tiles_from_geom(
+                geometry, zoom, exact=exact
+            )
+        ]
+        for batch in pyramid.tiles_from_geom_batches(
+            geometry, zoom, batch_by=BatchBy.col, exact=exact
+        ):
+            assert len(batch)
+            assert len(set(tile.col for tile in batch)) == 1
+
+
+@pytest.mark.parametrize("grid", ["geodetic", "mercator"])
+@pytest.mark.parametrize("metatiling", [1, 16])
+@pytest.mark.parametrize(
+    "geometry",
+    [
+        box(-10, -10, 20, 15),
+        # crossing the antimeridian
+        box(170, -10, 190, 10),
+        Point(5, 5).buffer(12).union(Point(-178, 30).buffer(3)),
+        Point(5, 5).buffer(12).difference(Point(5, 5).buffer(4)),
+    ],
+)
+def test_tiles_mask_like_tiles_from_geom(grid, metatiling, geometry):
+    pyramid = BufferedTilePyramid(grid, metatiling=metatiling, pixelbuffer=5)
+    if grid == "mercator":
+        geometry = scale(geometry, 100_000, 100_000, origin=(0, 0))
+    for zoom in [0, 3, 6]:
+        mask = pyramid.tiles_mask(geometry, zoom)
+        tiles = list(pyramid.tiles_from_geom(geometry, zoom, exact=True))
+        assert isinstance(mask, TileMask)
+        assert len(mask) == len(tiles)
+        assert set(mask.tiles()) == set(tiles)
+        for batch in mask.batches(batch_by=BatchBy.col):
+            assert len(batch)
+            assert len(set(tile.col for tile in batch)) == 1
+
+
+@pytest.mark.parametrize(
+    "bounds, tile_id",
+    [
+        ((-189.6, -54.8, -186.1, -48.9), (2, 3, 7)),
+        ((186.1, -54.8, 189.6, -48.9), (2, 3, 0)),
+    ],
+)
+def test_tiles_from_geom_beyond_antimeridian(bounds, tile_id):
+    pyramid = BufferedTilePyramid("geodetic")
+    assert [tile.id for tile in pyramid.tiles_from_geom(box(*bounds), 2)] == [tile_id]
+    for zoom in [0, 3, 6]:
+        assert [tile.id for tile in pyramid.tiles_from_geom(box(*bounds), zoom)] == [
+            tile.id
+            for tile in TilePyramid("geodetic").tiles_from_geom(
+                box(*bounds), zoom, exact=True
+            )
+        ]
+
+
+def test_tiles_mask_indexing():
+    pyramid = BufferedTilePyramid("geodetic")
+    zoom = 5
+    geometry = box(0, 0, 20, 10)
+    mask = pyramid.tiles_mask(geometry, zoom)
+    tiles = set(pyramid.tiles_from_geom(geometry, zoom, exact=True))
+    for tile in tiles:
+        assert tile in mask
+        assert (tile.row, tile.col) in mask
+    # other zoom levels are never included
+    assert pyramid.tile(zoom + 1, *next(iter(tiles)).id[1:]) not in mask
+    # tiles outside of mask window
+    assert (0, 0) not in mask
+    assert pyramid.tile(zoom, 30, 60) not in mask
+
+    rows, cols = np.meshgrid(
+        np.arange(pyramid.matrix_height(zoom)), np.arange(pyramid.matrix_width(zoom))
+    )
+    included = mask[rows, cols]
+    assert included.shape == rows.shape
+    assert included.sum() == len(tiles)
+
+
+def test_tiles_mask_empty():
+    pyramid = BufferedTilePyramid("geodetic")
+    for geometry in [Polygon(), LineString([(0, 0), (10, 10)]), Point(1, 1)]:
+        mask = pyramid.tiles_mask(geometry, 5)
+        assert not len(mask)
+        assert not list(mask.tiles())
+        assert (0, 0) not in mask
+
+
+def test_tiles_mask_max_cells():
+    pyramid = BufferedTilePyramid("geodetic")
+    with pytest.raises(ValueError):
+        pyramid.tiles_mask(box(-180, -90, 180, 90), 10, max_cells=1000)